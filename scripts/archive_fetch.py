@@ -0,0 +1,206 @@
+import argparse
+import functools
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path, PurePosixPath
+
+import requests
+
+ARCHIVE_BASE_URL = 'https://github.com'
+USER_AGENT = 'Java-Repository-Analyzer/1.0'
+CHUNK_SIZE = 1 << 16
+
+
+def archive_url(full_name, base_url=ARCHIVE_BASE_URL, ref='HEAD'):
+    """URL do tar.gz do branch padrão (o GitHub redireciona para codeload.github.com)"""
+    return f"{base_url.rstrip('/')}/{full_name}/archive/{ref}.tar.gz"
+
+
+class _CountingReader:
+    """Arquivo somente leitura que conta os bytes recebidos da rede"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _safe_java_path(name):
+    """Caminho relativo do .java sem o diretório-raiz do arquivo ('repo-sha/'), ou None se inseguro"""
+    path = PurePosixPath(name)
+    parts = path.parts[1:]
+    # O '..' é verificado em todo o caminho: no diretório-raiz ele seria descartado sem aviso
+    if not parts or path.is_absolute() or '..' in path.parts or not name.endswith('.java'):
+        return None
+    return PurePosixPath(*parts)
+
+
+def fetch_archive(url, target, timeout=60):
+    """Baixa o tar.gz em streaming e grava só os arquivos .java em ``target``.
+
+    O arquivo é lido em sequência (modo 'r|gz'), sem ser salvo em disco nem
+    carregado inteiro na memória; cada .java é escrito assim que chega.
+    Links, diretórios e demais arquivos são ignorados.
+    """
+    target = Path(target)
+    start = time.perf_counter()
+    stats = {'files': 0, 'bytes_written': 0}
+    with requests.get(url, stream=True, timeout=timeout, headers={'User-Agent': USER_AGENT}) as response:
+        response.raise_for_status()
+        reader = _CountingReader(response.raw)
+        with tarfile.open(fileobj=reader, mode='r|gz') as archive:
+            for member in archive:
+                relative = _safe_java_path(member.name) if member.isfile() else None
+                if relative is None:
+                    continue
+                destination = target.joinpath(*relative.parts)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                with archive.extractfile(member) as source, open(destination, 'wb') as output:
+                    shutil.copyfileobj(source, output, CHUNK_SIZE)
+                stats['files'] += 1
+                stats['bytes_written'] += member.size
+    stats['bytes_downloaded'] = reader.bytes_read
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def directory_size(path):
+    """Bytes em disco de todos os arquivos de um diretório (inclui .git)"""
+    return sum(file.stat().st_size for file in Path(path).rglob('*') if file.is_file() and not file.is_symlink())
+
+
+def clone_with_git(repo_url, target):
+    """Clone raso como em RepositoryAnalyzer.clone_repository, medido para comparação"""
+    from git import Repo
+
+    start = time.perf_counter()
+    Repo.clone_from(repo_url, target, depth=1, single_branch=True).close()
+    return {'seconds': round(time.perf_counter() - start, 3),
+            'bytes_written': directory_size(target),
+            'files': sum(1 for _ in Path(target).rglob('*.java'))}
+
+
+class _ArchiveHandler(SimpleHTTPRequestHandler):
+    """Responde /<owner>/<nome>/archive/HEAD.tar.gz com <owner>_<nome>.tar.gz do diretório"""
+
+    def translate_path(self, path):
+        parts = path.split('?', 1)[0].strip('/').split('/')
+        if len(parts) == 4 and parts[2] == 'archive':
+            return str(Path(self.directory) / f'{parts[0]}_{parts[1]}.tar.gz')
+        return str(Path(self.directory) / '__inexistente__')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ArchiveServer:
+    """Substituto local do GitHub para testes: serve tar.gz no mesmo formato de URL.
+
+    Uso: ``with ArchiveServer(diretorio) as base_url: fetch_archive(archive_url(nome, base_url), ...)``
+    """
+
+    def __init__(self, directory, host='127.0.0.1', port=0):
+        handler = functools.partial(_ArchiveHandler, directory=str(directory))
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self.base_url
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def build_local_archives(repos_dir, archive_dir):
+    """Gera <owner>_<nome>.tar.gz (git archive do HEAD) para cada repositório git em ``repos_dir``.
+
+    Cada subdiretório chamado owner_nome vira o repositório owner/nome.
+    """
+    names = []
+    for repo in sorted(Path(repos_dir).iterdir()):
+        if not (repo / '.git').exists() or '_' not in repo.name:
+            continue
+        subprocess.run(['git', 'archive', '--format=tar.gz', f'--prefix={repo.name}-HEAD/',
+                        '-o', str(Path(archive_dir).resolve() / f'{repo.name}.tar.gz'), 'HEAD'],
+                       cwd=repo, check=True)
+        names.append(repo.name.replace('_', '/', 1))
+    return names
+
+
+def github_clone_url(full_name):
+    return f"https://github.com/{full_name}.git"
+
+
+def compare_fetch_modes(full_names, base_url=ARCHIVE_BASE_URL, clone_url=github_clone_url):
+    """Para cada repositório: bytes gravados e tempo até o CK poder começar, git clone x arquivo"""
+    rows = []
+    with tempfile.TemporaryDirectory(prefix='fetch_compare_') as workdir:
+        for full_name in full_names:
+            slug = full_name.replace('/', '_')
+            try:
+                git = clone_with_git(clone_url(full_name), Path(workdir) / f'{slug}.git')
+                archive = fetch_archive(archive_url(full_name, base_url), Path(workdir) / f'{slug}.archive')
+            except Exception as e:
+                print(f"✗ {full_name}: {e}")
+                continue
+            rows.append({'repo': full_name, 'git': git, 'archive': archive})
+            print(f"{full_name}\n"
+                  f"  git clone: {git['seconds']:.2f}s, {git['bytes_written'] / 2 ** 20:.1f} MB gravados, "
+                  f"{git['files']} .java\n"
+                  f"  arquivo:   {archive['seconds']:.2f}s, {archive['bytes_written'] / 2 ** 20:.1f} MB gravados "
+                  f"({archive['bytes_downloaded'] / 2 ** 20:.1f} MB baixados), {archive['files']} .java")
+            shutil.rmtree(Path(workdir) / f'{slug}.git', ignore_errors=True)
+            shutil.rmtree(Path(workdir) / f'{slug}.archive', ignore_errors=True)
+
+    if rows:
+        git_bytes = sum(row['git']['bytes_written'] for row in rows)
+        archive_bytes = sum(row['archive']['bytes_written'] for row in rows)
+        git_time = sum(row['git']['seconds'] for row in rows)
+        archive_time = sum(row['archive']['seconds'] for row in rows)
+        print(f"\n=== TOTAL ({len(rows)} repositórios) ===")
+        print(f"Bytes gravados: git {git_bytes / 2 ** 20:.1f} MB x arquivo {archive_bytes / 2 ** 20:.1f} MB "
+              f"({archive_bytes / max(git_bytes, 1):.1%} do clone)")
+        print(f"Tempo até iniciar o CK: git {git_time:.2f}s x arquivo {archive_time:.2f}s")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compara o clone git com o download em streaming do tar.gz (só arquivos .java)')
+    parser.add_argument('repos', nargs='*', help='owner/nome (no GitHub)')
+    parser.add_argument('--local', metavar='DIR',
+                        help='usa os repositórios git de DIR (subdiretórios owner_nome) '
+                             'servidos por um servidor local em vez do GitHub')
+    args = parser.parse_args(argv)
+
+    if args.local:
+        with tempfile.TemporaryDirectory(prefix='archives_') as archive_dir:
+            names = build_local_archives(args.local, archive_dir)
+            with ArchiveServer(archive_dir) as base_url:
+                local = Path(args.local).resolve()
+                compare_fetch_modes(names, base_url,
+                                    clone_url=lambda name: (local / name.replace('/', '_', 1)).as_uri())
+    elif args.repos:
+        compare_fetch_modes(args.repos)
+    else:
+        parser.error('informe repositórios owner/nome ou --local DIR')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import concurrent.futures
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BENCHMARK_DIR = Path('results/benchmarks')
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SEED = 42
+
+# O Kendall do bootstrap custa O(n²) por reamostragem; acima disso o estágio é pulado
+INFERENCE_MAX_ROWS = 5_000
+INFERENCE_RESAMPLES = 200
+
+# Estágios mais lentos que isso (razão entre commits) são sinalizados na comparação
+REGRESSION_THRESHOLD = 1.2
+
+QUALITY_COLUMNS = ['cbo', 'dit', 'lcom', 'loc']
+# Fração de repositórios sem métricas CK (como no dataset real)
+MISSING_QUALITY_FRACTION = 0.026
+
+
+def generate_dataset(rows, seed=SEED):
+    """Dataset sintético no formato de repository_analysis_results.csv.
+
+    As distribuições imitam as do dataset real: estrelas com cauda de Pareto
+    acima do corte do top 1000, releases com excesso de zeros e limitadas a
+    30, LCOM com cauda log-normal longa e ~2,6% das linhas sem métricas CK.
+    """
+    rng = np.random.default_rng(seed)
+    stars = np.minimum(3400 * (1 + rng.pareto(1.3, rows)), 500_000).astype(np.int64)
+    releases = np.where(rng.random(rows) < 0.32, 0,
+                        np.minimum(30, 1 + rng.negative_binomial(1, 0.06, rows)))
+    df = pd.DataFrame({
+        'repo': [f'owner{i}/repo{i}' for i in range(rows)],
+        'stars': stars,
+        'releases': releases,
+        'idade_anos': np.clip(rng.normal(9.7, 3.0, rows), 0.1, 17.0).round(2),
+        'cbo': rng.lognormal(np.log(5.2), 0.35, rows),
+        'dit': 1 + rng.gamma(1.2, 0.35, rows),
+        'lcom': rng.lognormal(np.log(23), 1.3, rows),
+        'loc': rng.lognormal(np.log(44), 0.55, rows),
+        'locComment': np.where(rng.random(rows) < 0.95, 0, rng.integers(1, 500, rows)),
+    })
+    missing = rng.random(rows) < MISSING_QUALITY_FRACTION
+    df.loc[missing, QUALITY_COLUMNS] = np.nan
+    return df
+
+
+@contextmanager
+def measure(stages, name):
+    """Tempo e pico de memória alocada (tracemalloc) de um estágio; erros ficam registrados"""
+    gc.collect()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+        stages[name] = {'seconds': round(time.perf_counter() - start, 4),
+                        'peak_mb': round((tracemalloc.get_traced_memory()[1] - base) / 2 ** 20, 2)}
+    except Exception as e:
+        stages[name] = {'error': f'{type(e).__name__}: {e}'}
+    print(f"  {name}: {_format_stage(stages[name])}", flush=True)
+
+
+def _format_stage(stage):
+    if 'error' in stage:
+        return f"erro ({stage['error']})"
+    if 'skipped' in stage:
+        return f"pulado ({stage['skipped']})"
+    return f"{stage['seconds']:.3f}s, pico {stage['peak_mb']:.1f} MB"
+
+
+def run_size(rows, seed=SEED, figures=True):
+    """Executa todos os estágios para um tamanho (chamado em um processo novo)"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+
+    import analysis
+    import graficos_detalhados
+    import render_pipeline
+    import dataset_cache
+    import repository_store
+    from correlation_inference import compute_inference
+    from figures import apply_style
+    from repository_store import QUARTILE_LABELS, group_summary
+    from stats_engine import compute_statistics, load_dataset
+
+    workdir = Path(tempfile.mkdtemp(prefix='benchmark_'))
+    os.chdir(workdir)
+    # Mesmo nome do CSV real, para usar o esquema tipado de dataset_cache
+    csv_path = Path('results/repository_analysis_results.csv')
+    csv_path.parent.mkdir()
+    generate_dataset(rows, seed).to_csv(csv_path, index=False)
+
+    tracemalloc.start()
+    stages = {}
+    try:
+        with measure(stages, 'load_cold'):
+            df = load_dataset(csv_path)
+        if 'error' in stages['load_cold']:
+            return {'stages': stages}
+        with measure(stages, 'load_warm'):
+            dataset_cache._opened.clear()
+            repository_store._opened.clear()
+            df = load_dataset(csv_path)
+        with measure(stages, 'statistics'):
+            stats_result = compute_statistics(df)
+        with measure(stages, 'quartile_grouping'):
+            group_summary(df, 'stars_quartile', QUALITY_COLUMNS)
+        with measure(stages, 'quartile_qcut_groupby'):
+            quartiles = pd.qcut(df['stars'], q=4, labels=QUARTILE_LABELS)
+            df.groupby(quartiles, observed=False)[QUALITY_COLUMNS].agg(['mean', 'median', 'std'])
+        if rows <= INFERENCE_MAX_ROWS:
+            with measure(stages, 'inference'):
+                compute_inference(df, n_resamples=INFERENCE_RESAMPLES)
+        else:
+            stages['inference'] = {'skipped': f'mais de {INFERENCE_MAX_ROWS} linhas'}
+            print(f"  inference: {_format_stage(stages['inference'])}")
+
+        if figures:
+            render_pipeline._worker_data = (df, stats_result)
+            for task in analysis.build_tasks() + graficos_detalhados.build_tasks():
+                with measure(stages, f'figure:{task.output}'):
+                    apply_style(task.style)
+                    fig = task.func(df.copy(), stats_result, **task.kwargs)
+                    fig.savefig(task.output, dpi=render_pipeline.DPI, bbox_inches='tight')
+                    plt.close(fig)
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {'stages': stages, 'max_rss_mb': max_rss_mb()}
+
+
+def max_rss_mb():
+    """Pico de RSS deste processo em MB, ou None onde não há o módulo resource (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    from process_monitor import rss_to_mb
+
+    return rss_to_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def current_commit():
+    """Hash curto do HEAD (com sufixo -dirty se houver alterações não commitadas)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f'{commit}-dirty' if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return 'sem-git'
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed=SEED, figures=True):
+    """Roda cada tamanho em um processo novo (memória e caches isolados) e grava o resultado"""
+    scripts_dir = str(Path(__file__).resolve().parent)
+    result = {
+        'commit': current_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()}, {os.cpu_count()} núcleos',
+        'seed': seed,
+        'sizes': {},
+    }
+    context = multiprocessing.get_context('spawn')
+    for rows in sizes:
+        print(f"\n📏 {rows:,} linhas")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                                    initializer=_add_to_path,
+                                                    initargs=(scripts_dir,)) as executor:
+            try:
+                result['sizes'][str(rows)] = executor.submit(run_size, rows, seed, figures).result()
+            except Exception as e:
+                # Ex.: processo morto por falta de memória
+                print(f"  ✗ falhou: {e}")
+                result['sizes'][str(rows)] = {'error': f'{type(e).__name__}: {e}'}
+
+    BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+    path = BENCHMARK_DIR / f"{result['commit']}.json"
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(result, file, indent=2)
+    print(f"\n💾 Resultados salvos em {path}")
+    return path
+
+
+def _add_to_path(path):
+    import sys
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def _load_result(name):
+    path = Path(name)
+    if not path.exists():
+        path = BENCHMARK_DIR / f'{name}.json'
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare(base_name, head_name=None):
+    """Tabela estágio a estágio entre dois resultados; razões acima do limite são regressões"""
+    if head_name is None:
+        head_name = max(BENCHMARK_DIR.glob('*.json'), key=lambda p: p.stat().st_mtime)
+    base, head = _load_result(base_name), _load_result(head_name)
+    print(f"Comparando {base['commit']} → {head['commit']}\n")
+
+    regressions = 0
+    print(f"{'linhas':>10}  {'estágio':<50}{'base (s)':>10}{'atual (s)':>11}{'razão':>8}{'MB atual':>10}")
+    for rows, head_size in head['sizes'].items():
+        base_stages = base['sizes'].get(rows, {}).get('stages', {})
+        for stage, values in head_size.get('stages', {}).items():
+            before = base_stages.get(stage, {})
+            if 'seconds' not in values or 'seconds' not in before:
+                continue
+            ratio = values['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+            flag = ' ⚠️' if ratio > REGRESSION_THRESHOLD else ''
+            regressions += bool(flag)
+            print(f"{int(rows):>10,}  {stage:<50}{before['seconds']:>10.3f}{values['seconds']:>11.3f}"
+                  f"{ratio:>7.2f}x{values['peak_mb']:>10.1f}{flag}")
+    print(f"\n{regressions} estágio(s) mais de {REGRESSION_THRESHOLD:.0%} do tempo base")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark dos scripts de análise e gráficos com datasets sintéticos')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='números de linhas (padrão: %(default)s; 10000000 para o teste completo)')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--no-figures', action='store_true', help='não mede os gráficos')
+    parser.add_argument('--compare', nargs='+', metavar='COMMIT',
+                        help='compara dois resultados salvos (base [atual]) em vez de rodar')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare[:2])
+    else:
+        run_benchmarks(args.sizes, args.seed, figures=not args.no_figures)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import Counter
+from pathlib import Path
+
+BLOB_STORE_DIR = Path('blob_store')
+
+# Mesma regra de analyze_repository_with_ck: com um diretório src/ o CK só analisa ele
+SOURCE_ROOT = 'src/'
+
+
+def git_blob_hash(data):
+    """SHA-1 do objeto blob do git para o conteúdo (o mesmo que `git hash-object`)"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def _sparse_pattern(path):
+    """Padrão de sparse-checkout que casa exatamente com um caminho"""
+    escaped = ''.join('\\' + char if char in '\\*?[!#' else char for char in path)
+    return '/' + escaped
+
+
+def list_java_blobs(repo, rev='HEAD'):
+    """Arquivos .java de uma revisão (caminho -> hash do blob), lidos da árvore sem baixar conteúdo"""
+    files = {}
+    for entry in repo.git.ls_tree('-r', '-z', rev).split('\0'):
+        if not entry:
+            continue
+        info, path = entry.split('\t', 1)
+        mode, kind, sha = info.split()
+        # 120000 = link simbólico; submódulos aparecem como 'commit'
+        if kind == 'blob' and mode != '120000' and path.endswith('.java'):
+            files[path] = sha
+    if any(path.startswith(SOURCE_ROOT) for path in files):
+        files = {path: sha for path, sha in files.items() if path.startswith(SOURCE_ROOT)}
+    return files
+
+
+class BlobStore:
+    """Fontes Java endereçadas pelo hash do blob do git, com um manifesto por repositório.
+
+    Layout:
+        objects/ab/cdef...      conteúdo do arquivo (uma cópia por blob)
+        ck_rows/ab/cdef...json  linhas por classe do CK para o blob
+        manifests/<repo>.json   caminho -> blob do commit analisado e contadores
+        manifests/revisions/<repo>@<tag>.json
+                                manifestos por tag (revision_analysis.py), fora de savings()
+
+    Arquivos idênticos (forks, espelhos, bibliotecas embutidas) são baixados,
+    guardados e analisados pelo CK uma única vez. As linhas do CK são
+    reaproveitadas por blob; como o CK resolve tipos dentro do conjunto de
+    arquivos que recebe, métricas que dependem de outras classes (ex.: DIT
+    quando a superclasse está em outro arquivo) podem variar um pouco em
+    relação a uma análise do repositório inteiro.
+    """
+
+    def __init__(self, root=BLOB_STORE_DIR):
+        self.root = Path(root)
+        for name in ('objects', 'ck_rows', 'manifests'):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, kind, sha, suffix=''):
+        return self.root / kind / sha[:2] / f'{sha[2:]}{suffix}'
+
+    @staticmethod
+    def _write(path, data):
+        # Escrita atômica: vários workers podem gravar o mesmo blob ao mesmo tempo
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}')
+        temp.write_bytes(data)
+        os.replace(temp, path)
+
+    def has(self, sha):
+        return self._path('objects', sha).exists()
+
+    def put(self, data):
+        sha = git_blob_hash(data)
+        if not self.has(sha):
+            self._write(self._path('objects', sha), data)
+        return sha
+
+    def size(self, sha):
+        return self._path('objects', sha).stat().st_size
+
+    def has_rows(self, sha):
+        return self._path('ck_rows', sha, '.json').exists()
+
+    def load_rows(self, sha):
+        with open(self._path('ck_rows', sha, '.json'), 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def save_rows(self, sha, rows):
+        self._write(self._path('ck_rows', sha, '.json'), json.dumps(rows).encode('utf-8'))
+
+    def manifest_path(self, repo_name):
+        # Nomes de repositório não têm '@': os de revisões ficam em um subdiretório próprio,
+        # para que várias tags do mesmo repositório não contem como repositórios distintos
+        if '@' in repo_name:
+            return self.root / 'manifests' / 'revisions' / f'{repo_name}.json'
+        return self.root / 'manifests' / f'{repo_name}.json'
+
+    def load_manifest(self, repo_name):
+        path = self.manifest_path(repo_name)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def save_manifest(self, repo_name, manifest):
+        self._write(self.manifest_path(repo_name),
+                    json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+
+    def manifests(self):
+        """Manifestos dos repositórios (sem os de revisões)"""
+        for path in sorted((self.root / 'manifests').glob('*.json')):
+            with open(path, 'r', encoding='utf-8') as file:
+                yield json.load(file)
+
+    def fetch_repository(self, repo_url, workdir):
+        """Clone parcial (sem blobs) do HEAD; só os .java que faltam no store são baixados.
+
+        Retorna o manifesto com caminho -> blob e os contadores do download.
+        O diretório de trabalho é removido no final.
+        """
+        # Importado aqui: o GitPython só é necessário durante os clones
+        from git import Repo
+
+        repo = Repo.clone_from(repo_url, workdir, depth=1, single_branch=True,
+                               no_checkout=True, filter='blob:none')
+        try:
+            files = list_java_blobs(repo)
+            files, fetched, fetched_bytes = self.fetch_blobs(repo, files)
+            manifest = {
+                'commit': repo.head.commit.hexsha,
+                'files': files,
+                'blobs_fetched': fetched,
+                'bytes_fetched': fetched_bytes,
+            }
+        finally:
+            repo.close()
+            shutil.rmtree(workdir, ignore_errors=True)
+        return manifest
+
+    def fetch_blobs(self, repo, files, rev='HEAD'):
+        """Guarda no store os blobs de ``files`` (caminho -> hash em ``rev``) que ainda faltam.
+
+        Retorna o mapeamento (corrigido se um filtro de checkout alterou algum
+        conteúdo), quantos blobs foram baixados e quantos bytes.
+        """
+        missing = {}
+        for path, sha in files.items():
+            if sha not in missing and not self.has(sha):
+                missing[sha] = path
+        if not missing:
+            return files, 0, 0
+
+        # Checkout esparso só dos caminhos que faltam: o git busca esses blobs em lote
+        repo.git.config('core.autocrlf', 'false')
+        repo.git.config('core.sparseCheckout', 'true')
+        patterns = '\n'.join(_sparse_pattern(path) for path in missing.values())
+        (Path(repo.git_dir) / 'info').mkdir(exist_ok=True)
+        (Path(repo.git_dir) / 'info' / 'sparse-checkout').write_text(patterns + '\n', encoding='utf-8')
+        repo.git.read_tree('-mu', rev)
+
+        fetched_bytes = 0
+        for sha, path in missing.items():
+            data = (Path(repo.working_tree_dir) / path).read_bytes()
+            fetched_bytes += len(data)
+            stored = self.put(data)
+            if stored != sha:
+                # Filtros de checkout (ex.: .gitattributes) alteraram o conteúdo
+                files = {p: stored if s == sha else s for p, s in files.items()}
+        return files, len(missing), fetched_bytes
+
+    def materialize(self, files, target):
+        """Recria os arquivos em ``target`` a partir do store (link físico quando possível)"""
+        target = Path(target)
+        for path, sha in files.items():
+            destination = target / path
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(self._path('objects', sha), destination)
+            except OSError:
+                shutil.copyfile(self._path('objects', sha), destination)
+
+    def savings(self):
+        """Quanto a deduplicação economiza em disco, download e execução do CK"""
+        manifests = list(self.manifests())
+        references = Counter()
+        example_path = {}
+        totals = Counter()
+        for manifest in manifests:
+            totals['repositories'] += 1
+            totals['blobs_fetched'] += manifest.get('blobs_fetched', 0)
+            totals['bytes_fetched'] += manifest.get('bytes_fetched', 0)
+            totals['ck_files_analyzed'] += manifest.get('ck_files_analyzed', 0)
+            totals['ck_files_reused'] += manifest.get('ck_files_reused', 0)
+            for sha in set(manifest['files'].values()):
+                references[sha] += 1
+            for path, sha in manifest['files'].items():
+                totals['files'] += 1
+                example_path.setdefault(sha, path)
+
+        sizes = {sha: self.size(sha) for sha in references if self.has(sha)}
+        for manifest in manifests:
+            totals['logical_bytes'] += sum(sizes.get(sha, 0) for sha in manifest['files'].values())
+        totals['unique_blobs'] = len(references)
+        totals['stored_bytes'] = sum(sizes.values())
+        shared = [(count, sha, example_path[sha]) for sha, count in references.most_common(10) if count > 1]
+        return totals, shared
+
+
+def _percent(part, whole):
+    return f"{part / whole * 100:.1f}%" if whole else "-"
+
+
+def report(store):
+    totals, shared = store.savings()
+    if not totals['repositories']:
+        print(f"Nenhum manifesto em {store.root / 'manifests'}")
+        return
+
+    files, logical = totals['files'], totals['logical_bytes']
+    print(f"=== DEDUPLICAÇÃO DE FONTES JAVA ({totals['repositories']} repositórios) ===")
+    print(f"Arquivos .java referenciados: {files:,}")
+    print(f"Blobs distintos: {totals['unique_blobs']:,} "
+          f"({_percent(files - totals['unique_blobs'], files)} dos arquivos são duplicatas)")
+
+    print("\n💾 Disco")
+    print(f"  Sem deduplicação: {logical / 2 ** 20:,.1f} MB")
+    print(f"  No store: {totals['stored_bytes'] / 2 ** 20:,.1f} MB "
+          f"(economia de {_percent(logical - totals['stored_bytes'], logical)})")
+
+    print("\n⬇️ Clone")
+    print(f"  Blobs baixados: {totals['blobs_fetched']:,} de {files:,} arquivos "
+          f"({_percent(files - totals['blobs_fetched'], files)} não precisaram ser baixados)")
+    print(f"  Bytes baixados: {totals['bytes_fetched'] / 2 ** 20:,.1f} MB de {logical / 2 ** 20:,.1f} MB")
+
+    analyzed, reused = totals['ck_files_analyzed'], totals['ck_files_reused']
+    print("\n⚙️ CK")
+    print(f"  Arquivos analisados: {analyzed:,}; reaproveitados do store: {reused:,} "
+          f"({_percent(reused, analyzed + reused)} do trabalho evitado)")
+
+    if shared:
+        print("\n🔁 Blobs presentes em mais repositórios:")
+        for count, sha, path in shared:
+            print(f"  {count:4d} repositórios  {sha[:10]}  {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Economia do store de fontes Java deduplicado por hash de blob')
+    parser.add_argument('--root', default=BLOB_STORE_DIR,
+                        help='diretório do store (padrão: %(default)s)')
+    args = parser.parse_args(argv)
+    report(BlobStore(args.root))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import hashlib
+import inspect
+import json
+import types
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+import figures
+import render_pipeline
+from render_pipeline import render_figures
+from stats_engine import CACHE_DIR, ENGINE_VERSION
+
+MANIFEST_FILE = CACHE_DIR / 'build_manifest.json'
+# rcParams que não mudam o PNG gerado
+IGNORED_RC_PARAMS = {'backend', 'backend_fallback', 'interactive', 'savefig.directory'}
+README_FILE = Path('README.md')
+
+README_START = '<!-- stats:descritivas:inicio -->'
+README_END = '<!-- stats:descritivas:fim -->'
+
+# (coluna, rótulo, formato de média/mediana/desvio, formato de min/max)
+README_ROWS = [
+    ('stars', 'Stars', '{:,.0f}', '{:,.0f}'),
+    ('releases', 'Releases', '{:.1f}', '{:.0f}'),
+    ('idade_anos', 'Idade (anos)', '{:.1f}', '{:.1f}'),
+    ('cbo', 'CBO', '{:.1f}', '{:.1f}'),
+    ('dit', 'DIT', '{:.1f}', '{:.1f}'),
+    ('lcom', 'LCOM', '{:,.1f}', '{:,.1f}'),
+    ('loc', 'LOC', '{:.1f}', '{:.1f}'),
+]
+
+
+def _sha(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def code_fingerprint(func):
+    """Hash do código da função e das funções e constantes de figures.py que ela usa"""
+    sources = []
+    seen = set()
+    pending = [func]
+    while pending:
+        current = pending.pop()
+        if current.__name__ in seen:
+            continue
+        seen.add(current.__name__)
+        sources.append(inspect.getsource(current))
+        for name in current.__code__.co_names:
+            helper = getattr(figures, name, None)
+            if isinstance(helper, types.FunctionType) and helper.__module__ == figures.__name__:
+                pending.append(helper)
+            elif isinstance(helper, (int, float, str, tuple, list)):
+                sources.append(f'{name} = {helper!r}')
+    sources.append(inspect.getsource(figures.apply_style))
+    return _sha(*sorted(sources))
+
+
+def data_fingerprint(df, columns):
+    """Hash apenas das colunas das quais o gráfico depende"""
+    if columns is None:
+        columns = list(df.columns)
+    values = pd.util.hash_pandas_object(df[list(columns)], index=False)
+    return _sha(list(columns), hashlib.sha256(values.to_numpy().tobytes()).hexdigest())
+
+
+def style_fingerprint(style):
+    """Hash dos rcParams efetivos do estilo (mudam com a versão do matplotlib/seaborn)"""
+    with plt.rc_context():
+        figures.apply_style(style)
+        params = [(key, repr(plt.rcParams[key])) for key in sorted(plt.rcParams)
+                  if key not in IGNORED_RC_PARAMS]
+    return _sha(*params)
+
+
+def task_fingerprint(task, df, style_hash):
+    return _sha(ENGINE_VERSION, task.style, style_hash, render_pipeline.DPI, sorted(task.kwargs.items()),
+                code_fingerprint(task.func), data_fingerprint(df, task.columns))
+
+
+def load_manifest():
+    if MANIFEST_FILE.exists():
+        try:
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except Exception as e:
+            print(f"⚠️ Manifesto de build inválido ({e}), reconstruindo tudo...")
+    return {}
+
+
+def save_manifest(manifest):
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+
+def readme_table(stats_result):
+    """Gera a tabela de estatísticas descritivas citada no README"""
+    describe = stats_result['describe']
+    lines = [
+        '| Métrica               | Média | Mediana | Desvio Padrão | Min   | Max     |',
+        '| ---------------------- | ------ | ------- | -------------- | ----- | ------- |',
+    ]
+    for column, label, center_fmt, range_fmt in README_ROWS:
+        values = [center_fmt.format(describe.loc[key, column]) for key in ['mean', 'median', 'std']]
+        values += [range_fmt.format(describe.loc[key, column]) for key in ['min', 'max']]
+        lines.append(f"| **{label}** | " + ' | '.join(values) + ' |')
+    return '\n'.join(lines)
+
+
+def refresh_readme(stats_result, readme_path=README_FILE):
+    """Atualiza o trecho entre os marcadores do README; retorna True se mudou"""
+    if not readme_path.exists():
+        return False
+    text = readme_path.read_text(encoding='utf-8')
+    start = text.find(README_START)
+    end = text.find(README_END)
+    if start == -1 or end == -1:
+        print(f"⚠️ Marcadores de estatísticas não encontrados em {readme_path}")
+        return False
+
+    block = f"{README_START}\n{readme_table(stats_result)}\n{README_END}"
+    updated = text[:start] + block + text[end + len(README_END):]
+    if updated == text:
+        return False
+    readme_path.write_text(updated, encoding='utf-8')
+    return True
+
+
+def build(tasks, df, stats_result, headless=False, workers=None, force=False, readme=True):
+    """Gera apenas os gráficos desatualizados e atualiza as tabelas do README.
+
+    Um gráfico está desatualizado quando o PNG não existe ou quando muda o
+    hash das colunas que ele usa, o código da função que o desenha (incluindo
+    os auxiliares de figures.py), seus parâmetros, o DPI ou os rcParams do estilo.
+    """
+    manifest = load_manifest()
+    styles = {style: style_fingerprint(style) for style in {task.style for task in tasks}}
+    fingerprints = {task.output: task_fingerprint(task, df, styles[task.style]) for task in tasks}
+
+    outdated = [
+        task for task in tasks
+        if force or not Path(task.output).exists() or manifest.get(task.output) != fingerprints[task.output]
+    ]
+    print(f"🔧 {len(outdated)} de {len(tasks)} gráficos desatualizados")
+
+    timings = {}
+    if outdated:
+        timings = render_figures(outdated, headless=headless, workers=workers,
+                                 data=(df, stats_result))
+        for output in timings:
+            manifest[output] = fingerprints[output]
+        save_manifest(manifest)
+
+    if readme:
+        if refresh_readme(stats_result):
+            print(f"📝 Estatísticas atualizadas em {README_FILE}")
+        else:
+            print(f"📝 {README_FILE} já está atualizado")
+
+    return timings
@@ -0,0 +1,205 @@
+import argparse
+import concurrent.futures
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from online_stats import OnlineStatistics, QuantileSketch
+from repository_store import GROUP_LABELS
+from stats_engine import DATA_FILE, load_dataset
+
+CLASS_METRICS_DIR = 'class_metrics'
+OUTPUT_DIR = Path('results/class_level')
+
+CLASS_METRICS = ['cbo', 'dit', 'lcom', 'loc']
+PROCESS_METRICS = ['stars', 'log_stars', 'releases', 'idade_anos']
+ALL_METRICS = PROCESS_METRICS + CLASS_METRICS
+
+# Linhas lidas por vez de cada CSV de classes; limita a memória por worker
+CHUNK_ROWS = 200_000
+
+GROUPINGS = list(GROUP_LABELS)
+
+
+def repository_table(csv_path=DATA_FILE):
+    """Métricas de processo por repositório e os grupos (quartil, idade, releases) de cada um"""
+    # Os grupos já vêm pré-calculados pelo store (repository_store.py)
+    repos = load_dataset(csv_path)[['repo'] + PROCESS_METRICS + GROUPINGS]
+    for grouping in GROUPINGS:
+        repos[grouping] = repos[grouping].astype(str)
+    # Os arquivos de classes são salvos como owner_nome (ver RepositoryAnalyzer)
+    repos['file_key'] = repos['repo'].str.replace('/', '_', regex=False)
+    return repos.set_index('file_key')
+
+
+def _new_accumulators():
+    return {
+        'overall': OnlineStatistics(ALL_METRICS),
+        'groups': {grouping: {} for grouping in GROUPINGS},
+    }
+
+
+def merge_accumulators(target, source):
+    target['overall'].merge(source['overall'])
+    for grouping, groups in source['groups'].items():
+        for label, stats in groups.items():
+            if label in target['groups'][grouping]:
+                target['groups'][grouping][label].merge(stats)
+            else:
+                target['groups'][grouping][label] = stats
+    return target
+
+
+def analyze_class_file(path, repo):
+    """Processa o CSV de classes de um repositório em blocos.
+
+    ``repo`` é a linha do repositório em repository_table. Os valores de
+    processo são constantes dentro do arquivo e são repetidos em cada bloco
+    só para as covariâncias classe x processo.
+    """
+    accumulators = _new_accumulators()
+    process_values = np.array([repo[col] for col in PROCESS_METRICS], dtype=np.float64)
+    rows = 0
+
+    for chunk in pd.read_csv(path, usecols=lambda col: col in CLASS_METRICS, chunksize=CHUNK_ROWS):
+        class_values = chunk.reindex(columns=CLASS_METRICS).apply(pd.to_numeric, errors='coerce')
+        values = np.empty((len(chunk), len(ALL_METRICS)))
+        values[:, :len(PROCESS_METRICS)] = process_values
+        values[:, len(PROCESS_METRICS):] = class_values.to_numpy(dtype=np.float64)
+
+        accumulators['overall'].update_many(values)
+        rows += len(chunk)
+
+    for grouping in GROUPINGS:
+        accumulators['groups'][grouping][repo[grouping]] = _copy_class_part(accumulators['overall'])
+    return accumulators, rows
+
+
+def _copy_class_part(stats):
+    """Acumulador só com as métricas de classe, para as tabelas por grupo"""
+    part = OnlineStatistics(CLASS_METRICS)
+    offset = len(PROCESS_METRICS)
+    for i in range(len(CLASS_METRICS)):
+        j = i + offset
+        part.count[i] = stats.count[j]
+        part.mean[i] = stats.mean[j]
+        part.m2[i] = stats.m2[j]
+        part.min[i] = stats.min[j]
+        part.max[i] = stats.max[j]
+        part.sketches[i] = QuantileSketch.from_dict(stats.sketches[j].to_dict())
+    part.complete_count = stats.complete_count
+    part.complete_mean = stats.complete_mean[offset:]
+    part.comoment = [row[offset:] for row in stats.comoment[offset:]]
+    return part
+
+
+def _analyze_files(items):
+    """Worker: processa um lote de arquivos e devolve os acumuladores já mesclados"""
+    accumulators = _new_accumulators()
+    rows = 0
+    for path, repo in items:
+        try:
+            partial, partial_rows = analyze_class_file(path, repo)
+            merge_accumulators(accumulators, partial)
+            rows += partial_rows
+        except Exception as e:
+            print(f"⚠️ Erro ao processar {path}: {e}")
+    return accumulators, rows
+
+
+def run_class_analysis(class_dir=CLASS_METRICS_DIR, csv_path=DATA_FILE, workers=None):
+    """Agrega todos os CSVs de classes com memória limitada e em paralelo.
+
+    Cada worker lê arquivos inteiros em blocos de CHUNK_ROWS linhas e mantém
+    apenas acumuladores (OnlineStatistics), que são mesclados no final; a
+    memória não depende do número total de classes.
+    """
+    repos = repository_table(csv_path)
+    files = sorted(Path(class_dir).glob('*.csv'))
+    items = [(str(path), repos.loc[path.stem].to_dict()) for path in files if path.stem in repos.index]
+    skipped = len(files) - len(items)
+    print(f"📂 {len(items)} arquivos de classes ({skipped} sem métricas de processo correspondentes)")
+    if not items:
+        return None
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(items)))
+    batches = [items[i::workers] for i in range(workers)]
+
+    start = time.perf_counter()
+    accumulators = _new_accumulators()
+    total_rows = 0
+    if workers == 1:
+        accumulators, total_rows = _analyze_files(items)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for partial, rows in executor.map(_analyze_files, batches):
+                merge_accumulators(accumulators, partial)
+                total_rows += rows
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ {total_rows:,} classes processadas em {elapsed:.2f}s com {workers} processos")
+    return accumulators
+
+
+def group_table(groups, labels):
+    """Média, mediana e percentis por grupo para cada métrica de classe"""
+    rows = []
+    for label in labels:
+        if label not in groups:
+            continue
+        describe = groups[label].describe()
+        for metric in CLASS_METRICS:
+            row = describe.loc[metric]
+            rows.append({'grupo': label, 'metrica': metric, 'classes': int(row['count']),
+                         'media': row['mean'], 'mediana': row['median'],
+                         'p75': row['p75'], 'p90': row['p90'], 'max': row['max']})
+    return pd.DataFrame(rows)
+
+
+def report(accumulators, output_dir=OUTPUT_DIR):
+    """Imprime e salva as tabelas da análise por classe (RQ01–RQ04)"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    overall = accumulators['overall']
+
+    print("\n=== ESTATÍSTICAS DESCRITIVAS (NÍVEL DE CLASSE) ===")
+    describe = overall.describe().loc[CLASS_METRICS]
+    print(describe.round(2))
+    describe.to_csv(output_dir / 'descritivas.csv')
+
+    print("\n=== CORRELAÇÕES CLASSE x PROCESSO (RQ01–RQ04) ===")
+    corr = overall.correlation_matrix()
+    rq_corr = corr.loc[PROCESS_METRICS + ['loc'], CLASS_METRICS]
+    print(rq_corr.round(3))
+    rq_corr.to_csv(output_dir / 'correlacoes.csv')
+
+    for grouping in GROUPINGS:
+        table = group_table(accumulators['groups'][grouping], GROUP_LABELS[grouping])
+        print(f"\n=== MÉTRICAS DE CLASSE POR {grouping.upper()} ===")
+        print(table.round(2).to_string(index=False))
+        table.to_csv(output_dir / f'por_{grouping}.csv', index=False)
+
+    print(f"\n💾 Tabelas salvas em {output_dir}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Análise das métricas CK por classe, fora da memória e em paralelo')
+    parser.add_argument('--class-dir', default=CLASS_METRICS_DIR,
+                        help='diretório com um CSV de classes do CK por repositório')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='número de processos (padrão: núcleos disponíveis)')
+    args = parser.parse_args(argv)
+
+    accumulators = run_class_analysis(args.class_dir, workers=args.workers)
+    if accumulators is None:
+        print("Nenhum arquivo de classes encontrado.")
+        return
+    report(accumulators)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from online_stats import SKETCH_ACCURACY, QuantileSketch
+from repository_store import GROUP_LABELS, RUN_FILE, normalize_key, open_store
+
+SKETCH_METRICS = ['cbo', 'dit', 'lcom', 'loc']
+
+# Limites fixos e iguais para todos os repositórios, para que os histogramas possam ser somados
+HISTOGRAM_EDGES = np.array([0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300,
+                            500, 1000, 2000, 5000, 10000, np.inf])
+DEFAULT_QUANTILES = [0.5, 0.9, 0.99]
+
+CLASS_METRICS_DIR = 'class_metrics'
+
+# Tabelas já carregadas neste processo, por caminho: (mtime_ns, tamanho, tabela)
+_loaded = {}
+_append_lock = threading.Lock()
+
+
+def sketch_path_for(results_path):
+    """Arquivo de sketches ao lado do CSV de resultados (ex.: resultados.sketches.jsonl)"""
+    return Path(results_path).with_suffix('.sketches.jsonl')
+
+
+def histogram(values):
+    """Contagem por faixa de HISTOGRAM_EDGES (valores negativos entram na primeira)"""
+    bins = np.clip(np.searchsorted(HISTOGRAM_EDGES, values, side='right') - 1, 0, len(HISTOGRAM_EDGES) - 2)
+    return np.bincount(bins, minlength=len(HISTOGRAM_EDGES) - 1)
+
+
+def build_sketches(df, metrics=SKETCH_METRICS):
+    """Sketch de quantis e histograma das métricas por classe de um repositório"""
+    sketches = {}
+    for metric in metrics:
+        if metric not in df.columns:
+            continue
+        values = pd.to_numeric(df[metric], errors='coerce').to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        sketch = QuantileSketch()
+        sketch.add_many(values)
+        sketches[metric] = {'sketch': sketch.to_dict(), 'histogram': histogram(values).tolist()}
+    return sketches
+
+
+def append_sketches(path, name, sketches):
+    """Acrescenta os sketches de um repositório ao JSONL (a última linha de cada um prevalece)"""
+    line = json.dumps({'full_name': name, 'metrics': sketches}, separators=(',', ':'))
+    with _append_lock, open(path, 'a', encoding='utf-8') as file:
+        file.write(line + '\n')
+
+
+def _dense(entries):
+    """Buckets de todos os repositórios em matrizes (repositório x bucket) para somas vetorizadas"""
+    n = len(entries)
+    data = {'zero': np.zeros(n, dtype=np.int64), 'count': np.zeros(n, dtype=np.int64),
+            'histogram': np.zeros((n, len(HISTOGRAM_EDGES) - 1), dtype=np.int64)}
+    for side in ('positive', 'negative'):
+        keys = [int(key) for entry in entries if entry for key in entry['sketch'][side]]
+        offset = min(keys, default=0)
+        matrix = np.zeros((n, max(keys, default=-1) - offset + 1), dtype=np.int32)
+        for i, entry in enumerate(entries):
+            if entry:
+                for key, count in entry['sketch'][side].items():
+                    matrix[i, int(key) - offset] = count
+        data[side] = matrix
+        data[f'{side}_offset'] = offset
+    for i, entry in enumerate(entries):
+        if entry:
+            data['zero'][i] = entry['sketch']['zero_count']
+            data['count'][i] = entry['sketch']['count']
+            data['histogram'][i] = entry['histogram']
+    return data
+
+
+class SketchTable:
+    """Sketches por repositório prontos para mesclar qualquer subconjunto.
+
+    Os buckets de cada métrica ficam em matrizes densas; mesclar N
+    repositórios é uma soma de N linhas, e o resultado é um QuantileSketch
+    igual ao que seria obtido com todas as classes desses repositórios.
+    """
+
+    def __init__(self, records):
+        self.keys = list(records)
+        self.row_of = {key: i for i, key in enumerate(self.keys)}
+        self.data = {metric: _dense([records[key].get(metric) for key in self.keys])
+                     for metric in SKETCH_METRICS}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rows_for(self, names):
+        """Linhas da tabela para os repositórios (owner/nome) que têm sketches"""
+        rows = (self.row_of.get(normalize_key(name), -1) for name in names)
+        return np.array([row for row in rows if row >= 0], dtype=np.int64)
+
+    def merged(self, metric, rows):
+        """QuantileSketch e histograma mesclados das linhas ``rows``"""
+        data = self.data[metric]
+        sketch = QuantileSketch(SKETCH_ACCURACY)
+        for side in ('positive', 'negative'):
+            counts = data[side][rows].sum(axis=0, dtype=np.int64)
+            nonzero = np.flatnonzero(counts)
+            setattr(sketch, side, dict(zip((nonzero + data[f'{side}_offset']).tolist(),
+                                           counts[nonzero].tolist())))
+        sketch.zero_count = int(data['zero'][rows].sum())
+        sketch.count = int(data['count'][rows].sum())
+        return sketch, data['histogram'][rows].sum(axis=0)
+
+    def distribution(self, metric, rows, quantiles=DEFAULT_QUANTILES):
+        sketch, counts = self.merged(metric, rows)
+        return {
+            'repos': len(rows),
+            'classes': sketch.count,
+            'quantiles': {str(q): sketch.quantile(q) if sketch.count else None for q in quantiles},
+            'histogram': {_bin_label(i): int(count) for i, count in enumerate(counts)},
+        }
+
+
+def _bin_label(i):
+    low, high = HISTOGRAM_EDGES[i], HISTOGRAM_EDGES[i + 1]
+    return f'{low:g}+' if np.isinf(high) else f'{low:g}-{high:g}'
+
+
+def load_sketch_table(path):
+    """SketchTable do JSONL, reaproveitada enquanto o arquivo não muda"""
+    path = Path(path)
+    stat = path.stat()
+    key = str(path.resolve())
+    loaded = _loaded.get(key)
+    if loaded and loaded[0] == stat.st_mtime_ns and loaded[1] == stat.st_size:
+        return loaded[2]
+
+    records = {}
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                records[normalize_key(record['full_name'])] = record['metrics']
+    table = SketchTable(records)
+    _loaded[key] = (stat.st_mtime_ns, stat.st_size, table)
+    return table
+
+
+def backfill(sketch_path, class_dir=CLASS_METRICS_DIR):
+    """Gera sketches a partir dos CSVs guardados em class_metrics/ para os repositórios sem sketch"""
+    done = set(load_sketch_table(sketch_path).keys) if os.path.exists(sketch_path) else set()
+    store = open_store()
+    by_stem = {key.replace('/', '_'): key for key in store.table['key'].tolist()}
+    added = 0
+    for path in sorted(Path(class_dir).glob('*.csv')):
+        key = by_stem.get(path.stem.lower())
+        if key is None or key in done:
+            continue
+        try:
+            df = pd.read_csv(path, usecols=lambda col: col in SKETCH_METRICS)
+        except Exception as e:
+            print(f"⚠️ Erro ao ler {path}: {e}")
+            continue
+        append_sketches(sketch_path, key, build_sketches(df))
+        added += 1
+    print(f"🧮 Sketches gerados para {added} repositórios a partir de {class_dir}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Percentis e histogramas por classe mesclando os sketches de grupos de repositórios')
+    parser.add_argument('--results', default=RUN_FILE,
+                        help='CSV do analisador; os sketches ficam ao lado (padrão: %(default)s)')
+    parser.add_argument('--by', choices=list(GROUP_LABELS), default='stars_quartile',
+                        help='agrupamento do store (padrão: %(default)s)')
+    parser.add_argument('--repo', action='append', default=[],
+                        help='em vez dos grupos, mescla só estes repositórios (owner/nome); pode repetir')
+    parser.add_argument('--metric', action='append', choices=SKETCH_METRICS,
+                        help='métrica (padrão: todas); pode repetir')
+    parser.add_argument('--quantiles', type=float, nargs='+', default=DEFAULT_QUANTILES)
+    parser.add_argument('--histogram', action='store_true', help='mostra também os histogramas')
+    parser.add_argument('--backfill', action='store_true',
+                        help='gera sketches a partir de class_metrics/ antes de consultar')
+    args = parser.parse_args(argv)
+
+    sketch_path = sketch_path_for(args.results)
+    if args.backfill:
+        backfill(sketch_path)
+    if not sketch_path.exists():
+        print(f"Arquivo {sketch_path} não encontrado (execute o analisador ou use --backfill).")
+        return
+
+    start = time.perf_counter()
+    table = load_sketch_table(sketch_path)
+    print(f"📦 Sketches de {len(table)} repositórios carregados em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if args.repo:
+        subsets = {'seleção': table.rows_for(args.repo)}
+    else:
+        store = open_store()
+        keys = store.table['key']
+        subsets = {label: table.rows_for(keys[store.rows_for(args.by, label)].tolist())
+                   for label in GROUP_LABELS[args.by]}
+        subsets['todos'] = np.arange(len(table))
+
+    for metric in args.metric or SKETCH_METRICS:
+        print(f"\n=== {metric.upper()} POR CLASSE ===")
+        print(f"{'grupo':<20}{'repos':>7}{'classes':>11}" + ''.join(f"{f'p{q * 100:g}':>10}" for q in args.quantiles)
+              + f"{'ms':>8}")
+        for label, rows in subsets.items():
+            start = time.perf_counter()
+            result = table.distribution(metric, rows, args.quantiles)
+            elapsed = (time.perf_counter() - start) * 1000
+            values = ''.join(f"{value:>10.1f}" if value is not None else f"{'-':>10}"
+                             for value in result['quantiles'].values())
+            print(f"{label:<20}{result['repos']:>7}{result['classes']:>11,}{values}{elapsed:>8.2f}")
+            if args.histogram:
+                print('    ' + '  '.join(f"{bin_label}: {count}" for bin_label, count in result['histogram'].items()))
+
+
+if __name__ == "__main__":
+    main()
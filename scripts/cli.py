@@ -0,0 +1,164 @@
+import argparse
+import csv
+import importlib
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Cada subcomando aponta para o módulo que o implementa; o módulo só é
+# importado quando o subcomando é executado, então pandas, matplotlib,
+# scipy e GitPython não pesam na inicialização dos demais comandos.
+COMMANDS = {
+    'collect': ('collect_repositories', 'coleta os repositórios Java mais populares (GitHub GraphQL)'),
+    'plan': ('search_planner', 'partições da busca (estrelas x criação) para passar de 1000 resultados'),
+    'analyze': ('clone_and_analyze', 'clona os repositórios restantes e mede a qualidade com o CK'),
+    'revisions': ('revision_analysis', 'métricas do CK em várias tags de cada repositório (um clone)'),
+    'stats': ('stats_engine', 'estatísticas descritivas e correlações'),
+    'plots': (None, 'gera os gráficos (analysis.py e graficos_detalhados.py)'),
+    'resources': ('resource_report', 'uso de CPU, memória e E/S do CK x tamanho dos repositórios'),
+    'fetch': ('archive_fetch', 'compara o clone git com o download do tar.gz só com .java'),
+    'blobs': ('blob_store', 'economia do store de fontes Java deduplicado (disco, clone e CK)'),
+    'classes': ('class_analysis', 'análise por classe a partir dos CSVs do CK'),
+    'sketches': ('class_sketches', 'percentis por classe em grupos de repositórios (sketches mescláveis)'),
+    'snapshots': ('snapshot_store', 'histórico comprimido das coletas e análises'),
+    'store': ('repository_store', 'store unificado dos repositórios (consulta e reconstrução)'),
+    'serve': ('query_server', 'serviço HTTP local de consultas (filtros, grupos, correlações)'),
+    'bench': ('benchmark', 'benchmark com datasets sintéticos (1k a 10M linhas)'),
+    'status': (None, 'resumo rápido dos dados, do progresso e dos caches'),
+}
+
+PLOT_SETS = {
+    'analysis': 'analysis',
+    'detalhados': 'graficos_detalhados',
+}
+
+# Caminhos repetidos aqui (em vez de importados) para que `status` não
+# carregue NumPy/pandas; devem acompanhar os de repository_store.py e stats_engine.py
+COLLECTOR_FILE = Path('results/top_1000_java_repos_metrics.csv')
+RESULTS_FILE = Path('results/repository_analysis_results.csv')
+RUN_FILE = Path('repository_analysis_results.csv')
+CACHE_DIR = Path('results/cache')
+CLASS_METRICS_DIR = Path('class_metrics')
+
+
+def _count_rows(path):
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        return sum(1 for _ in csv.reader(file)) - 1
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_state(csv_path, suffix):
+    """'atualizado', 'desatualizado' ou 'ausente' para o cache binário ou o store de um CSV"""
+    meta = _read_json(csv_path.with_name(f'.{csv_path.name}.{suffix}') / 'meta.json')
+    if meta is None:
+        return 'ausente'
+    if suffix == 'store':
+        return f"{meta.get('rows', '?')} linhas"
+    stat = csv_path.stat()
+    fresh = meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size
+    return 'atualizado' if fresh else 'desatualizado'
+
+
+def status(argv=None):
+    """Resumo do estado do projeto usando apenas a biblioteca padrão"""
+    argparse.ArgumentParser(prog='cli.py status',
+                            description=COMMANDS['status'][1]).parse_args(argv)
+    start = time.perf_counter()
+
+    print("📋 DADOS")
+    for label, path in (('Coletor', COLLECTOR_FILE), ('Resultados CK', RESULTS_FILE)):
+        if path.exists():
+            print(f"  {label}: {_count_rows(path)} repositórios em {path} "
+                  f"(cache: {_cache_state(path, 'cache')})")
+        else:
+            print(f"  {label}: {path} não encontrado")
+    if RESULTS_FILE.exists():
+        print(f"  Store unificado: {_cache_state(RESULTS_FILE, 'store')}")
+
+    print("\n🔄 ANÁLISE COM O CK")
+    if RUN_FILE.exists():
+        with open(RUN_FILE, 'r', encoding='utf-8', newline='') as file:
+            statuses = Counter(row.get('analysis_status') or '?' for row in csv.DictReader(file))
+        analyzed = sum(statuses.values())
+        total = _count_rows(COLLECTOR_FILE) if COLLECTOR_FILE.exists() else 0
+        progress = f" de {total} ({analyzed / total * 100:.1f}%)" if total else ""
+        print(f"  Analisados: {analyzed}{progress}")
+        for name, count in statuses.most_common():
+            print(f"    {name}: {count}")
+        online = _read_json(RUN_FILE.with_suffix('.online.json'))
+        if online:
+            print(f"  Estatísticas online: {online['complete_count']} repositórios acumulados")
+    else:
+        print(f"  Nenhuma execução encontrada ({RUN_FILE})")
+    if CLASS_METRICS_DIR.exists():
+        print(f"  CSVs por classe: {sum(1 for _ in CLASS_METRICS_DIR.glob('*.csv'))} em {CLASS_METRICS_DIR}")
+
+    # snapshot_store só usa a biblioteca padrão
+    from snapshot_store import SNAPSHOT_DIR, _scan
+
+    print("\n🗂️ SNAPSHOTS")
+    logs = sorted(SNAPSHOT_DIR.glob('*.log')) if SNAPSHOT_DIR.exists() else []
+    for path in logs:
+        print(f"  {path.stem}: {len(_scan(path))} snapshot(s), {path.stat().st_size:,} bytes")
+    if not logs:
+        print(f"  Nenhum snapshot em {SNAPSHOT_DIR}")
+
+    print("\n🗄️ CACHES")
+    if CACHE_DIR.exists():
+        for pattern, label in (('stats_v*.npz', 'Estatísticas'), ('inference_v*.csv', 'Inferência')):
+            print(f"  {label}: {sum(1 for _ in CACHE_DIR.glob(pattern))} arquivo(s)")
+        manifest = _read_json(CACHE_DIR / 'build_manifest.json') or {}
+        built = sum(1 for output in manifest if Path(output).exists())
+        print(f"  Gráficos no manifesto de build: {built} presentes de {len(manifest)}")
+    else:
+        print(f"  {CACHE_DIR} vazio")
+
+    print(f"\n⏱️ status em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def plots(argv=None):
+    """Gera os gráficos de um conjunto (ou de todos), repassando as opções de renderização"""
+    parser = argparse.ArgumentParser(prog='cli.py plots', description=COMMANDS['plots'][1],
+                                     epilog='Demais opções (--headless, --workers, --force) '
+                                            'são repassadas aos scripts de gráficos.')
+    parser.add_argument('--set', choices=['all'] + list(PLOT_SETS), default='all',
+                        help='conjunto de gráficos (padrão: %(default)s)')
+    parser.add_argument('--resamples', type=int,
+                        help='reamostragens de bootstrap e permutação (só o conjunto analysis)')
+    args, rest = parser.parse_known_args(argv)
+
+    names = list(PLOT_SETS) if args.set == 'all' else [args.set]
+    for name in names:
+        # graficos_detalhados.py não faz inferência e rejeitaria a opção
+        extra = ['--resamples', str(args.resamples)] if name == 'analysis' and args.resamples else []
+        importlib.import_module(PLOT_SETS[name]).main(rest + extra)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cli.py', description='Análise de qualidade de repositórios Java populares')
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='comando')
+    for name, (_, help_text) in COMMANDS.items():
+        # Sem ajuda própria: '--help' e as opções seguem para o main() do subcomando
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command == 'status':
+        return status(rest)
+    if args.command == 'plots':
+        return plots(rest)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    return module.main(rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,127 @@
+import argparse
 import os
 import csv
+import json
 import subprocess
 import shutil
 import time
 from pathlib import Path
-from git import Repo
 import pandas as pd
 import stat
 import concurrent.futures
 from datetime import datetime
 import threading
+from archive_fetch import ARCHIVE_BASE_URL, archive_url, fetch_archive
+from blob_store import BLOB_STORE_DIR, BlobStore
+from class_sketches import append_sketches, build_sketches, sketch_path_for
+from dataset_cache import SCHEMAS, load_arrays, load_records
+from online_stats import OnlineStatistics
+from process_monitor import count_files, run_with_accounting
+from snapshot_store import safe_record_snapshot
 
 class RepositoryAnalyzer:
     def __init__(self,
                  repos_csv_file="top_1000_java_repos_metrics.csv",
                  clone_dir="repositories",
                  ck_jar_path=r"Z:\ws-PUC\lab-exp-med\ck\target\ck-0.7.1-SNAPSHOT-jar-with-dependencies.jar",
-                 results_file="repository_analysis_results.csv"):
+                 results_file="repository_analysis_results.csv",
+                 class_metrics_dir="class_metrics",
+                 blob_store_dir=None,
+                 fetch_mode="git",
+                 archive_base_url=ARCHIVE_BASE_URL):
         self.repos_csv_file = repos_csv_file
         self.clone_dir = Path(clone_dir)
         self.clone_dir.mkdir(exist_ok=True)
         self.results = []
         self.results_file = results_file
         self.ck_jar_path = Path(ck_jar_path)
+        self.class_metrics_dir = Path(class_metrics_dir)
+        self.class_metrics_dir.mkdir(exist_ok=True)
+        self.online_stats_file = Path(results_file).with_suffix(".online.json")
+        # Sketches mescláveis das métricas por classe de cada repositório (consultados por class_sketches.py)
+        self.sketches_file = sketch_path_for(results_file)
+        self.online_stats = self.load_online_statistics()
+        # Com o blob store, fontes e linhas do CK de arquivos idênticos são compartilhadas entre repositórios
+        self.blob_store = BlobStore(blob_store_dir) if blob_store_dir else None
+        # "git": clone raso completo; "archive": tar.gz em streaming, gravando só os .java
+        self.fetch_mode = fetch_mode
+        self.archive_base_url = archive_base_url
 
     def handle_remove_readonly(self, func, path, exc_info):
         """Força a remoção de arquivos somente leitura no Windows"""
         os.chmod(path, stat.S_IWRITE)
         func(path)
 
+    def load_online_statistics(self):
+        """Carrega o acumulador online; na primeira vez, semeia a partir dos resultados já salvos"""
+        if self.online_stats_file.exists() or not os.path.exists(self.results_file):
+            return OnlineStatistics.load(self.online_stats_file)
+
+        online_stats = OnlineStatistics()
+        try:
+            with open(self.results_file, 'r', encoding='utf-8') as file:
+                for row in csv.DictReader(file):
+                    if row.get("analysis_status") == "success":
+                        online_stats.update(row)
+            online_stats.save(self.online_stats_file)
+            print(f"📈 Estatísticas online iniciadas com {online_stats.complete_count} resultados existentes")
+        except Exception as e:
+            print(f"⚠️ Erro ao iniciar estatísticas online: {e}")
+        return online_stats
+
+    def record_online(self, result):
+        """Atualiza e persiste as estatísticas online com um resultado bem-sucedido"""
+        if result.get("analysis_status") != "success":
+            return
+        self.online_stats.update(result)
+        self.online_stats.save(self.online_stats_file)
+
+    def record_sketches(self, result):
+        """Retira os sketches por classe do resultado (não vão para o CSV) e os acrescenta ao JSONL"""
+        sketches = result.pop("class_sketches", None)
+        if sketches and result.get("analysis_status") == "success":
+            append_sketches(self.sketches_file, result["full_name"], sketches)
+
+    def print_online_statistics(self):
+        """Mostra as estatísticas atuais sem reprocessar o CSV de resultados"""
+        describe = self.online_stats.describe()
+        print(f"\n📈 Estatísticas online ({self.online_stats.complete_count} repositórios):")
+        print(describe[["count", "mean", "median", "std", "min", "max"]].round(2))
+
+        corr = self.online_stats.correlation_matrix()
+        process = ["stars", "releases", "age_years", "total_loc"]
+        quality = ["avg_cbo", "avg_dit", "avg_lcom", "avg_loc_per_class"]
+        print("\nCorrelação (processo x qualidade):")
+        print(corr.loc[process, quality].round(3))
+
     def load_repositories(self):
-        """Carrega a lista de repositórios do arquivo CSV"""
+        """Carrega a lista de repositórios do arquivo CSV (via cache binário tipado)"""
         if not os.path.exists(self.repos_csv_file):
             print(f"Arquivo {self.repos_csv_file} não encontrado.")
             return []
 
-        repos = []
-        with open(self.repos_csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                repos.append(row)
+        repos = load_records(self.repos_csv_file)
 
         print(f"Carregados {len(repos)} repositórios do arquivo CSV")
         return repos
-    
+
+    def analyzed_repositories(self):
+        """Conjunto de repositórios já presentes no arquivo de resultados"""
+        if not os.path.exists(self.results_file):
+            return set()
+        try:
+            return set(load_arrays(self.results_file, ["full_name"], schema=SCHEMAS["run"])["full_name"].tolist())
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar resultados existentes: {e}")
+            return set()
+
     def get_remaining_repositories(self, num_repos=100):
         """Retorna repositórios que ainda não foram analisados"""
         all_repos = self.load_repositories()
         
-        analyzed_repos = set()
-        if os.path.exists(self.results_file):
-            try:
-                with open(self.results_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    analyzed_repos = {row['full_name'] for row in reader}
-                print(f"✅ {len(analyzed_repos)} repositórios já analisados")
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar resultados existentes: {e}")
+        analyzed_repos = self.analyzed_repositories()
+        if analyzed_repos:
+            print(f"✅ {len(analyzed_repos)} repositórios já analisados")
         
         remaining_repos = []
         for repo in all_repos:
@@ -75,6 +140,9 @@ class RepositoryAnalyzer:
             shutil.rmtree(repo_path, onerror=self.handle_remove_readonly)
 
         try:
+            # Importado aqui: o GitPython só é necessário durante os clones
+            from git import Repo
+
             print(f"Clonando {repo_name}...")
 
             Repo.clone_from(repo_url, repo_path, depth=1, single_branch=True)
@@ -84,6 +152,115 @@ class RepositoryAnalyzer:
             print(f"✗ Erro ao clonar {repo_name}: {e}")
             return None
 
+    def download_archive(self, full_name, repo_name):
+        """Baixa o tar.gz do branch padrão em streaming e extrai apenas os arquivos .java"""
+        repo_path = self.clone_dir / repo_name
+
+        if repo_path.exists():
+            shutil.rmtree(repo_path, onerror=self.handle_remove_readonly)
+
+        try:
+            print(f"Baixando {repo_name} (tar.gz, só .java)...")
+            stats = fetch_archive(archive_url(full_name, self.archive_base_url), repo_path)
+            print(f"✓ {repo_name}: {stats['files']} arquivos .java, "
+                  f"{stats['bytes_written'] / 2 ** 20:.1f} MB gravados, "
+                  f"{stats['bytes_downloaded'] / 2 ** 20:.1f} MB baixados em {stats['seconds']:.1f}s")
+            return repo_path
+        except Exception as e:
+            print(f"✗ Erro ao baixar {repo_name}: {e}")
+            shutil.rmtree(repo_path, ignore_errors=True)
+            return None
+
+    def clone_deduplicated(self, repo_url, repo_name):
+        """Clone parcial via blob store; em disco ficam só os arquivos ainda sem linhas do CK"""
+        repo_path = self.clone_dir / repo_name
+        if repo_path.exists():
+            shutil.rmtree(repo_path, onerror=self.handle_remove_readonly)
+
+        try:
+            print(f"Clonando {repo_name} (parcial, via blob store)...")
+            manifest = self.blob_store.fetch_repository(repo_url, self.clone_dir / f".{repo_name}.partial")
+        except Exception as e:
+            print(f"✗ Erro ao clonar {repo_name}: {e}")
+            return None, None
+
+        # Um caminho por blob: cópias dentro do mesmo repositório também são analisadas uma vez
+        pending = {}
+        for path, sha in manifest["files"].items():
+            if sha not in pending and not self.blob_store.has_rows(sha):
+                pending[sha] = path
+        repo_path.mkdir(parents=True)
+        self.blob_store.materialize({path: sha for sha, path in pending.items()}, repo_path)
+
+        print(f"✓ {repo_name} clonado: {len(manifest['files'])} arquivos .java, "
+              f"{manifest['blobs_fetched']} blobs baixados, {len(pending)} para o CK")
+        return repo_path, manifest
+
+    def store_ck_rows(self, repo_path, manifest):
+        """Guarda no blob store as linhas do CK de cada arquivo analisado nesta execução"""
+        df = pd.read_csv(repo_path / "ck_results.csvclass.csv")
+        if "file" not in df.columns:
+            print(f"⚠ CSV do CK sem a coluna 'file'; linhas de {repo_path.name} não reaproveitáveis")
+            return False
+
+        root = repo_path.resolve()
+        paths = pd.Series([Path(os.path.relpath(file, root)).as_posix() for file in df["file"]],
+                          index=df.index)
+        rows_by_path = {path: group.drop(columns="file")
+                        for path, group in df.groupby(paths, sort=False)}
+        for path, sha in manifest["files"].items():
+            if not (repo_path / path).exists():
+                continue
+            group = rows_by_path.get(path)
+            # Arquivos sem classes (ex.: package-info.java) ficam com uma lista vazia
+            rows = [] if group is None else json.loads(group.to_json(orient="records"))
+            self.blob_store.save_rows(sha, rows)
+        return True
+
+    def analyze_pending_blobs(self, repo_path, manifest):
+        """Roda o CK nos arquivos materializados em ``repo_path`` e guarda as linhas no blob store.
+
+        Retorna (arquivos analisados, uso de recursos do CK), ou (n, None) em caso de falha.
+        """
+        analyzed = sum(1 for path in manifest["files"] if (repo_path / path).exists())
+        if not analyzed:
+            return 0, {}
+        ck_metrics = self.analyze_repository_with_ck(repo_path)
+        if not ck_metrics or not self.store_ck_rows(repo_path, manifest):
+            return analyzed, None
+        return analyzed, {key: value for key, value in ck_metrics.items() if key.startswith("ck_")}
+
+    def summarize_from_blob_store(self, repo_path, repo_name, manifest, analyzed, usage):
+        """Monta o CSV por classe com as linhas do store, sumariza e grava o manifesto"""
+        records = []
+        for path, sha in manifest["files"].items():
+            file = str((repo_path / path).resolve())
+            records.extend({"file": file, **row} for row in self.blob_store.load_rows(sha))
+        pd.DataFrame(records).to_csv(repo_path / "ck_results.csvclass.csv", index=False)
+
+        metrics = self.parse_ck_results(repo_path)
+        if not metrics:
+            return None
+        manifest["ck_files_analyzed"] = analyzed
+        manifest["ck_files_reused"] = len(manifest["files"]) - analyzed
+        self.blob_store.save_manifest(repo_name, manifest)
+
+        metrics.update(usage)
+        metrics["java_files"] = len(manifest["files"])
+        metrics["ck_files_analyzed"] = analyzed
+        metrics["ck_files_reused"] = manifest["ck_files_reused"]
+        metrics["blobs_fetched"] = manifest["blobs_fetched"]
+        print(f"♻️ {repo_name}: {manifest['ck_files_reused']} de {len(manifest['files'])} "
+              f"arquivos com linhas do CK reaproveitadas")
+        return metrics
+
+    def analyze_deduplicated(self, repo_path, repo_name, manifest):
+        """Roda o CK só nos blobs novos e monta o CSV por classe do repositório com as linhas do store"""
+        analyzed, usage = self.analyze_pending_blobs(repo_path, manifest)
+        if usage is None:
+            return None
+        return self.summarize_from_blob_store(repo_path, repo_name, manifest, analyzed, usage)
+
     def install_ck_tool(self):
         """Verifica se o ck.jar está disponível"""
         if self.ck_jar_path.exists():
@@ -93,13 +270,11 @@ class RepositoryAnalyzer:
             print(f"✗ ck.jar não encontrado em {self.ck_jar_path}")
             return False
 
-    def _calculate_timeout(self, repo_path):
+    def _calculate_timeout(self, repo_path, num_java_files=None):
         """Calcula timeout dinâmico baseado no tamanho do repositório"""
         try:
-
-            java_files = list(repo_path.rglob("*.java"))
-            num_java_files = len(java_files)
-            
+            if num_java_files is None:
+                num_java_files = count_files(repo_path)
 
             if num_java_files < 50:
                 return 60   
@@ -129,14 +304,18 @@ class RepositoryAnalyzer:
                 src_path = repo_path
 
 
-            timeout = self._calculate_timeout(repo_path)
-            
-            result = subprocess.run(
+            java_files = count_files(repo_path)
+            timeout = self._calculate_timeout(repo_path, java_files)
+
+            # Popen + wait4 em vez de subprocess.run, para guardar CPU, memória e E/S do JVM
+            result, usage = run_with_accounting(
                 ["java", "-jar", str(self.ck_jar_path),
                  str(src_path.resolve()), "true", "0", "false", str(ck_output.resolve())],
-                capture_output=True, text=True, timeout=timeout,
-                cwd=str(repo_path.resolve())
+                timeout=timeout, cwd=str(repo_path.resolve())
             )
+            print(f"⚙️ CK em {repo_path.name}: {java_files} arquivos .java, "
+                  f"{usage['ck_wall_seconds']:.1f}s, CPU {usage.get('ck_cpu_seconds', 0):.1f}s, "
+                  f"pico {usage.get('ck_max_rss_mb', 0):.0f} MB")
 
 
             if not ck_class_output.exists() or ck_class_output.stat().st_size == 0:
@@ -147,10 +326,16 @@ class RepositoryAnalyzer:
                 print(f"✓ CK gerou arquivo de métricas: {ck_class_output}")
 
             print(f"✓ Análise CK concluída para {repo_path.name}")
-            return self.parse_ck_results(repo_path)
+            metrics = self.parse_ck_results(repo_path)
+            if metrics:
+                metrics.update(usage)
+                metrics["java_files"] = java_files
+            return metrics
 
-        except subprocess.TimeoutExpired:
-            print(f"✗ Timeout na análise CK para {repo_path.name} (timeout: {timeout}s)")
+        except subprocess.TimeoutExpired as e:
+            usage = getattr(e, "usage", {})
+            print(f"✗ Timeout na análise CK para {repo_path.name} (timeout: {timeout}s, "
+                  f"{java_files} arquivos .java, pico {usage.get('ck_max_rss_mb', 0):.0f} MB)")
             return None
         except Exception as e:
             print(f"✗ Erro inesperado na análise CK para {repo_path.name}: {e}")
@@ -204,6 +389,7 @@ class RepositoryAnalyzer:
                 "max_cbo": df["cbo"].max() if "cbo" in df.columns else 0,
                 "max_dit": df["dit"].max() if "dit" in df.columns else 0,
                 "max_lcom": df["lcom"].max() if "lcom" in df.columns else 0,
+                "class_sketches": build_sketches(df),
             }
 
             print(f"✓ Métricas processadas para {repo_path.name}: {metrics['total_classes']} classes")
@@ -213,6 +399,19 @@ class RepositoryAnalyzer:
             print(f"✗ Erro ao processar resultados CK para {repo_path.name}: {e}")
             return None
 
+    def preserve_class_metrics(self, repo_path, repo_name):
+        """Guarda o CSV por classe do CK antes da limpeza do clone (usado por class_analysis.py)"""
+        ck_file = repo_path / "ck_results.csvclass.csv"
+        if not ck_file.exists():
+            return None
+        target = self.class_metrics_dir / f"{repo_name}.csv"
+        try:
+            shutil.copyfile(ck_file, target)
+            return target
+        except Exception as e:
+            print(f"⚠ Erro ao guardar métricas por classe de {repo_name}: {e}")
+            return None
+
     def create_failure_metrics(self, repo_info, error_type="failure"):
         """Cria métricas de falha para repositórios que não puderam ser analisados"""
         return {
@@ -247,12 +446,20 @@ class RepositoryAnalyzer:
         print(f"Releases: {repo_info['releases']}")
 
         try:
-            repo_path = self.clone_repository(repo_url, repo_name)
+            if self.blob_store:
+                repo_path, manifest = self.clone_deduplicated(repo_url, repo_name)
+            elif self.fetch_mode == "archive":
+                repo_path = self.download_archive(repo_info["full_name"], repo_name)
+            else:
+                repo_path = self.clone_repository(repo_url, repo_name)
             if not repo_path:
                 print(f"✗ Falha no clone de {repo_info['full_name']}")
                 return self.create_failure_metrics(repo_info, "clone_failed")
 
-            ck_metrics = self.analyze_repository_with_ck(repo_path)
+            if self.blob_store:
+                ck_metrics = self.analyze_deduplicated(repo_path, repo_name, manifest)
+            else:
+                ck_metrics = self.analyze_repository_with_ck(repo_path)
             if not ck_metrics:
                 print(f"✗ Falha na análise CK de {repo_info['full_name']}")
                 # Limpar repositório se existir
@@ -262,6 +469,7 @@ class RepositoryAnalyzer:
 
             combined_metrics = {**repo_info, **ck_metrics}
             combined_metrics["analysis_status"] = "success"
+            self.preserve_class_metrics(repo_path, repo_name)
 
             # Limpeza assíncrona
             def cleanup_repo():
@@ -377,8 +585,10 @@ class RepositoryAnalyzer:
             # Sempre salvar o resultado, mesmo se for falha
             if result:
                 with results_lock:
+                    self.record_sketches(result)
                     self.results.append(result)
                     self.save_incremental(result)
+                    self.record_online(result)
                 
                 # Verificar se foi sucesso ou falha
                 if result.get("analysis_status") == "success":
@@ -424,6 +634,8 @@ class RepositoryAnalyzer:
                         avg_time = elapsed / completed
                         remaining = (len(repos_to_analyze) - completed) * avg_time
                         print(f"⏳ Tempo estimado restante: {remaining}")
+                    with results_lock:
+                        self.print_online_statistics()
                     print()
 
         end_time = datetime.now()
@@ -431,6 +643,7 @@ class RepositoryAnalyzer:
         print(f"\n🏁 Análise concluída em {total_time}")
 
         if self.results:
+            safe_record_snapshot("analysis", self.results_file)
             self.print_summary()
         else:
             print("Nenhum repositório foi analisado com sucesso.")
@@ -481,21 +694,34 @@ class RepositoryAnalyzer:
             for failure_type, count in failure_types.items():
                 print(f"  - {failure_type}: {count} repositórios")
 
-def main():
-    analyzer = RepositoryAnalyzer()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Clona os repositórios coletados e mede a qualidade com o CK')
+    parser.add_argument('--repos', type=int, default=10,
+                        help='quantos repositórios analisar nesta execução (padrão: %(default)s)')
+    parser.add_argument('--workers', type=int, default=3,
+                        help='análises simultâneas (padrão: %(default)s)')
+    parser.add_argument('--repos-csv', default="top_1000_java_repos_metrics.csv",
+                        help='CSV do coletor com os repositórios a analisar (padrão: %(default)s)')
+    parser.add_argument('--blob-store', nargs='?', const=str(BLOB_STORE_DIR), metavar='DIR',
+                        help='clone parcial e fontes deduplicadas por hash de blob, '
+                             'reaproveitando as linhas do CK (padrão do DIR: %(const)s)')
+    parser.add_argument('--fetch', choices=['git', 'archive'], default='git',
+                        help="'archive' baixa o tar.gz em streaming e grava só os .java, sem git "
+                             "(padrão: %(default)s)")
+    parser.add_argument('--archive-url', default=ARCHIVE_BASE_URL,
+                        help='servidor dos arquivos tar.gz, ex.: um substituto local (padrão: %(default)s)')
+    args = parser.parse_args(argv)
+    if args.blob_store and args.fetch == 'archive':
+        parser.error('--blob-store já faz um clone parcial; não combine com --fetch archive')
+
+    analyzer = RepositoryAnalyzer(repos_csv_file=args.repos_csv, blob_store_dir=args.blob_store,
+                                  fetch_mode=args.fetch, archive_base_url=args.archive_url)
     
     print("🚀 ANALISADOR DE REPOSITÓRIOS JAVA COM CK")
     print("=" * 50)
     
     all_repos = analyzer.load_repositories()
-    analyzed_repos = set()
-    if os.path.exists(analyzer.results_file):
-        try:
-            with open(analyzer.results_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                analyzed_repos = {row['full_name'] for row in reader}
-        except Exception as e:
-            print(f"⚠️ Erro ao carregar resultados: {e}")
+    analyzed_repos = analyzer.analyzed_repositories()
     
     total_repos = len(all_repos)
     analyzed_count = len(analyzed_repos)
@@ -512,18 +738,18 @@ def main():
         print("🎉 Todos os repositórios já foram analisados!")
         return
     
-    remaining_repos = analyzer.get_remaining_repositories(10)
-    print(f"\n🎯 PRÓXIMOS 10 REPOSITÓRIOS:")
+    remaining_repos = analyzer.get_remaining_repositories(args.repos)
+    print(f"\n🎯 PRÓXIMOS {len(remaining_repos)} REPOSITÓRIOS:")
     for i, repo in enumerate(remaining_repos, 1):
         stars = repo.get('stars', 'N/A')
         print(f"{i:2d}. {repo['full_name']} ({stars} ⭐)")
     
-    print(f"\n🔄 Iniciando análise dos próximos 100 repositórios...")
+    print(f"\n🔄 Iniciando análise dos próximos {len(remaining_repos)} repositórios...")
     print("💡 Dica: Você pode interromper (Ctrl+C) e retomar depois!")
     print("💾 Cada resultado é salvo automaticamente no mesmo arquivo CSV")
     
     try:
-        analyzer.run_analysis(num_repos=10, max_workers=3)
+        analyzer.run_analysis(num_repos=args.repos, max_workers=args.workers)
     except KeyboardInterrupt:
         print("\n🛑 Análise interrompida pelo usuário")
         print("💾 Resultados já salvos no arquivo CSV")
@@ -1,9 +1,11 @@
+import argparse
 import requests
 import time
 import csv
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+from snapshot_store import safe_record_snapshot
 
 load_dotenv()
 
@@ -17,9 +19,16 @@ GRAPHQL_URL = "https://api.github.com/graphql"
 MAX_RETRIES = 5
 PAGE_SIZE = 50  
 
+SEARCH = "language:Java sort:stars-desc"
+# Lido por clone_and_analyze.py (repos_csv_file) e, em results/, por repository_store.py
+COLLECTOR_FILE = "top_1000_java_repos_metrics.csv"
+# A busca do GitHub devolve no máximo 1000 resultados por consulta
+SEARCH_CAP = 1000
+
 query = """
-query ($cursor: String) {
-  search(query: "language:Java sort:stars-desc", type: REPOSITORY, first: %d, after: $cursor) {
+query ($q: String!, $cursor: String) {
+  search(query: $q, type: REPOSITORY, first: %d, after: $cursor) {
+    repositoryCount
     pageInfo {
       endCursor
       hasNextPage
@@ -74,7 +83,7 @@ def run_query(query, variables):
     print("Máximo de tentativas atingido.")
     return None
 
-def save_to_csv(repositories, filename="top_1000_java_repos_metrics.csv"):
+def save_to_csv(repositories, filename=COLLECTOR_FILE):
     if not repositories:
         print("Nenhum repositório para salvar.")
         return
@@ -98,7 +107,9 @@ def save_to_csv(repositories, filename="top_1000_java_repos_metrics.csv"):
             "primary_language": repo.get("primaryLanguage", {}).get("name", "Java"),
             "releases": repo.get("releases", {}).get("totalCount", 0),
             "age_years": round(age_years, 2),
-            "size_bytes": total_bytes
+            "size_bytes": total_bytes,
+            # Data absoluta: permite recalcular a idade em qualquer snapshot
+            "created_at": repo["createdAt"]
         })
     
     with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -107,14 +118,40 @@ def save_to_csv(repositories, filename="top_1000_java_repos_metrics.csv"):
         writer.writerows(csv_data)
     
     print(f"Lista de {len(csv_data)} repositórios salva em {filename}")
+    safe_record_snapshot("collector", filename)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Coleta os repositórios Java mais populares do GitHub (GraphQL)')
+    parser.add_argument('--target', type=int, default=SEARCH_CAP,
+                        help='quantos repositórios coletar; acima de %(default)s a busca é particionada '
+                             'por faixas de estrelas e datas de criação (search_planner.py)')
+    parser.add_argument('--workers', type=int, default=3,
+                        help='partições consultadas em paralelo quando particionada (padrão: %(default)s)')
+    parser.add_argument('--output', default=COLLECTOR_FILE,
+                        help='CSV de saída, o mesmo lido pelo analisador (padrão: %(default)s)')
+    args = parser.parse_args(argv)
 
-def main():
     print("=== Coletor de Métricas de Repositórios Java ===\n")
+    if args.target > SEARCH_CAP:
+        from search_planner import collect_top
+
+        try:
+            repos = collect_top(args.target, max_workers=args.workers)
+        except RuntimeError as e:
+            print(f"✗ Coleta abortada, {args.output} não foi alterado: {e}")
+            return
+        if repos:
+            save_to_csv(repos, args.output)
+        else:
+            print("Nenhum repositório foi coletado.")
+        return
+
     repos = []
     cursor = None
 
-    while len(repos) < 1000:
-        variables = {"cursor": cursor}
+    while len(repos) < args.target:
+        variables = {"q": SEARCH, "cursor": cursor}
         result = run_query(query, variables)
         if result is None:
             print("Erro na consulta, tentando novamente em 5s...")
@@ -133,9 +170,9 @@ def main():
         cursor = page_info["endCursor"]
         time.sleep(3)  
     
-    repos = repos[:1000]  
+    repos = repos[:args.target]
     if repos:
-        save_to_csv(repos)
+        save_to_csv(repos, args.output)
         print("\nTop 5 repositórios por estrelas:")
         for i, repo in enumerate(sorted(repos, key=lambda x: x["stargazerCount"], reverse=True)[:5]):
             print(f"{i+1}. {repo['owner']['login']}/{repo['name']} - {repo['stargazerCount']} ⭐")
@@ -0,0 +1,339 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from dataset_cache import content_hash
+from stats_engine import CACHE_DIR, DATA_FILE, ENGINE_VERSION, QUALITY_COLUMNS, load_dataset
+
+INFERENCE_X_COLUMNS = ['stars', 'log_stars', 'releases', 'idade_anos', 'loc']
+INFERENCE_Y_COLUMNS = QUALITY_COLUMNS
+METHODS = ['pearson', 'spearman', 'kendall']
+
+N_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+SEED = 42
+
+# Reamostragens processadas por lote, para limitar a memória das matrizes B x n
+BATCH_SIZE = 1000
+# Linhas por bloco da matriz de concordância do Kendall (bloco x n em float32, nunca n x n)
+CONCORDANCE_BLOCK = 2048
+# O Kendall custa O(n²) por reamostragem (bootstrap) ou O(n log n) por permutação, contra O(n)
+# de Pearson e Spearman; por isso usa só as primeiras KENDALL_RESAMPLES reamostragens e permutações
+KENDALL_RESAMPLES = 1000
+# Tamanho dos trechos ordenados por força bruta antes das fusões em pair_sign_sums
+MERGE_LEAF = 64
+
+
+def bootstrap_weights(rng, n_resamples, n):
+    """Matriz (B, n) com quantas vezes cada linha aparece em cada reamostragem"""
+    idx = rng.integers(0, n, size=(n_resamples, n))
+    offsets = (np.arange(n_resamples) * n)[:, None]
+    counts = np.bincount((idx + offsets).ravel(), minlength=n_resamples * n)
+    return counts.reshape(n_resamples, n).astype(np.float64)
+
+
+def _moments(weights, total, values):
+    """Média e variância ponderadas de cada reamostragem (valores vetor ou matriz)"""
+    if values.ndim == 1:
+        mean = weights @ values / total
+        var = weights @ (values * values) / total - mean ** 2
+    else:
+        mean = np.einsum('ij,ij->i', weights, values) / total
+        var = np.einsum('ij,ij->i', weights, values * values) / total - mean ** 2
+    return mean, var
+
+
+def weighted_midranks(weights, values):
+    """Postos médios de cada observação dentro de cada reamostragem.
+
+    Uma observação repetida k vezes ocupa k posições; empates (entre valores
+    iguais ou cópias da mesma linha) recebem a média das posições do grupo.
+    Retorna também, por reamostragem, a soma dos quadrados do tamanho de cada
+    grupo de empate, usada no denominador do tau-b.
+    """
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+    n = len(values)
+
+    group_start = np.r_[0, np.flatnonzero(np.diff(sorted_values)) + 1]
+    group_end = np.r_[group_start[1:], n]
+    group_of = np.repeat(np.arange(len(group_start)), group_end - group_start)
+
+    cumulative = np.cumsum(weights[:, order], axis=1)
+    before = np.concatenate([np.zeros((len(weights), 1)), cumulative], axis=1)
+    below = before[:, group_start]
+    group_total = before[:, group_end] - below
+    ranks_sorted = (below + (group_total + 1) / 2)[:, group_of]
+
+    ranks = np.empty_like(ranks_sorted)
+    ranks[:, order] = ranks_sorted
+    return ranks, (group_total ** 2).sum(axis=1)
+
+
+def concordant_weight(weights32, x, y):
+    """w'Cw de cada linha de pesos, com C = sign(xi - xj) * sign(yi - yj) montada por blocos de linhas"""
+    result = np.zeros(len(weights32), dtype=np.float64)
+    if not len(weights32):
+        return result
+    for start in range(0, len(x), CONCORDANCE_BLOCK):
+        block = slice(start, start + CONCORDANCE_BLOCK)
+        concordance = (np.sign(x[block, None] - x[None, :]) * np.sign(y[block, None] - y[None, :])).astype(np.float32)
+        result += np.einsum('ij,ij->i', weights32 @ concordance.T, weights32[:, block])
+    return result
+
+
+def _column_state(weights, total, values):
+    """Termos por coluna reaproveitados por todos os pares que a usam"""
+    mean, var = _moments(weights, total, values)
+    ranks, tied_squares = weighted_midranks(weights, values)
+    rank_mean, rank_var = _moments(weights, total, ranks)
+    return {
+        'mean': mean, 'var': var,
+        'ranks': ranks, 'rank_mean': rank_mean, 'rank_var': rank_var,
+        # w'|Sx|w = N² - soma dos quadrados dos grupos de empate
+        'untied_pairs': total ** 2 - tied_squares,
+    }
+
+
+def _bootstrap_pair(weights, weights32, total, x, y, state_x, state_y):
+    """Pearson, Spearman e tau-b de Kendall de cada linha de pesos.
+
+    Com w = multiplicidades, tau_b = w'Cw / sqrt((w'|Sx|w)(w'|Sy|w)), onde
+    C = Sx * Sy; cópias da mesma linha empatam nas duas variáveis e se anulam.
+    O Kendall só é calculado para as len(weights32) primeiras linhas.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = weights @ (x * y) / total - state_x['mean'] * state_y['mean']
+        pearson = cov / np.sqrt(state_x['var'] * state_y['var'])
+
+        rank_cov = (np.einsum('ij,ij->i', weights, state_x['ranks'] * state_y['ranks']) / total
+                    - state_x['rank_mean'] * state_y['rank_mean'])
+        spearman = rank_cov / np.sqrt(state_x['rank_var'] * state_y['rank_var'])
+
+        concordant = concordant_weight(weights32, x, y)
+        rows = len(weights32)
+        kendall = concordant / np.sqrt(state_x['untied_pairs'][:rows] * state_y['untied_pairs'][:rows])
+    return {'pearson': pearson, 'spearman': spearman, 'kendall': kendall}
+
+
+def permutation_extremes(zx, permuted_zy, observed):
+    """Quantas permutações (linhas de ``permuted_zy``, y padronizado e permutado) têm |r| >= |observado|"""
+    null = (permuted_zy @ zx) / len(zx)
+    return np.count_nonzero(np.abs(null) >= abs(observed) - 1e-12)
+
+
+def pair_sign_sums(values):
+    """Soma de sign(v[j] - v[i]) sobre i < j em cada linha de ``values`` (inteiros >= 0).
+
+    É o numerador do Kendall entre a posição e o valor, calculado para todas
+    as linhas de uma vez por merge sort: cada fusão conta, para cada elemento
+    da metade direita, quantos da esquerda são menores e quantos são maiores.
+    """
+    rows, n = values.shape
+    size = max(MERGE_LEAF, 1 << max(0, (n - 1).bit_length()))
+    dtype = np.int16 if size < 2 ** 14 else np.int32
+    padded = np.full((rows, size), values.max() + 1, dtype=dtype)
+    padded[:, :n] = values
+    # O enchimento fica no fim e é maior que todos: soma +1 com cada valor real
+    total = np.full(rows, -n * (size - n), dtype=np.int64)
+
+    leaves = padded.reshape(rows, -1, MERGE_LEAF)
+    for i in range(MERGE_LEAF - 1):
+        total += np.sign(leaves[:, :, i + 1:] - leaves[:, :, i:i + 1]).sum(axis=(1, 2), dtype=np.int64)
+    merged = np.sort(leaves, axis=-1).reshape(rows, size)
+
+    width = MERGE_LEAF
+    while width < size:
+        halves = merged.reshape(rows, -1, 2, width)
+        left, right = halves[:, :, 0, :], halves[:, :, 1, :]
+        counts = []
+        # Bit baixo da chave: nos empates, direita antes da esquerda conta "menores";
+        # esquerda antes da direita conta "menores ou iguais"
+        for left_bit in (1, 0):
+            keys = np.concatenate([2 * left + left_bit, 2 * right + (1 - left_bit)], axis=-1)
+            keys.sort(axis=-1, kind='stable')
+            is_left = (keys & 1) == left_bit
+            before = np.cumsum(is_left, axis=-1, dtype=dtype)
+            counts.append(np.where(is_left, 0, before).sum(axis=(1, 2), dtype=np.int64))
+        less, less_equal = counts
+        greater = width * width * halves.shape[1] - less_equal
+        total += less - greater
+        merged = (keys >> 1).reshape(rows, size)
+        width *= 2
+    return total
+
+
+def tied_position_pairs(sorted_values):
+    """Pares de posições (i < j) com o mesmo valor em um vetor ordenado"""
+    group_start = np.r_[0, np.flatnonzero(np.diff(sorted_values)) + 1]
+    group_end = np.r_[group_start[1:], len(sorted_values)]
+    first, second = [], []
+    for start, end in zip(group_start, group_end):
+        if end - start > 1:
+            i, j = np.triu_indices(end - start, 1)
+            first.append(i + start)
+            second.append(j + start)
+    if not first:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def kendall_scores(arranged, arranged_signs, tied_pairs, chunk=1 << 16):
+    """Numerador do tau-b (concordantes - discordantes) de cada linha de ``arranged``.
+
+    ``arranged`` traz os postos de x nas posições de y em ordem crescente e
+    ``arranged_signs`` é pair_sign_sums(arranged). Pares empatados em y não
+    contam, então a soma dentro de cada grupo de empate é descontada.
+    """
+    first, second = tied_pairs
+    scores = arranged_signs.copy()
+    for start in range(0, len(first), chunk):
+        i, j = first[start:start + chunk], second[start:start + chunk]
+        scores -= np.sign(arranged[:, j] - arranged[:, i]).sum(axis=1, dtype=np.int64)
+    return scores
+
+
+def _group_inference(data, pairs, n_resamples, rng):
+    """Inferência de todos os pares que compartilham as mesmas linhas válidas.
+
+    Os pesos de bootstrap e as permutações são sorteados uma vez por lote e
+    usados por todos os pares do grupo; os termos de cada coluna (momentos,
+    postos, empates, valores permutados) também são calculados uma única vez
+    por lote.
+
+    No teste de permutação do Kendall, a permutação k põe x[perm[k]] ao lado
+    do k-ésimo menor y. Assim a soma de sinais de x permutado (pair_sign_sums)
+    vale para todos os y do par e só os empates de cada y são descontados.
+    """
+    n = len(data)
+    columns = sorted({col for pair in pairs for col in pair})
+    x_columns = sorted({x_col for x_col, _ in pairs})
+    y_columns = sorted({y_col for _, y_col in pairs})
+    values = {col: data[col].to_numpy(dtype=np.float64) for col in columns}
+    values = {col: v - v.mean() for col, v in values.items()}
+    ranks = {col: stats.rankdata(v) for col, v in values.items()}
+    standardized = {col: (v - v.mean()) / v.std() for col, v in values.items()}
+    standardized_ranks = {col: (r - r.mean()) / r.std() for col, r in ranks.items()}
+    dense_ranks = {col: stats.rankdata(values[col], method='dense').astype(np.int32) - 1 for col in x_columns}
+    y_order = {col: np.argsort(values[col], kind='mergesort') for col in y_columns}
+    y_ties = {col: tied_position_pairs(values[col][order]) for col, order in y_order.items()}
+
+    observed = {}
+    asymptotic = {}
+    observed_scores = {}
+    for pair in pairs:
+        x_col, y_col = pair
+        pearson = stats.pearsonr(values[x_col], values[y_col])
+        spearman = stats.pearsonr(ranks[x_col], ranks[y_col])
+        kendall = stats.kendalltau(values[x_col], values[y_col], method='asymptotic')
+        observed[pair] = {'pearson': pearson[0], 'spearman': spearman[0], 'kendall': kendall[0]}
+        asymptotic[pair] = {'pearson': pearson[1], 'spearman': spearman[1], 'kendall': kendall[1]}
+        arranged = dense_ranks[x_col][y_order[y_col]][None, :]
+        observed_scores[pair] = abs(kendall_scores(arranged, pair_sign_sums(arranged), y_ties[y_col])[0])
+
+    kendall_resamples = min(n_resamples, KENDALL_RESAMPLES)
+    boot = {pair: {method: [] for method in METHODS} for pair in pairs}
+    extremes = {pair: {method: 0 for method in METHODS} for pair in pairs}
+    for start in range(0, n_resamples, BATCH_SIZE):
+        size = min(BATCH_SIZE, n_resamples - start)
+        kendall_size = max(0, min(size, kendall_resamples - start))
+
+        weights = bootstrap_weights(rng, size, n)
+        weights32 = weights[:kendall_size].astype(np.float32)
+        total = np.full(size, float(n))
+        states = {col: _column_state(weights, total, values[col]) for col in columns}
+
+        permutations = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+        permuted = {col: standardized[col][permutations] for col in y_columns}
+        permuted_ranks = {col: standardized_ranks[col][permutations] for col in y_columns}
+        arranged = {col: dense_ranks[col][permutations[:kendall_size]] for col in x_columns}
+        arranged_signs = {}
+        if kendall_size:
+            # Colunas com os mesmos postos (ex.: stars e log_stars) compartilham a soma de sinais
+            by_ranks = {}
+            for col in x_columns:
+                key = dense_ranks[col].tobytes()
+                if key not in by_ranks:
+                    by_ranks[key] = pair_sign_sums(arranged[col])
+                arranged_signs[col] = by_ranks[key]
+
+        for pair in pairs:
+            x_col, y_col = pair
+            batch = _bootstrap_pair(weights, weights32, total, values[x_col], values[y_col],
+                                    states[x_col], states[y_col])
+            for method in METHODS:
+                boot[pair][method].append(batch[method])
+            extremes[pair]['pearson'] += permutation_extremes(
+                standardized[x_col], permuted[y_col], observed[pair]['pearson'])
+            extremes[pair]['spearman'] += permutation_extremes(
+                standardized_ranks[x_col], permuted_ranks[y_col], observed[pair]['spearman'])
+            if kendall_size:
+                scores = kendall_scores(arranged[x_col], arranged_signs[x_col], y_ties[y_col])
+                extremes[pair]['kendall'] += np.count_nonzero(np.abs(scores) >= observed_scores[pair])
+
+    alpha = (1 - CONFIDENCE) / 2
+    rows = []
+    for pair in pairs:
+        for method in METHODS:
+            distribution = np.concatenate(boot[pair][method])
+            ci_low, ci_high = np.nanquantile(distribution, [alpha, 1 - alpha])
+            resamples = kendall_resamples if method == 'kendall' else n_resamples
+            rows.append({'x': pair[0], 'y': pair[1], 'method': method, 'n': n,
+                         'coefficient': observed[pair][method],
+                         'ci_low': ci_low, 'ci_high': ci_high,
+                         'p_permutation': (extremes[pair][method] + 1) / (resamples + 1),
+                         'p_asymptotic': asymptotic[pair][method], 'resamples': resamples})
+    return rows
+
+
+def compute_inference(df, x_columns=INFERENCE_X_COLUMNS, y_columns=INFERENCE_Y_COLUMNS,
+                      n_resamples=N_RESAMPLES, seed=SEED):
+    """Calcula Pearson, Spearman e Kendall com IC bootstrap e p-valores.
+
+    ``p_permutation`` vem do teste de permutação e ``p_asymptotic`` é o
+    p-valor assintótico do SciPy. O IC e o teste de permutação do Kendall
+    usam só as primeiras KENDALL_RESAMPLES reamostragens (coluna ``resamples``).
+
+    Cada par usa as linhas sem NaN nas duas colunas. As reamostragens são
+    feitas em lotes matriciais: o bootstrap vira uma matriz de pesos (B, n) e
+    cada coeficiente é calculado para o lote inteiro com operações NumPy.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Agrupar os pares pelo conjunto de linhas sem NaN
+    groups = {}
+    for x_col in x_columns:
+        for y_col in y_columns:
+            if x_col == y_col:
+                continue
+            valid = df[[x_col, y_col]].notna().all(axis=1).to_numpy()
+            groups.setdefault(valid.tobytes(), (valid, []))[1].append((x_col, y_col))
+
+    rows = []
+    for valid, pairs in groups.values():
+        rows.extend(_group_inference(df[valid], pairs, n_resamples, rng))
+
+    order = {(x_col, y_col): i for i, (x_col, y_col) in enumerate(
+        (x_col, y_col) for x_col in x_columns for y_col in y_columns)}
+    rows.sort(key=lambda row: order[(row['x'], row['y'])])
+    return pd.DataFrame(rows)
+
+
+def get_inference(csv_path=DATA_FILE, df=None, n_resamples=N_RESAMPLES, seed=SEED):
+    """Retorna a tabela de inferência, usando o cache em disco quando válido"""
+    key = content_hash(csv_path)[:16]
+    path = CACHE_DIR / f'inference_v{ENGINE_VERSION}_{key}_{n_resamples}_{seed}.csv'
+    if path.exists():
+        return pd.read_csv(path)
+
+    if df is None:
+        df = load_dataset(csv_path)
+    start = time.perf_counter()
+    result = compute_inference(df, n_resamples=n_resamples, seed=seed)
+    print(f"⏱️ Bootstrap/permutação com {n_resamples} reamostragens em {time.perf_counter() - start:.2f}s")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    result.to_csv(path, index=False)
+    return result
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Incrementar quando o formato do cache mudar
+CACHE_FORMAT_VERSION = 2
+
+# Arrays já abertos neste processo, por caminho: (mtime_ns, tamanho, meta, tabela)
+_opened = {}
+
+# Esquemas conhecidos (por papel do arquivo): coluna -> dtype compacto.
+# 'str' vira um array Unicode de largura fixa, que também pode ser mapeado em memória.
+# Só identificadores e contagens são estreitados; as medidas continuam em float64
+# para que o cache não altere nenhum valor do CSV. Colunas fora do esquema têm o tipo inferido.
+SCHEMAS = {
+    'results': {
+        'repo': 'str',
+        'stars': 'int32',
+        'releases': 'int16',
+        'idade_anos': 'float64',
+        'cbo': 'float64',
+        'dit': 'float64',
+        'lcom': 'float64',
+        'loc': 'float64',
+        'locComment': 'int32',
+    },
+    'collector': {
+        'full_name': 'str',
+        'owner': 'str',
+        'name': 'str',
+        'description': 'str',
+        'url': 'str',
+        'stars': 'int32',
+        'forks': 'int32',
+        'primary_language': 'str',
+        'releases': 'int32',
+        'age_years': 'float64',
+        'size_bytes': 'int64',
+    },
+    # Saída completa do RepositoryAnalyzer (uma linha por repositório, sucesso ou erro)
+    'run': {
+        'full_name': 'str',
+        'analysis_status': 'str',
+    },
+}
+
+# Papel padrão pelo nome do arquivo, usado quando o chamador não passa ``schema``.
+# O nome sozinho é ambíguo: a saída do analisador também se chama
+# repository_analysis_results.csv, mas com outras colunas; por isso o esquema
+# do papel só vale se o CSV tiver todas as colunas dele (senão os tipos são inferidos).
+SCHEMA_ROLES = {
+    'repository_analysis_results.csv': 'results',
+    'top_1000_java_repos_metrics.csv': 'collector',
+}
+
+
+class SchemaError(ValueError):
+    """O CSV não tem as colunas ou os tipos esperados pelo esquema"""
+
+
+def cache_dir_for(csv_path):
+    """Diretório do cache binário, ao lado do CSV (ex.: results/.dados.csv.cache).
+
+    Cada reconstrução grava a tabela em um subdiretório novo (uma geração) e
+    só então aponta o meta.json para ele; a geração em uso nunca é apagada
+    nem sobrescrita, o que no Windows falharia enquanto estivesse mapeada.
+    """
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f'.{csv_path.name}.cache')
+
+
+def _release(key):
+    """Esquece o mapeamento aberto por este processo e o fecha se nenhum array ainda o usa"""
+    opened = _opened.pop(key, None)
+    if opened is None:
+        return
+    table = opened[3]
+    del opened
+    # Views da tabela (colunas, DataFrames com copy=False) a referenciam via .base.
+    # O np.memmap não bloqueia o mmap.close(), então fechar com views vivas faria
+    # elas lerem memória desmapeada; nesse caso o mapeamento fecha quando forem liberadas.
+    # As duas referências restantes são a variável local e o argumento de getrefcount.
+    mapping = getattr(table, '_mmap', None)
+    if mapping is not None and sys.getrefcount(table) <= 2:
+        del table
+        mapping.close()
+
+
+def _remove_old_generations(cache_dir, current):
+    """Apaga gerações antigas; as que ainda estão mapeadas ficam para a próxima reconstrução"""
+    for path in cache_dir.iterdir():
+        if path.name in (current, 'meta.json'):
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def declared_schema(csv_path, columns):
+    """Esquema do papel associado ao nome do arquivo, se o CSV tiver todas as colunas dele"""
+    schema = SCHEMAS.get(SCHEMA_ROLES.get(Path(csv_path).name))
+    if schema and all(col in columns for col in schema):
+        return schema
+    return None
+
+
+def _dtype(dtype, values):
+    if dtype == 'str':
+        return f'<U{max(1, max((len(v) for v in values), default=1))}'
+    return dtype
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _infer_schema(df):
+    """Esquema compacto para CSVs sem esquema declarado (ex.: saída do analisador)"""
+    schema = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            schema[col] = 'bool'
+        elif pd.api.types.is_integer_dtype(series):
+            low, high = (series.min(), series.max()) if len(series) else (0, 0)
+            for dtype in ('int8', 'int16', 'int32', 'int64'):
+                if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                    schema[col] = dtype
+                    break
+        elif pd.api.types.is_float_dtype(series):
+            schema[col] = 'float64'
+        else:
+            schema[col] = 'str'
+    return schema
+
+
+def _convert(series, dtype, column):
+    if dtype == 'str':
+        values = series.fillna('').astype(str).to_numpy()
+        return np.asarray(values, dtype=str)
+    numeric = pd.to_numeric(series, errors='coerce')
+    if dtype.startswith('int') and numeric.isna().any():
+        raise SchemaError(f"Coluna '{column}' tem valores ausentes ou não inteiros")
+    if dtype.startswith('int'):
+        info = np.iinfo(dtype)
+        if len(numeric) and (numeric.min() < info.min or numeric.max() > info.max):
+            raise SchemaError(f"Coluna '{column}' não cabe em {dtype}")
+    return numeric.to_numpy().astype(dtype)
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(cache_dir / 'meta.json', 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    tmp_path = cache_dir / 'meta.json.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(meta, file, indent=2)
+    os.replace(tmp_path, cache_dir / 'meta.json')
+
+
+def build_cache(csv_path, schema=None):
+    """Lê o CSV, valida contra o esquema e grava um único .npy estruturado (uma coluna por campo)"""
+    csv_path = Path(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    # Liberar o mapeamento antigo deste processo antes de gravar a nova geração
+    _release(str(csv_path.resolve()))
+    stat = csv_path.stat()
+    digest = _sha256(csv_path)
+
+    df = pd.read_csv(csv_path)
+    if schema is None:
+        schema = declared_schema(csv_path, df.columns) or _infer_schema(df)
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        raise SchemaError(f"{csv_path}: colunas ausentes {missing}")
+    # Colunas extras (ex.: adicionadas por versões novas do coletor) entram com tipo inferido
+    schema = {**schema, **{col: dtype for col, dtype in _infer_schema(df).items() if col not in schema}}
+
+    generation = f'g{time.time_ns()}'
+    (cache_dir / generation).mkdir(parents=True)
+    columns = list(df.columns)
+    converted = {col: _convert(df[col], schema[col], col) for col in columns}
+    table = np.empty(len(df), dtype=[(col, _dtype(schema[col], converted[col])) for col in columns])
+    for col in columns:
+        table[col] = converted[col]
+    np.save(cache_dir / generation / 'table.npy', table, allow_pickle=False)
+
+    meta = {
+        'version': CACHE_FORMAT_VERSION,
+        'generation': generation,
+        'source': csv_path.name,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest,
+        'rows': len(df),
+        'columns': columns,
+        'schema': {col: schema[col] for col in columns},
+    }
+    # A troca do meta.json é atômica: leitores veem a geração antiga ou a nova, nunca uma parcial
+    _write_meta(cache_dir, meta)
+    _remove_old_generations(cache_dir, generation)
+    return meta
+
+
+def ensure_cache(csv_path, schema=None):
+    """Garante que o cache está atualizado e retorna seus metadados.
+
+    O caminho rápido só compara mtime e tamanho do CSV. Se eles mudaram mas
+    o conteúdo (SHA-256) é o mesmo, apenas os metadados são atualizados.
+    """
+    csv_path = Path(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    stat = csv_path.stat()
+    meta = _read_meta(cache_dir)
+
+    if meta is None or meta.get('version') != CACHE_FORMAT_VERSION:
+        return build_cache(csv_path, schema)
+    if schema is not None and any(meta['schema'].get(col) != dtype for col, dtype in schema.items()):
+        return build_cache(csv_path, schema)
+    if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+        return meta
+    if meta['size'] == stat.st_size and _sha256(csv_path) == meta['sha256']:
+        meta['mtime_ns'] = stat.st_mtime_ns
+        _write_meta(cache_dir, meta)
+        return meta
+    return build_cache(csv_path, schema)
+
+
+def content_hash(csv_path):
+    """SHA-256 do CSV, reaproveitado do cache quando o arquivo não mudou"""
+    return open_table(csv_path)[0]['sha256']
+
+
+def open_table(csv_path, schema=None):
+    """Array estruturado mapeado em memória com o conteúdo do CSV.
+
+    Dentro do mesmo processo, chamadas repetidas com o CSV inalterado (mesmo
+    mtime e tamanho) reaproveitam o mapeamento já aberto.
+    """
+    key = str(Path(csv_path).resolve())
+    stat = os.stat(csv_path)
+    opened = _opened.get(key)
+    if opened and opened[0] == stat.st_mtime_ns and opened[1] == stat.st_size and schema is None:
+        return opened[2], opened[3]
+
+    meta = ensure_cache(csv_path, schema)
+    table = np.load(cache_dir_for(csv_path) / meta['generation'] / 'table.npy', mmap_mode='r')
+    _opened[key] = (meta['mtime_ns'], meta['size'], meta, table)
+    return meta, table
+
+
+def load_arrays(csv_path, columns=None, schema=None):
+    """Dicionário coluna -> array mapeado em memória (somente leitura)"""
+    meta, table = open_table(csv_path, schema)
+    wanted = meta['columns'] if columns is None else list(columns)
+    missing = [col for col in wanted if col not in meta['columns']]
+    if missing:
+        raise SchemaError(f"{csv_path}: colunas inexistentes {missing}")
+    return {col: table[col] for col in wanted}
+
+
+def load_table(csv_path, columns=None, schema=None):
+    """Substituto de pd.read_csv com tipos compactos e leitura do cache binário"""
+    return pd.DataFrame(load_arrays(csv_path, columns, schema), copy=False)
+
+
+def load_records(csv_path, columns=None):
+    """Linhas do CSV como lista de dicionários com tipos Python (como csv.DictReader, mas tipado)"""
+    return load_table(csv_path, columns).to_dict('records')
@@ -0,0 +1,270 @@
+import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+import seaborn as sns
+import numpy as np
+import pandas as pd
+
+from repository_store import QUARTILE_LABELS, group_values
+
+METRICS = ['cbo', 'dit', 'lcom', 'loc']
+TITLES = ['Acoplamento (CBO)', 'Profundidade de Herança (DIT)', 'Falta de Coesão (LCOM)', 'Linhas de Código (LOC)']
+
+# Acima deste número de pontos os scatter plots viram mapas de densidade
+DENSITY_THRESHOLD = 20_000
+DENSITY_BINS = 200
+
+
+def apply_style(style):
+    """Aplica a configuração visual de cada script"""
+    plt.rcdefaults()
+    if style == 'analysis':
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        plt.rcParams['font.size'] = 10
+        plt.rcParams['figure.figsize'] = (12, 8)
+    elif style == 'detalhados':
+        plt.rcParams['font.size'] = 12
+        plt.rcParams['figure.figsize'] = (15, 10)
+        sns.set_style("whitegrid")
+        sns.set_palette("Set2")
+        plt.rcParams['font.family'] = 'DejaVu Sans'
+
+
+def quartile_boxplot_axes(ax, df, metric):
+    """Box plot de uma métrica por quartil de popularidade (grupos lidos do índice do store)"""
+    groups = group_values(df, 'stars_quartile', metric)
+    sns.boxplot(data=[groups[label] for label in QUARTILE_LABELS], ax=ax)
+    ax.set_xticks(range(len(QUARTILE_LABELS)), QUARTILE_LABELS)
+    return groups
+
+
+def plot_points(ax, x, y, s=20, alpha=0.6, density=None):
+    """Desenha os pontos como scatter ou, para muitos pontos, como mapa de densidade.
+
+    No modo de densidade a contagem por célula é feita com np.histogram2d
+    antes de plotar, e o matplotlib recebe apenas uma imagem de
+    DENSITY_BINS x DENSITY_BINS com escala de cor logarítmica. Assim o custo
+    de renderização não depende do número de linhas (ex.: dados por classe do CK).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if density is None:
+        density = len(x) > DENSITY_THRESHOLD
+    if not density:
+        return ax.scatter(x, y, alpha=alpha, s=s)
+
+    x_range = (x.min(), x.max()) if x.max() > x.min() else (x.min() - 0.5, x.max() + 0.5)
+    y_range = (y.min(), y.max()) if y.max() > y.min() else (y.min() - 0.5, y.max() + 0.5)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=DENSITY_BINS, range=[x_range, y_range])
+    counts = np.ma.masked_equal(counts.T, 0)
+
+    image = ax.imshow(counts, origin='lower', aspect='auto', interpolation='nearest',
+                      extent=[x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]],
+                      norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)), cmap='viridis')
+    ax.figure.colorbar(image, ax=ax, label='Pontos por célula')
+    return image
+
+
+def plot_trend(ax, x, slope, intercept, **kwargs):
+    """Desenha a reta de tendência usando apenas os extremos de x"""
+    x_line = np.array([np.min(x), np.max(x)], dtype=np.float64)
+    return ax.plot(x_line, np.poly1d([slope, intercept])(x_line), **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Gráficos de analysis.py
+# ---------------------------------------------------------------------------
+
+def relationship_figure(df, stats_result, x_col, y_cols, xlabel):
+    """Scatter plots de uma variável x contra várias métricas de qualidade"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    axes = axes.flatten()
+
+    for i, y_col in enumerate(y_cols):
+        if i < 4 and y_col in df.columns:
+            clean_data = df[[x_col, y_col]].dropna()
+            if len(clean_data) > 0:
+                plot_points(axes[i], clean_data[x_col], clean_data[y_col], s=30)
+
+                # Linha de tendência
+                plot_trend(axes[i], clean_data[x_col], stats_result['slope'].loc[x_col, y_col],
+                           stats_result['intercept'].loc[x_col, y_col], color='r', linestyle='--', alpha=0.8)
+
+                axes[i].set_xlabel(xlabel)
+                axes[i].set_ylabel(y_col.upper())
+                axes[i].set_title(f'{y_col.upper()} vs {xlabel}')
+
+                # Adicionar coeficiente de correlação
+                corr = stats_result['r'].loc[x_col, y_col]
+                axes[i].text(0.05, 0.95, f'r = {corr:.3f}',
+                             transform=axes[i].transAxes,
+                             bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
+
+    plt.tight_layout()
+    return fig
+
+
+def distributions_figure(df, stats_result):
+    """Histogramas das métricas de processo e de qualidade"""
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    axes = axes.flatten()
+
+    for i, metric in enumerate(['stars', 'idade_anos', 'releases', 'cbo', 'dit', 'lcom']):
+        if metric in df.columns:
+            clean_data = df[metric].dropna()
+            axes[i].hist(clean_data, bins=30, alpha=0.7, edgecolor='black')
+            axes[i].set_title(f'Distribuição de {metric.upper()}')
+            axes[i].set_xlabel(metric.upper())
+            axes[i].set_ylabel('Frequência')
+
+            # Adicionar estatísticas
+            mean_val = stats_result['describe'].loc['mean', metric]
+            median_val = stats_result['describe'].loc['median', metric]
+            axes[i].axvline(mean_val, color='red', linestyle='--', label=f'Média: {mean_val:.2f}')
+            axes[i].axvline(median_val, color='green', linestyle='--', label=f'Mediana: {median_val:.2f}')
+            axes[i].legend()
+
+    plt.tight_layout()
+    return fig
+
+
+def correlation_heatmap(df, stats_result, numeric_cols):
+    """Heatmap da matriz de correlação completa"""
+    correlation_matrix = stats_result['r'].loc[numeric_cols, numeric_cols]
+
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+                square=True, fmt='.3f', cbar_kws={'label': 'Coeficiente de Correlação'})
+    plt.title('Matriz de Correlação entre Métricas')
+    plt.tight_layout()
+    return fig
+
+
+def quartile_boxplot(df, stats_result):
+    """Box plots das métricas de qualidade por quartil de popularidade"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    axes = axes.flatten()
+
+    for i, metric in enumerate(METRICS):
+        if metric in df.columns:
+            quartile_boxplot_axes(axes[i], df, metric)
+            axes[i].set_title(f'{metric.upper()} por Quartil de Popularidade')
+            axes[i].set_xlabel('Quartil de Popularidade')
+            axes[i].set_ylabel(metric.upper())
+            axes[i].tick_params(axis='x', rotation=45)
+
+    plt.tight_layout()
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Gráficos de graficos_detalhados.py
+# ---------------------------------------------------------------------------
+
+def rq_panel_figure(df, stats_result, x_col, metrics, titles, suptitle, xlabel, layout):
+    """Painel de uma questão de pesquisa: uma métrica de processo contra as de qualidade"""
+    nrows, ncols = layout
+    figsize = (16, 12) if nrows > 1 else (18, 6)
+    fig, axes = plt.subplots(nrows, ncols, figsize=figsize)
+    fig.suptitle(suptitle, fontsize=16, fontweight='bold')
+    axes = np.atleast_1d(axes).flatten()
+
+    for i, (metric, title) in enumerate(zip(metrics, titles)):
+        ax = axes[i]
+
+        clean_data = df[[x_col, metric]].dropna()
+        if len(clean_data) > 0:
+            plot_points(ax, clean_data[x_col], clean_data[metric], s=20)
+
+            # Linha de tendência
+            plot_trend(ax, clean_data[x_col], stats_result['slope'].loc[x_col, metric],
+                       stats_result['intercept'].loc[x_col, metric],
+                       color='r', linestyle='--', alpha=0.8, linewidth=2)
+
+            corr = stats_result['r'].loc[x_col, metric]
+            p_val = stats_result['p'].loc[x_col, metric]
+
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(title)
+            ax.set_title(f'{title}\nCorrelação: r = {corr:.3f} (p = {p_val:.3f})')
+            ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+def detailed_quartile_boxplot(df, stats_result):
+    """Box plots por quartil de popularidade com média e mediana anotadas"""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Distribuição das Métricas de Qualidade por Quartil de Popularidade', fontsize=16, fontweight='bold')
+
+    for i, (metric, title) in enumerate(zip(METRICS, TITLES)):
+        ax = axes[i//2, i%2]
+
+        groups = quartile_boxplot_axes(ax, df, metric)
+        ax.set_title(f'{title} por Quartil de Popularidade')
+        ax.set_xlabel('Quartil de Popularidade')
+        ax.set_ylabel(title)
+        ax.tick_params(axis='x', rotation=45)
+
+        # Adicionar estatísticas
+        for j, values in enumerate(groups.values()):
+            ax.text(j, ax.get_ylim()[1] * 0.95, f'Média: {np.mean(values):.1f}\nMediana: {np.median(values):.1f}',
+                    ha='center', va='top', fontsize=8,
+                    bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
+
+    plt.tight_layout()
+    return fig
+
+
+def detailed_correlation_heatmap(df, stats_result, numeric_cols):
+    """Heatmap triangular da matriz de correlação"""
+    fig = plt.figure(figsize=(12, 10))
+
+    correlation_matrix = stats_result['r'].loc[numeric_cols, numeric_cols]
+
+    # Criar máscara para mostrar apenas metade da matriz
+    mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
+
+    sns.heatmap(correlation_matrix, mask=mask, annot=True, cmap='RdBu_r', center=0,
+                square=True, fmt='.3f', cbar_kws={'label': 'Coeficiente de Correlação'},
+                linewidths=0.5)
+
+    plt.title('Matriz de Correlação entre Métricas de Processo e Qualidade', fontsize=16, fontweight='bold', pad=20)
+    plt.tight_layout()
+    return fig
+
+
+def all_distributions_figure(df, stats_result):
+    """Histogramas de todas as métricas com média, mediana e desvio padrão"""
+    fig, axes = plt.subplots(2, 4, figsize=(20, 10))
+    fig.suptitle('Distribuições das Métricas de Processo e Qualidade', fontsize=16, fontweight='bold')
+
+    all_metrics = ['stars', 'releases', 'idade_anos', 'cbo', 'dit', 'lcom', 'loc']
+    all_titles = ['Estrelas', 'Releases', 'Idade (anos)', 'CBO', 'DIT', 'LCOM', 'LOC']
+
+    for i, (metric, title) in enumerate(zip(all_metrics, all_titles)):
+        ax = axes[i//4, i%4]
+
+        clean_data = df[metric].dropna()
+
+        ax.hist(clean_data, bins=30, alpha=0.7, edgecolor='black', color=sns.color_palette("Set2")[i%8])
+
+        mean_val = stats_result['describe'].loc['mean', metric]
+        median_val = stats_result['describe'].loc['median', metric]
+        std_val = stats_result['describe'].loc['std', metric]
+
+        ax.axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'Média: {mean_val:.1f}')
+        ax.axvline(median_val, color='green', linestyle='--', linewidth=2, label=f'Mediana: {median_val:.1f}')
+
+        ax.set_title(f'{title}\n(σ = {std_val:.1f})')
+        ax.set_xlabel(title)
+        ax.set_ylabel('Frequência')
+        ax.legend(fontsize=8)
+        ax.grid(True, alpha=0.3)
+
+    # Remover subplot vazio
+    axes[1, 3].remove()
+
+    plt.tight_layout()
+    return fig
@@ -0,0 +1,317 @@
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Métricas acompanhadas durante a execução do RepositoryAnalyzer
+ONLINE_COLUMNS = [
+    'stars', 'forks', 'releases', 'age_years', 'size_bytes',
+    'total_classes', 'total_loc', 'avg_cbo', 'avg_dit', 'avg_lcom', 'avg_loc_per_class',
+    'max_cbo', 'max_dit', 'max_lcom',
+]
+
+SKETCH_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """Sketch de quantis com erro relativo limitado e mesclável (estilo DDSketch).
+
+    Cada valor positivo cai no bucket ceil(log_gamma(v)); zero e valores
+    negativos têm contadores próprios. Dois sketches com a mesma precisão
+    são combinados somando os buckets, então o resultado é o mesmo que teria
+    sido obtido adicionando todos os valores a um único sketch.
+    """
+
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        if value > 0:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + count
+        elif value < 0:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def add_many(self, values):
+        """Adiciona um array de valores de uma vez (NaN são ignorados)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        for target, part in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(part):
+                keys, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64),
+                                         return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    target[key] = target.get(key, 0) + count
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches com precisões diferentes não podem ser mesclados")
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Valor aproximado do quantil q (0 a 1), ou NaN se o sketch estiver vazio"""
+        if self.count == 0:
+            return float('nan')
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(k): v for k, v in self.positive.items()},
+            'negative': {str(k): v for k, v in self.negative.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = {int(k): v for k, v in data['positive'].items()}
+        sketch.negative = {int(k): v for k, v in data['negative'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        return sketch
+
+
+def _to_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class OnlineStatistics:
+    """Acumulador incremental de contagens, médias, variâncias, covariâncias e quantis.
+
+    As estatísticas univariadas usam o algoritmo de Welford por coluna; a
+    matriz de covariância usa a versão multivariada sobre as linhas completas.
+    Tudo é atualizado em O(k²) por resultado e pode ser mesclado (Chan et
+    al.), então não é preciso reler o CSV para consultar o estado atual.
+    """
+
+    def __init__(self, columns=ONLINE_COLUMNS):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = [0] * k
+        self.mean = [0.0] * k
+        self.m2 = [0.0] * k
+        self.min = [math.inf] * k
+        self.max = [-math.inf] * k
+        self.sketches = [QuantileSketch() for _ in range(k)]
+
+        # Linhas com todas as colunas presentes, para covariância/correlação
+        self.complete_count = 0
+        self.complete_mean = [0.0] * k
+        self.comoment = [[0.0] * k for _ in range(k)]
+
+    def update(self, row):
+        """Adiciona um resultado (dict com as colunas acompanhadas)"""
+        values = [_to_float(row.get(col)) for col in self.columns]
+
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            self.count[i] += 1
+            delta = value - self.mean[i]
+            self.mean[i] += delta / self.count[i]
+            self.m2[i] += delta * (value - self.mean[i])
+            self.min[i] = min(self.min[i], value)
+            self.max[i] = max(self.max[i], value)
+            self.sketches[i].add(value)
+
+        if all(value is not None for value in values):
+            self.complete_count += 1
+            n = self.complete_count
+            deltas = [value - mean for value, mean in zip(values, self.complete_mean)]
+            self.complete_mean = [mean + delta / n for mean, delta in zip(self.complete_mean, deltas)]
+            for i in range(len(values)):
+                for j in range(len(values)):
+                    self.comoment[i][j] += deltas[i] * (values[j] - self.complete_mean[j])
+
+    @classmethod
+    def from_array(cls, values, columns):
+        """Cria um acumulador a partir de uma matriz (n, k) com NaN para ausentes"""
+        values = np.asarray(values, dtype=np.float64)
+        stats = cls(columns)
+        valid = ~np.isnan(values)
+        for i in range(len(stats.columns)):
+            column = values[valid[:, i], i]
+            if len(column) == 0:
+                continue
+            stats.count[i] = len(column)
+            stats.mean[i] = float(column.mean())
+            stats.m2[i] = float(((column - stats.mean[i]) ** 2).sum())
+            stats.min[i] = float(column.min())
+            stats.max[i] = float(column.max())
+            stats.sketches[i].add_many(column)
+
+        complete = values[valid.all(axis=1)]
+        if len(complete):
+            mean = complete.mean(axis=0)
+            centered = complete - mean
+            stats.complete_count = len(complete)
+            stats.complete_mean = mean.tolist()
+            stats.comoment = (centered.T @ centered).tolist()
+        return stats
+
+    def update_many(self, values):
+        """Adiciona um lote de linhas (matriz (n, k)) de forma vetorizada"""
+        return self.merge(OnlineStatistics.from_array(values, self.columns))
+
+    def merge(self, other):
+        """Combina outro acumulador com as mesmas colunas neste"""
+        if other.columns != self.columns:
+            raise ValueError("Acumuladores com colunas diferentes não podem ser mesclados")
+        for i in range(len(self.columns)):
+            n_a, n_b = self.count[i], other.count[i]
+            if n_b == 0:
+                continue
+            n = n_a + n_b
+            delta = other.mean[i] - self.mean[i]
+            self.mean[i] += delta * n_b / n
+            self.m2[i] += other.m2[i] + delta ** 2 * n_a * n_b / n
+            self.count[i] = n
+            self.min[i] = min(self.min[i], other.min[i])
+            self.max[i] = max(self.max[i], other.max[i])
+            self.sketches[i].merge(other.sketches[i])
+
+        n_a, n_b = self.complete_count, other.complete_count
+        if n_b:
+            n = n_a + n_b
+            deltas = [b - a for a, b in zip(self.complete_mean, other.complete_mean)]
+            for i in range(len(self.columns)):
+                for j in range(len(self.columns)):
+                    self.comoment[i][j] += other.comoment[i][j] + deltas[i] * deltas[j] * n_a * n_b / n
+            self.complete_mean = [a + d * n_b / n for a, d in zip(self.complete_mean, deltas)]
+            self.complete_count = n
+        return self
+
+    def describe(self):
+        """Tabela descritiva atual (uma linha por coluna)"""
+        import pandas as pd
+
+        rows = []
+        for i, col in enumerate(self.columns):
+            n = self.count[i]
+            rows.append({
+                'count': n,
+                'mean': self.mean[i] if n else math.nan,
+                'std': math.sqrt(self.m2[i] / (n - 1)) if n > 1 else math.nan,
+                'min': self.min[i] if n else math.nan,
+                'p25': self.sketches[i].quantile(0.25),
+                'median': self.sketches[i].quantile(0.5),
+                'p75': self.sketches[i].quantile(0.75),
+                'p90': self.sketches[i].quantile(0.9),
+                'max': self.max[i] if n else math.nan,
+            })
+        return pd.DataFrame(rows, index=self.columns)
+
+    def covariance_matrix(self):
+        import pandas as pd
+
+        n = self.complete_count
+        cov = [[c / (n - 1) if n > 1 else math.nan for c in row] for row in self.comoment]
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation_matrix(self):
+        """Correlação de Pearson atual entre as colunas (linhas completas)"""
+        import pandas as pd
+
+        k = len(self.columns)
+        corr = [[math.nan] * k for _ in range(k)]
+        for i in range(k):
+            for j in range(k):
+                denominator = math.sqrt(self.comoment[i][i] * self.comoment[j][j])
+                if denominator > 0:
+                    corr[i][j] = self.comoment[i][j] / denominator
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def to_dict(self):
+        return {
+            'columns': self.columns,
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': [v if math.isfinite(v) else None for v in self.min],
+            'max': [v if math.isfinite(v) else None for v in self.max],
+            'sketches': [sketch.to_dict() for sketch in self.sketches],
+            'complete_count': self.complete_count,
+            'complete_mean': self.complete_mean,
+            'comoment': self.comoment,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['columns'])
+        stats.count = data['count']
+        stats.mean = data['mean']
+        stats.m2 = data['m2']
+        stats.min = [math.inf if v is None else v for v in data['min']]
+        stats.max = [-math.inf if v is None else v for v in data['max']]
+        stats.sketches = [QuantileSketch.from_dict(s) for s in data['sketches']]
+        stats.complete_count = data['complete_count']
+        stats.complete_mean = data['complete_mean']
+        stats.comoment = data['comoment']
+        return stats
+
+    def save(self, path):
+        """Grava o estado de forma atômica (arquivo temporário + rename)"""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, columns=ONLINE_COLUMNS):
+        path = Path(path)
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    stats = cls.from_dict(json.load(file))
+                if stats.columns == list(columns):
+                    return stats
+                print(f"⚠️ Colunas de {path} mudaram, reiniciando estatísticas online")
+            except Exception as e:
+                print(f"⚠️ Erro ao carregar estatísticas online de {path}: {e}")
+        return cls(columns)
@@ -0,0 +1,150 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Intervalo entre amostras de /proc enquanto o processo roda
+SAMPLE_INTERVAL = 0.5
+
+
+def _read_proc(pid):
+    """Amostra de /proc/<pid>: memória residente atual e pico, threads e bytes lidos/escritos"""
+    sample = {}
+    try:
+        with open(f'/proc/{pid}/status', 'r') as file:
+            for line in file:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'VmHWM'):
+                    sample[key] = int(value.split()[0]) * 1024
+                elif key == 'Threads':
+                    sample[key] = int(value)
+    except (OSError, ValueError):
+        return None
+    try:
+        with open(f'/proc/{pid}/io', 'r') as file:
+            for line in file:
+                key, _, value = line.partition(':')
+                sample[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return sample
+
+
+def rss_to_mb(maxrss):
+    """Converte ru_maxrss para MB: o valor vem em bytes no macOS e em KB no Linux"""
+    return round(maxrss / (2 ** 20 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _drain(stream, chunks):
+    for chunk in iter(lambda: stream.read(65536), ''):
+        chunks.append(chunk)
+    stream.close()
+
+
+def run_with_accounting(cmd, cwd=None, timeout=None, sample_interval=SAMPLE_INTERVAL):
+    """Executa ``cmd`` como subprocess.run(capture_output=True, text=True), medindo os recursos.
+
+    O processo é coletado com os.wait4, que devolve o rusage do filho (CPU
+    de usuário/sistema, pico de RSS, blocos de E/S, trocas de contexto).
+    Enquanto roda, /proc/<pid> é amostrado para a memória ao longo do
+    tempo, o número de threads e os bytes lidos/escritos (os bytes depois da
+    última amostra não entram). Sem /proc (ex.: macOS) não há amostras, e
+    sem os.wait4 (Windows) só o tempo de parede é medido.
+
+    Retorna (CompletedProcess, uso). Em timeout o processo é morto e
+    TimeoutExpired é levantada com o uso parcial em ``exc.usage``.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, encoding='utf-8', errors='replace')
+    if not hasattr(os, 'wait4'):
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            process.kill()
+            process.communicate()
+            e.usage = {'ck_wall_seconds': round(time.perf_counter() - start, 3)}
+            raise
+        usage = {'ck_wall_seconds': round(time.perf_counter() - start, 3),
+                 'ck_exit_code': process.returncode}
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr), usage
+
+    stdout, stderr = [], []
+    readers = [threading.Thread(target=_drain, args=(process.stdout, stdout), daemon=True),
+               threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True)]
+    for reader in readers:
+        reader.start()
+
+    samples = 0
+    peak = {'VmRSS': 0, 'VmHWM': 0, 'Threads': 0}
+    last = {}
+    done = threading.Event()
+    timed_out = threading.Event()
+
+    def sample_proc():
+        nonlocal samples, last
+        while not done.is_set():
+            sample = _read_proc(process.pid)
+            if sample and not done.is_set():
+                samples += 1
+                last = sample
+                for key in peak:
+                    peak[key] = max(peak[key], sample.get(key, 0))
+            done.wait(sample_interval)
+
+    def kill():
+        if not done.is_set():
+            timed_out.set()
+            process.kill()
+
+    # A espera bloqueia em os.wait4 e retorna assim que o processo termina; a
+    # amostragem de /proc e o timeout ficam em threads separadas
+    sampler = threading.Thread(target=sample_proc, daemon=True)
+    sampler.start()
+    timer = threading.Timer(timeout, kill) if timeout is not None else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+    try:
+        pid, status, rusage = os.wait4(process.pid, 0)
+    finally:
+        done.set()
+        if timer:
+            timer.cancel()
+    sampler.join()
+
+    wall = time.perf_counter() - start
+    # O processo já foi coletado; evita que o Popen tente coletá-lo de novo
+    process.returncode = os.waitstatus_to_exitcode(status)
+    for reader in readers:
+        reader.join(timeout=5)
+
+    usage = {
+        'ck_wall_seconds': round(wall, 3),
+        'ck_user_seconds': round(rusage.ru_utime, 3),
+        'ck_system_seconds': round(rusage.ru_stime, 3),
+        'ck_cpu_seconds': round(rusage.ru_utime + rusage.ru_stime, 3),
+        'ck_max_rss_mb': rss_to_mb(rusage.ru_maxrss),
+        'ck_sampled_rss_mb': round(max(peak['VmHWM'], peak['VmRSS']) / 2 ** 20, 1),
+        'ck_threads_max': peak['Threads'],
+        'ck_read_mb': round(last.get('rchar', 0) / 2 ** 20, 2),
+        'ck_write_mb': round(last.get('wchar', 0) / 2 ** 20, 2),
+        'ck_block_in': rusage.ru_inblock,
+        'ck_block_out': rusage.ru_oublock,
+        'ck_voluntary_switches': rusage.ru_nvcsw,
+        'ck_involuntary_switches': rusage.ru_nivcsw,
+        'ck_samples': samples,
+        'ck_exit_code': process.returncode,
+    }
+    if timed_out.is_set():
+        error = subprocess.TimeoutExpired(cmd, timeout, ''.join(stdout), ''.join(stderr))
+        error.usage = usage
+        raise error
+    return subprocess.CompletedProcess(cmd, process.returncode, ''.join(stdout), ''.join(stderr)), usage
+
+
+def count_files(root, pattern='*.java'):
+    """Número de arquivos que casam com o padrão (recursivo)"""
+    return sum(1 for _ in Path(root).rglob(pattern))
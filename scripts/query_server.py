@@ -0,0 +1,384 @@
+import argparse
+import json
+import math
+import operator
+import os
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from class_sketches import DEFAULT_QUANTILES, SKETCH_METRICS, load_sketch_table, sketch_path_for
+from repository_store import COLLECTOR_FILE, GROUP_LABELS, RESULTS_FILE, RUN_FILE, open_store
+from stats_engine import DESCRIBE_KEYS, PROCESS_COLUMNS, QUALITY_COLUMNS, STAT_COLUMNS, compute_statistics
+
+DEFAULT_PORT = 8765
+CACHE_SIZE = 1024
+# Latências guardadas para os percentis de /stats
+LATENCY_WINDOW = 1000
+
+OPERATORS = {'=': operator.eq, '==': operator.eq, '!=': operator.ne,
+             '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+ROUTES = ('/columns', '/describe', '/group', '/correlation', '/repo', '/class_distribution')
+CONDITION = re.compile(r'^\s*(\w+)\s*(<=|>=|!=|==|=|<|>)\s*(.*?)\s*$')
+
+GROUP_STATS = {
+    'count': len,
+    'mean': np.mean,
+    'median': np.median,
+    'std': lambda v: np.std(v, ddof=1),
+    'min': np.min,
+    'max': np.max,
+}
+
+
+class QueryError(ValueError):
+    """Parâmetro de consulta inválido (vira HTTP 400)"""
+
+
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else value
+
+
+def _split(params, name, default=None):
+    """Lista de valores de um parâmetro, aceitando repetição e vírgulas (?x=a,b&x=c)"""
+    values = [item for value in params.get(name, []) for item in value.split(',') if item]
+    return values or list(default or [])
+
+
+class QueryEngine:
+    """Consultas de filtro, grupo e correlação sobre colunas pré-carregadas do store.
+
+    As colunas numéricas do store são convertidas uma vez para float64 e os
+    códigos dos agrupamentos vêm dos índices já calculados. Cada resposta é
+    guardada já serializada em um cache LRU, chaveado pela consulta
+    normalizada; o cache é descartado quando o store ou os sketches mudam.
+    """
+
+    def __init__(self, results_path=RESULTS_FILE, cache_size=CACHE_SIZE, sketches_path=None):
+        self.results_path = results_path
+        self.sketches_path = sketches_path or sketch_path_for(RUN_FILE)
+        self.store = None
+        self.sketches = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._cached = lru_cache(maxsize=cache_size)(self._execute)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.refresh()
+
+    def _source_signature(self):
+        """mtime e tamanho de cada fonte (None se ausente)"""
+        signature = []
+        for path in (self.results_path, COLLECTOR_FILE, RUN_FILE, self.sketches_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self):
+        """Recarrega as colunas se alguma fonte do store mudou.
+
+        O caminho rápido só compara mtime e tamanho das fontes; o store e os
+        sketches (que conferem os hashes) só são consultados quando mudam.
+        """
+        signature = self._source_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            store = open_store(self.results_path)
+            sketches = load_sketch_table(self.sketches_path) if os.path.exists(self.sketches_path) else None
+            if store is not self.store:
+                self._load_columns(store)
+            if sketches is not None and (sketches is not self.sketches or store is not self.store):
+                # Linha dos sketches de cada linha do store (-1 sem sketch)
+                self.sketch_rows = np.array([sketches.row_of.get(key, -1) for key in store.table['key'].tolist()],
+                                            dtype=np.int64)
+            if store is not self.store or sketches is not self.sketches:
+                self.store = store
+                self.sketches = sketches
+                self._cached.cache_clear()
+            self._signature = signature
+
+    def _load_columns(self, store):
+        table = store.table
+        self.numeric = {}
+        self.text = {}
+        for name in store.meta['columns']:
+            if table.dtype[name].kind in 'biuf':
+                self.numeric[name] = np.asarray(table[name], dtype=np.float64)
+            elif table.dtype[name].kind == 'U':
+                self.text[name] = np.asarray(table[name])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.numeric['log_stars'] = np.log10(self.numeric['stars'])
+        self.codes = {name: store.indexes[name]['codes'] for name in GROUP_LABELS}
+        self.analysis_rows = store.analysis_rows
+
+    def query(self, path, params):
+        """Resposta JSON (bytes) e se veio do cache"""
+        self.refresh()
+        key = (path, tuple(sorted((name, tuple(sorted(values))) for name, values in params.items())))
+        hits = self._cached.cache_info().hits
+        body = self._cached(*key)
+        return body, self._cached.cache_info().hits > hits
+
+    def _execute(self, path, params):
+        params = {name: list(values) for name, values in params}
+        result = getattr(self, path.lstrip('/'))(params)
+        return json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+    def _column(self, name):
+        if name not in self.numeric:
+            raise QueryError(f"Coluna numérica desconhecida: {name}")
+        return self.numeric[name]
+
+    def _condition(self, text, rows):
+        match = CONDITION.match(text)
+        if not match:
+            raise QueryError(f"Filtro inválido: {text!r} (use ex.: idade_anos>5)")
+        name, symbol, value = match.groups()
+        compare = OPERATORS[symbol]
+        if name in self.codes:
+            if value not in GROUP_LABELS[name] or symbol not in ('=', '==', '!='):
+                raise QueryError(f"{name} aceita apenas = ou != com: {', '.join(GROUP_LABELS[name])}")
+            return compare(self.codes[name][:rows], GROUP_LABELS[name].index(value))
+        if name in self.text:
+            if symbol not in ('=', '==', '!='):
+                raise QueryError(f"{name} é texto: use = ou !=")
+            return compare(self.text[name][:rows], value)
+        try:
+            threshold = float(value)
+        except ValueError:
+            raise QueryError(f"Valor não numérico em {text!r}") from None
+        with np.errstate(invalid='ignore'):
+            return compare(self._column(name)[:rows], threshold)
+
+    def select(self, params):
+        """Posições das linhas selecionadas por scope, where, top e order"""
+        scope = params.get('scope', ['analisados'])[0]
+        if scope not in ('analisados', 'todos'):
+            raise QueryError("scope deve ser 'analisados' ou 'todos'")
+        rows = self.analysis_rows if scope == 'analisados' else len(self.store)
+
+        mask = np.ones(rows, dtype=bool)
+        for condition in params.get('where', []):
+            mask &= self._condition(condition, rows)
+        positions = np.flatnonzero(mask)
+
+        if 'top' in params:
+            try:
+                top = int(params['top'][0])
+            except ValueError:
+                top = 0
+            if top < 1:
+                raise QueryError("top deve ser um inteiro maior que zero")
+            values = self._column(params.get('order', ['stars'])[0])[positions]
+            # Ordem decrescente; NaN vai para o fim
+            positions = positions[np.argsort(-values, kind='stable')[:top]]
+        return positions
+
+    def columns(self, params):
+        return {
+            'numeric': sorted(self.numeric),
+            'text': sorted(self.text),
+            'groupings': GROUP_LABELS,
+            'rows': len(self.store),
+            'analysis_rows': self.analysis_rows,
+        }
+
+    def describe(self, params):
+        positions = self.select(params)
+        result = {}
+        for name in _split(params, 'columns', STAT_COLUMNS):
+            values = self._column(name)[positions]
+            values = values[~np.isnan(values)]
+            if len(values):
+                stats = [len(values), np.mean(values), np.median(values),
+                         np.std(values, ddof=1) if len(values) > 1 else np.nan,
+                         np.min(values), np.max(values)]
+            else:
+                stats = [0] + [np.nan] * (len(DESCRIBE_KEYS) - 1)
+            result[name] = dict(zip(DESCRIBE_KEYS, map(_number, stats)))
+        return {'rows': len(positions), 'describe': result}
+
+    def group(self, params):
+        grouping = params.get('by', ['stars_quartile'])[0]
+        if grouping not in GROUP_LABELS:
+            raise QueryError(f"by deve ser um de: {', '.join(GROUP_LABELS)}")
+        stats = _split(params, 'stats', ['count', 'mean', 'median', 'std'])
+        unknown = [stat for stat in stats if stat not in GROUP_STATS]
+        if unknown:
+            raise QueryError(f"Estatística desconhecida: {', '.join(unknown)}")
+
+        positions = self.select(params)
+        codes = self.codes[grouping][positions]
+        result = {}
+        for name in _split(params, 'columns', QUALITY_COLUMNS):
+            values = self._column(name)[positions]
+            table = {}
+            for i, label in enumerate(GROUP_LABELS[grouping]):
+                part = values[codes == i]
+                part = part[~np.isnan(part)]
+                table[label] = {stat: _number(GROUP_STATS[stat](part)) if len(part) > (stat == 'std')
+                                else (0 if stat == 'count' else None) for stat in stats}
+            result[name] = table
+        return {'rows': len(positions), 'by': grouping, 'groups': result}
+
+    def correlation(self, params):
+        method = params.get('method', ['pearson'])[0]
+        if method not in ('pearson', 'spearman'):
+            raise QueryError("method deve ser 'pearson' ou 'spearman'")
+        x_columns = _split(params, 'x', PROCESS_COLUMNS)
+        y_columns = _split(params, 'y', QUALITY_COLUMNS)
+        columns = list(dict.fromkeys(x_columns + y_columns))
+
+        positions = self.select(params)
+        if len(positions) < 3:
+            raise QueryError(f"Correlação precisa de pelo menos 3 linhas selecionadas ({len(positions)})")
+        df = pd.DataFrame({name: self._column(name)[positions] for name in columns})
+        if method == 'pearson':
+            result = compute_statistics(df, columns)
+            cells = {(x, y): (result['r'].loc[x, y], result['p'].loc[x, y], result['n'].loc[x, y])
+                     for x in x_columns for y in y_columns}
+        else:
+            # Spearman = Pearson sobre os postos (empates com posto médio); p pela mesma aproximação t.
+            # Os postos são refeitos em cada par, só sobre as linhas sem NaN nas duas colunas
+            cells = {}
+            for x in x_columns:
+                for y in y_columns:
+                    pair = df[list(dict.fromkeys([x, y]))].dropna().rank()
+                    if len(pair) < 3:
+                        cells[(x, y)] = (np.nan, np.nan, len(pair))
+                        continue
+                    result = compute_statistics(pair, list(pair.columns))
+                    cells[(x, y)] = (result['r'].loc[x, y], result['p'].loc[x, y], result['n'].loc[x, y])
+        return {
+            'rows': len(positions),
+            'method': method,
+            'correlation': {x: {y: {'r': _number(cells[(x, y)][0]), 'p': _number(cells[(x, y)][1]),
+                                    'n': int(cells[(x, y)][2])}
+                                for y in y_columns}
+                            for x in x_columns},
+        }
+
+    def repo(self, params):
+        names = _split(params, 'name')
+        if not names:
+            raise QueryError("Informe name=owner/nome")
+        result = {}
+        for name in names:
+            record = self.store.lookup(name)
+            result[name] = record and {field: _number(value) if isinstance(value, float) else value
+                                       for field, value in record.items()}
+        return result
+
+    def class_distribution(self, params):
+        """Percentis e histograma por classe das linhas selecionadas, mesclando os sketches"""
+        if self.sketches is None:
+            raise QueryError(f"Sketches por classe não encontrados em {self.sketches_path}")
+        metrics = _split(params, 'metric', SKETCH_METRICS)
+        unknown = [metric for metric in metrics if metric not in SKETCH_METRICS]
+        if unknown:
+            raise QueryError(f"Métrica desconhecida: {', '.join(unknown)} (use {', '.join(SKETCH_METRICS)})")
+        try:
+            quantiles = [float(q) for q in _split(params, 'q', DEFAULT_QUANTILES)]
+        except ValueError:
+            raise QueryError("q deve ser uma lista de números entre 0 e 1") from None
+        if any(not 0 <= q <= 1 for q in quantiles):
+            raise QueryError("q deve ser uma lista de números entre 0 e 1")
+
+        positions = self.select(params)
+        rows = self.sketch_rows[positions]
+        rows = rows[rows >= 0]
+        return {
+            'rows': len(positions),
+            'distribution': {metric: self.sketches.distribution(metric, rows, quantiles) for metric in metrics},
+        }
+
+    def stats(self):
+        info = self._cached.cache_info()
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            'cache': {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize},
+            'latency_ms': {'requests': len(self.latencies), 'p50': _number(np.percentile(latencies, 50)),
+                           'p95': _number(np.percentile(latencies, 95)), 'max': _number(latencies.max())},
+        }
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    engine = None
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        self.cached = False
+        try:
+            if url.path == '/stats':
+                status, body = 200, json.dumps(self.engine.stats()).encode('utf-8')
+            elif url.path in ROUTES:
+                body, self.cached = self.engine.query(url.path, parse_qs(url.query))
+                status = 200
+            else:
+                status = 404
+                body = json.dumps({'error': f'Caminho desconhecido: {url.path}',
+                                   'routes': list(ROUTES) + ['/stats']}).encode('utf-8')
+        except QueryError as e:
+            status, body = 400, json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+        except Exception as e:
+            # Erros inesperados (NumPy/pandas, fonte removida durante o refresh) ainda viram uma resposta
+            traceback.print_exc()
+            status = 500
+            body = json.dumps({'error': f'Erro interno: {type(e).__name__}: {e}'}, ensure_ascii=False).encode('utf-8')
+        self.elapsed_ms = (time.perf_counter() - start) * 1000
+        if status == 200:
+            self.engine.latencies.append(self.elapsed_ms)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Query-Time-Ms', f'{self.elapsed_ms:.3f}')
+        self.send_header('X-Cache', 'hit' if self.cached else 'miss')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_request(self, code='-', size='-'):
+        print(f"{self.command} {self.path} {code} {getattr(self, 'elapsed_ms', 0):.2f} ms"
+              f"{' (cache)' if getattr(self, 'cached', False) else ''}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Serviço HTTP local de consultas sobre os resultados da análise')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--results', default=RESULTS_FILE,
+                        help='CSV de resultados (padrão: %(default)s)')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help='consultas guardadas no cache LRU (padrão: %(default)s)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    QueryHandler.engine = QueryEngine(args.results, args.cache_size)
+    print(f"📦 {len(QueryHandler.engine.store)} repositórios carregados em {time.perf_counter() - start:.2f}s")
+    server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+    print(f"🌐 Consultas em http://{args.host}:{args.port} "
+          f"(/columns, /describe, /group, /correlation, /repo, /class_distribution, /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Servidor encerrado")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import time
+import concurrent.futures
+from collections import namedtuple
+
+# Cada gráfico é uma tarefa independente: uma função de figures.py que recebe
+# (df, stats_result, **kwargs) e devolve a figura a ser salva em ``output``.
+# ``columns`` lista as colunas do dataset usadas (None = todas), para o build
+# incremental de build_graph.py.
+FigureTask = namedtuple('FigureTask', ['output', 'func', 'kwargs', 'style', 'columns'],
+                        defaults=(None,))
+
+DPI = 300
+
+_worker_data = None
+
+
+def _load_data():
+    """Carrega dataset e estatísticas uma única vez por processo"""
+    global _worker_data
+    if _worker_data is None:
+        from stats_engine import get_statistics, load_dataset
+        df = load_dataset()
+        _worker_data = (df, get_statistics(df=df))
+    return _worker_data
+
+
+def _use_headless_backend():
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _render(task, show=False):
+    """Renderiza uma tarefa e retorna (arquivo, segundos)"""
+    import matplotlib.pyplot as plt
+    from figures import apply_style
+
+    start = time.perf_counter()
+    df, stats_result = _load_data()
+    apply_style(task.style)
+    fig = task.func(df.copy(), stats_result, **task.kwargs)
+    fig.savefig(task.output, dpi=DPI, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
+    return task.output, time.perf_counter() - start
+
+
+def _render_headless(task):
+    _use_headless_backend()
+    return _render(task)
+
+
+def render_figures(tasks, headless=False, workers=None, data=None):
+    """Renderiza a lista de tarefas e imprime o tempo de cada gráfico.
+
+    No modo interativo os gráficos são gerados em sequência e exibidos com
+    plt.show(), como antes. No modo headless usa o backend Agg, não chama
+    plt.show() e distribui as tarefas em um pool de processos com um worker
+    por núcleo disponível. ``data`` permite reaproveitar o par
+    (df, stats_result) já carregado pelo script chamador.
+    """
+    global _worker_data
+    if data is not None:
+        _worker_data = data
+
+    start = time.perf_counter()
+    timings = {}
+
+    if not headless:
+        for task in tasks:
+            output, elapsed = _render(task, show=True)
+            timings[output] = elapsed
+            print(f"🖼️ {output} gerado em {elapsed:.2f}s")
+    else:
+        _use_headless_backend()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(tasks)))
+        print(f"Renderizando {len(tasks)} gráficos em modo headless com {workers} processos...")
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_render_headless, task): task for task in tasks}
+            for future in concurrent.futures.as_completed(futures):
+                task = futures[future]
+                try:
+                    output, elapsed = future.result()
+                    timings[output] = elapsed
+                    print(f"🖼️ {output} gerado em {elapsed:.2f}s")
+                except Exception as e:
+                    print(f"✗ Erro ao gerar {task.output}: {e}")
+
+    total = time.perf_counter() - start
+    print(f"⏱️ {len(timings)}/{len(tasks)} gráficos gerados em {total:.2f}s "
+          f"(soma dos tempos individuais: {sum(timings.values()):.2f}s)")
+    return timings
+
+
+def add_render_arguments(parser):
+    """Adiciona as opções de renderização comuns aos scripts de gráficos"""
+    parser.add_argument('--headless', action='store_true',
+                        help='usa o backend Agg, não abre janelas e renderiza em paralelo')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='número de processos no modo headless (padrão: núcleos disponíveis)')
+    return parser
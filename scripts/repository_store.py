@@ -0,0 +1,347 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import SCHEMAS, content_hash, load_table
+
+RESULTS_FILE = 'results/repository_analysis_results.csv'
+COLLECTOR_FILE = 'results/top_1000_java_repos_metrics.csv'
+# Saída completa do RepositoryAnalyzer (metadados da execução), quando disponível
+RUN_FILE = 'repository_analysis_results.csv'
+
+# Incrementar quando o formato do store ou a definição dos grupos mudar
+STORE_VERSION = 2
+
+COLLECTOR_COLUMNS = ['full_name', 'owner', 'name', 'description', 'url', 'forks',
+                     'primary_language', 'age_years', 'size_bytes']
+RUN_COLUMNS = ['analysis_status', 'total_classes', 'total_loc']
+
+QUARTILE_LABELS = ['Q1 (Baixa)', 'Q2 (Média-Baixa)', 'Q3 (Média-Alta)', 'Q4 (Alta)']
+AGE_BINS = [0, 3, 6, 9, 12, np.inf]
+AGE_LABELS = ['0-3 anos', '3-6 anos', '6-9 anos', '9-12 anos', '12+ anos']
+RELEASE_BINS = [-np.inf, 0, 9, 29, np.inf]
+RELEASE_LABELS = ['0', '1-9', '10-29', '30+']
+
+GROUP_LABELS = {
+    'stars_quartile': QUARTILE_LABELS,
+    'age_bucket': AGE_LABELS,
+    'release_bucket': RELEASE_LABELS,
+}
+
+# Stores já abertos neste processo, por diretório: (hashes das fontes, store)
+_opened = {}
+
+
+def normalize_key(name):
+    """Chave única 'owner/nome' em minúsculas (aceita URL do GitHub e sufixo .git)"""
+    key = str(name).strip().lower()
+    for prefix in ('https://github.com/', 'http://github.com/', 'github.com/'):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+    key = key.rstrip('/')
+    if key.endswith('.git'):
+        key = key[:-4]
+    return key
+
+
+def store_dir_for(results_path):
+    """Diretório do store, ao lado do CSV de resultados (ex.: results/.dados.csv.store)"""
+    results_path = Path(results_path)
+    return results_path.with_name(f'.{results_path.name}.store')
+
+
+def group_codes(frame, analysis_rows):
+    """Código do grupo (-1 = sem grupo) de cada linha, para cada agrupamento.
+
+    Os limites dos quartis de estrelas vêm apenas das linhas analisadas (as
+    mesmas do pd.qcut usado antes) e são estendidos para as demais linhas.
+    """
+    _, edges = pd.qcut(frame['stars'].iloc[:analysis_rows], q=4, retbins=True)
+    edges = np.array(edges, dtype=np.float64)
+    edges[0], edges[-1] = -np.inf, np.inf
+    groups = {
+        'stars_quartile': pd.cut(frame['stars'], bins=edges, labels=False),
+        'age_bucket': pd.cut(frame['idade_anos'], bins=AGE_BINS, labels=False, include_lowest=True),
+        'release_bucket': pd.cut(frame['releases'], bins=RELEASE_BINS, labels=False),
+    }
+    return {name: codes.fillna(-1).to_numpy().astype(np.int8) for name, codes in groups.items()}
+
+
+def build_group_index(codes, n_labels):
+    """Índice invertido rótulo -> linhas: posições ordenadas por grupo e offsets de cada grupo"""
+    positions = np.argsort(codes, kind='stable').astype(np.int32)
+    offsets = np.searchsorted(codes[positions], np.arange(n_labels + 1) - 0.5).astype(np.int32)
+    return {'codes': codes, 'positions': positions, 'offsets': offsets}
+
+
+def _source_hashes(results_path, collector_path, run_path):
+    return {
+        'results': content_hash(results_path),
+        'collector': content_hash(collector_path) if os.path.exists(collector_path) else None,
+        'run': content_hash(run_path) if run_path and os.path.exists(run_path) else None,
+    }
+
+
+def join_sources(results_path=RESULTS_FILE, collector_path=COLLECTOR_FILE, run_path=RUN_FILE):
+    """Junta resultados do CK, dados do coletor e metadados da execução pela chave normalizada.
+
+    As linhas analisadas vêm primeiro, na ordem do CSV de resultados, seguidas
+    dos repositórios que só existem no coletor. Para essas, estrelas, releases
+    e idade vêm do coletor; as métricas CK ficam NaN.
+    """
+    results = load_table(results_path, schema=SCHEMAS['results'])
+    results['key'] = results['repo'].map(normalize_key)
+    results = results.drop_duplicates('key')
+
+    if os.path.exists(collector_path):
+        collector = load_table(collector_path, schema=SCHEMAS['collector'])
+        collector['key'] = collector['full_name'].map(normalize_key)
+        collector = collector.drop_duplicates('key')
+    else:
+        collector = pd.DataFrame(columns=['key', 'stars', 'releases'] + COLLECTOR_COLUMNS)
+    collector = collector.rename(columns={'stars': 'collector_stars', 'releases': 'collector_releases'})
+    collector_columns = ['key', 'collector_stars', 'collector_releases'] + COLLECTOR_COLUMNS
+
+    analyzed = results.merge(collector[collector_columns], on='key', how='left')
+    only_collector = collector.loc[~collector['key'].isin(results['key']), collector_columns].copy()
+    only_collector['repo'] = only_collector['full_name']
+    only_collector['stars'] = only_collector['collector_stars']
+    only_collector['releases'] = only_collector['collector_releases']
+    only_collector['idade_anos'] = only_collector['age_years'].astype(results['idade_anos'].dtype)
+    # Sem concat quando vazio: colunas vazias do tipo object alterariam os tipos das demais
+    frame = pd.concat([analyzed, only_collector], ignore_index=True) if len(only_collector) else analyzed
+
+    if run_path and os.path.exists(run_path):
+        # Mesmo nome dos resultados curados, mas outro formato: o esquema é o da execução
+        run = load_table(run_path, schema=SCHEMAS['run'])
+        run['key'] = run['full_name'].map(normalize_key)
+        run = run.drop_duplicates('key', keep='last')
+        frame = frame.merge(run[['key'] + [c for c in RUN_COLUMNS if c in run.columns]],
+                            on='key', how='left')
+    for col in RUN_COLUMNS:
+        if col not in frame.columns:
+            frame[col] = '' if col == 'analysis_status' else np.nan
+
+    frame['has_ck'] = np.arange(len(frame)) < len(analyzed)
+    frame['has_collector'] = frame['key'].isin(collector['key'])
+    frame['full_name'] = frame['full_name'].where(frame['full_name'].notna(), frame['repo'])
+    return frame, len(analyzed)
+
+
+def _to_structured(frame):
+    dtypes = []
+    columns = {}
+    for col in frame.columns:
+        series = frame[col]
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            values = series.to_numpy()
+        else:
+            values = np.asarray(series.fillna('').astype(str).to_numpy(), dtype=str)
+        columns[col] = values
+        dtypes.append((col, values.dtype))
+    table = np.empty(len(frame), dtype=dtypes)
+    for col, values in columns.items():
+        table[col] = values
+    return table
+
+
+def build_store(results_path=RESULTS_FILE, collector_path=COLLECTOR_FILE, run_path=RUN_FILE):
+    """Monta o store (tabela unificada + índices) e grava ao lado do CSV de resultados"""
+    store_dir = store_dir_for(results_path)
+    _opened.pop(str(store_dir.resolve()), None)
+    hashes = _source_hashes(results_path, collector_path, run_path)
+
+    frame, analysis_rows = join_sources(results_path, collector_path, run_path)
+    codes = group_codes(frame, analysis_rows)
+    keys = frame['key'].to_numpy(dtype=str)
+    key_order = np.argsort(keys, kind='stable').astype(np.int32)
+
+    arrays = {'key_order': key_order}
+    for name, labels in GROUP_LABELS.items():
+        index = build_group_index(codes[name], len(labels))
+        arrays.update({f'{name}__{part}': values for part, values in index.items()})
+
+    tmp_dir = store_dir.with_name(store_dir.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    np.save(tmp_dir / 'table.npy', _to_structured(frame), allow_pickle=False)
+    np.savez(tmp_dir / 'indexes.npz', **arrays)
+    meta = {
+        'version': STORE_VERSION,
+        'sources': {'results': str(results_path), 'collector': str(collector_path),
+                    'run': str(run_path) if run_path else None},
+        'hashes': hashes,
+        'rows': len(frame),
+        'analysis_rows': analysis_rows,
+        'columns': list(frame.columns),
+    }
+    with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as file:
+        json.dump(meta, file, indent=2)
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    return meta
+
+
+class RepositoryStore:
+    """Tabela unificada dos repositórios com índices por chave e por grupo.
+
+    A tabela é um array estruturado mapeado em memória. Os agrupamentos
+    (quartil de estrelas, faixa de idade, faixa de releases) são índices
+    invertidos pré-calculados: as linhas de um grupo são uma fatia de
+    ``positions``, sem pd.qcut nem groupby a cada consulta.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / 'meta.json', 'r', encoding='utf-8') as file:
+            self.meta = json.load(file)
+        self.table = np.load(self.store_dir / 'table.npy', mmap_mode='r')
+        with np.load(self.store_dir / 'indexes.npz') as data:
+            arrays = {name: data[name] for name in data.files}
+        self.key_order = arrays['key_order']
+        self.indexes = {
+            name: {part: arrays[f'{name}__{part}'] for part in ('codes', 'positions', 'offsets')}
+            for name in GROUP_LABELS
+        }
+
+    def __len__(self):
+        return self.meta['rows']
+
+    @property
+    def analysis_rows(self):
+        return self.meta['analysis_rows']
+
+    def lookup(self, name):
+        """Linha de um repositório (dict) pela chave normalizada, ou None"""
+        keys = self.table['key']
+        key = normalize_key(name)
+        i = np.searchsorted(keys[self.key_order], key)
+        if i < len(self.key_order) and keys[self.key_order[i]] == key:
+            return _record(self.table[self.key_order[i]])
+        return None
+
+    def rows_for(self, grouping, label, analysis_only=False):
+        """Posições das linhas de um grupo (ex.: rows_for('stars_quartile', 'Q4 (Alta)'))"""
+        index = self.group_index(grouping, analysis_only)
+        i = GROUP_LABELS[grouping].index(label)
+        return index['positions'][index['offsets'][i]:index['offsets'][i + 1]]
+
+    def group_index(self, grouping, analysis_only=False):
+        """Índice do agrupamento, opcionalmente restrito às linhas com métricas CK"""
+        index = self.indexes[grouping]
+        if not analysis_only:
+            return {**index, 'rows': len(self)}
+        # Dentro de cada grupo as posições são crescentes: basta cortar em analysis_rows
+        n = self.analysis_rows
+        parts = [index['positions'][start:end] for start, end in zip(index['offsets'][:-1], index['offsets'][1:])]
+        parts = [part[:np.searchsorted(part, n)] for part in parts]
+        offsets = np.r_[0, np.cumsum([len(part) for part in parts])].astype(np.int32)
+        return {'codes': index['codes'][:n], 'positions': np.concatenate(parts), 'offsets': offsets, 'rows': n}
+
+    def frame(self, columns=None, analysis_only=False):
+        """DataFrame do store, com os grupos como colunas categóricas e os índices em ``attrs``"""
+        n = self.analysis_rows if analysis_only else len(self)
+        columns = self.meta['columns'] if columns is None else list(columns)
+        df = pd.DataFrame({col: self.table[col][:n] for col in columns}, copy=False)
+        df.attrs['group_index'] = {}
+        for grouping, labels in GROUP_LABELS.items():
+            index = self.group_index(grouping, analysis_only)
+            df[grouping] = pd.Categorical.from_codes(index['codes'], categories=labels)
+            df.attrs['group_index'][grouping] = index
+        return df
+
+
+def _record(row):
+    return {name: row[name].item() for name in row.dtype.names}
+
+
+def open_store(results_path=RESULTS_FILE, collector_path=COLLECTOR_FILE, run_path=RUN_FILE):
+    """Abre o store, reconstruindo-o se alguma das fontes mudou"""
+    store_dir = store_dir_for(results_path)
+    key = str(store_dir.resolve())
+    hashes = _source_hashes(results_path, collector_path, run_path)
+    opened = _opened.get(key)
+    if opened and opened[0] == hashes:
+        return opened[1]
+
+    try:
+        with open(store_dir / 'meta.json', 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        meta = None
+    if meta is None or meta.get('version') != STORE_VERSION or meta.get('hashes') != hashes:
+        build_store(results_path, collector_path, run_path)
+
+    store = RepositoryStore(store_dir)
+    _opened[key] = (hashes, store)
+    return store
+
+
+def group_values(df, grouping, column):
+    """Valores de ``column`` por rótulo do agrupamento (sem NaN), na ordem dos rótulos.
+
+    Usa o índice pré-calculado do store quando ``df`` veio de
+    RepositoryStore.frame; para outros DataFrames usa a coluna categórica.
+    """
+    labels = GROUP_LABELS[grouping]
+    index = df.attrs.get('group_index', {}).get(grouping)
+    if index is None or index['rows'] != len(df):
+        codes = df[grouping].cat.codes.to_numpy() if grouping in df.columns else \
+            group_codes(df, len(df))[grouping]
+        index = build_group_index(np.asarray(codes, dtype=np.int8), len(labels))
+
+    values = df[column].to_numpy(dtype=np.float64)
+    groups = {}
+    for i, label in enumerate(labels):
+        part = values[index['positions'][index['offsets'][i]:index['offsets'][i + 1]]]
+        groups[label] = part[~np.isnan(part)]
+    return groups
+
+
+def group_summary(df, grouping, columns, stats=('mean', 'median', 'std')):
+    """Tabela por grupo (mesmo formato de groupby(...).agg(stats)) a partir do índice"""
+    functions = {'mean': np.mean, 'median': np.median, 'std': lambda v: np.std(v, ddof=1),
+                 'count': len, 'min': np.min, 'max': np.max}
+    data = {}
+    for column in columns:
+        groups = group_values(df, grouping, column)
+        for stat in stats:
+            data[(column, stat)] = [functions[stat](v) if len(v) > (stat == 'std') else np.nan
+                                    for v in groups.values()]
+    table = pd.DataFrame(data, index=pd.Index(GROUP_LABELS[grouping], name=grouping))
+    table.columns = pd.MultiIndex.from_tuples(table.columns)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Store unificado dos repositórios (coletor + CK + execução)')
+    parser.add_argument('--rebuild', action='store_true', help='reconstrói o store do zero')
+    parser.add_argument('--repo', action='append', default=[],
+                        help='mostra a linha de um repositório (owner/nome); pode repetir')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.rebuild:
+        build_store()
+    store = open_store()
+    print(f"📦 Store com {len(store)} repositórios ({store.analysis_rows} com métricas CK) "
+          f"em {store.store_dir} ({time.perf_counter() - start:.3f}s)")
+
+    for grouping, labels in GROUP_LABELS.items():
+        sizes = ', '.join(f"{label}: {len(store.rows_for(grouping, label))}" for label in labels)
+        print(f"  {grouping}: {sizes}")
+
+    for name in args.repo:
+        record = store.lookup(name)
+        print(f"\n{name}: {record if record else 'não encontrado'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import SCHEMAS, load_table
+from repository_store import RUN_FILE
+
+RESOURCE_COLUMNS = ['ck_wall_seconds', 'ck_cpu_seconds', 'ck_max_rss_mb', 'ck_read_mb', 'ck_write_mb']
+SIZE_COLUMNS = ['java_files', 'total_loc', 'total_classes']
+
+# Mesmas faixas de _calculate_timeout em clone_and_analyze.py: (limite superior, timeout)
+TIMEOUT_BANDS = [(50, 60), (200, 120), (500, 300), (1000, 600), (math.inf, 900)]
+
+# Fração da memória da máquina que os processos do CK podem ocupar juntos
+MEMORY_BUDGET = 0.8
+
+
+def load_resource_table(run_path=RUN_FILE):
+    """Linhas do analisador que têm contabilidade de recursos do CK"""
+    df = load_table(run_path, schema=SCHEMAS['run'])
+    missing = [col for col in RESOURCE_COLUMNS + ['java_files'] if col not in df.columns]
+    if missing:
+        return None
+    df = df[df['analysis_status'] == 'success'] if 'analysis_status' in df.columns else df
+    return df.dropna(subset=['ck_wall_seconds', 'java_files'])
+
+
+def scaling_model(df, x_col, y_col):
+    """Ajuste log-log y = a * x^b (b = expoente de escala), ignorando zeros"""
+    data = df[[x_col, y_col]].astype(np.float64)
+    data = data[(data[x_col] > 0) & (data[y_col] > 0)]
+    if len(data) < 3:
+        return None
+    b, log_a = np.polyfit(np.log(data[x_col]), np.log(data[y_col]), 1)
+    return {'a': math.exp(log_a), 'b': b, 'n': len(data)}
+
+
+def timeout_table(df):
+    """Por faixa de arquivos .java: tempo p50/p95/máximo do CK contra o timeout configurado"""
+    rows = []
+    lower = 0
+    for upper, timeout in TIMEOUT_BANDS:
+        band = df[(df['java_files'] >= lower) & (df['java_files'] < upper)]['ck_wall_seconds']
+        label = f'{lower}+' if math.isinf(upper) else f'{lower}-{upper - 1}'
+        if len(band):
+            rows.append({'faixa': label, 'repos': len(band), 'p50_s': band.median(),
+                         'p95_s': band.quantile(0.95), 'max_s': band.max(), 'timeout_s': timeout,
+                         'folga_p95': timeout / band.quantile(0.95) if band.quantile(0.95) else math.inf})
+        lower = upper
+    return pd.DataFrame(rows)
+
+
+def recommended_workers(df, memory_bytes=None):
+    """Workers simultâneos que cabem na memória usando o p95 do pico de RSS do CK"""
+    if memory_bytes is None:
+        try:
+            memory_bytes = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        except (ValueError, OSError, AttributeError):
+            return None
+    p95_rss = df['ck_max_rss_mb'].quantile(0.95) * 2 ** 20
+    if not p95_rss:
+        return None
+    by_memory = int(memory_bytes * MEMORY_BUDGET // p95_rss)
+    # O CK é em boa parte de uma thread só: CPU por segundo de parede ~ núcleos usados
+    cores_per_run = max(1.0, (df['ck_cpu_seconds'] / df['ck_wall_seconds']).median())
+    by_cpu = max(1, int((os.cpu_count() or 1) // cores_per_run))
+    return {'by_memory': by_memory, 'by_cpu': by_cpu, 'workers': max(1, min(by_memory, by_cpu)),
+            'p95_rss_mb': p95_rss / 2 ** 20, 'cores_per_run': cores_per_run}
+
+
+def report(df):
+    print(f"=== RECURSOS DO CK ({len(df)} repositórios) ===")
+    print(df[RESOURCE_COLUMNS + ['java_files']].describe(percentiles=[0.5, 0.95]).T.round(2))
+
+    sizes = [col for col in SIZE_COLUMNS if col in df.columns]
+    print("\n=== CORRELAÇÃO DE SPEARMAN (RECURSOS x TAMANHO) ===")
+    print(df[RESOURCE_COLUMNS + sizes].astype(np.float64).corr(method='spearman')
+          .loc[RESOURCE_COLUMNS, sizes].round(3))
+
+    print("\n=== MODELOS DE ESCALA (y = a * x^b) ===")
+    for x_col in sizes:
+        for y_col in ('ck_wall_seconds', 'ck_cpu_seconds', 'ck_max_rss_mb'):
+            model = scaling_model(df, x_col, y_col)
+            if model:
+                print(f"{y_col:<16} ~ {model['a']:.4g} * {x_col}^{model['b']:.2f}  (n = {model['n']})")
+
+    print("\n=== TEMPO DO CK x TIMEOUT POR FAIXA DE ARQUIVOS .java ===")
+    print(timeout_table(df).round(2).to_string(index=False))
+
+    workers = recommended_workers(df)
+    if workers:
+        print(f"\n💡 max_workers sugerido: {workers['workers']} "
+              f"(memória: {workers['by_memory']} com p95 de {workers['p95_rss_mb']:.0f} MB por JVM; "
+              f"CPU: {workers['by_cpu']} com {workers['cores_per_run']:.1f} núcleo(s) por execução)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Relaciona o uso de recursos do CK com o tamanho dos repositórios')
+    parser.add_argument('--results', default=RUN_FILE,
+                        help='CSV de saída do analisador (padrão: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.results):
+        print(f"Arquivo {args.results} não encontrado.")
+        return
+    df = load_resource_table(args.results)
+    if df is None or df.empty:
+        print("Nenhum resultado com contabilidade de recursos do CK (execute o analisador novamente).")
+        return
+    report(df)
+
+
+if __name__ == "__main__":
+    main()
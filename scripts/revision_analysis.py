@@ -0,0 +1,223 @@
+import argparse
+import concurrent.futures
+import csv
+import os
+import shutil
+from datetime import datetime, timezone
+
+from blob_store import BLOB_STORE_DIR, list_java_blobs
+from class_sketches import append_sketches, sketch_path_for
+from clone_and_analyze import RepositoryAnalyzer
+
+REVISIONS = 5
+REVISION_RESULTS_FILE = "revision_results.csv"
+
+# Colunas iniciais do CSV por revisão; as métricas do CK vêm depois
+REVISION_COLUMNS = ["full_name", "revision", "tag", "commit", "tag_date", "analysis_status",
+                    "files_changed", "files_removed"]
+
+
+def list_tags(repo):
+    """Tags que apontam para commits, da mais antiga para a mais nova: (tag, commit, data unix)"""
+    output = repo.git.for_each_ref(
+        "--sort=creatordate",
+        "--format=%(refname:short)%09%(objecttype)%09%(objectname)%09%(*objecttype)%09%(*objectname)"
+        "%09%(creatordate:unix)",
+        "refs/tags")
+    tags = []
+    for line in output.splitlines():
+        name, kind, sha, peeled_kind, peeled_sha, date = line.split("\t")
+        # Tags anotadas apontam para um objeto tag; o commit é o alvo "descascado"
+        if kind == "commit":
+            tags.append((name, sha, int(date or 0)))
+        elif kind == "tag" and peeled_kind == "commit":
+            tags.append((name, peeled_sha, int(date or 0)))
+    return tags
+
+
+def select_tags(tags, count=REVISIONS):
+    """``count`` tags espaçadas uniformemente no histórico, sempre incluindo a mais recente"""
+    if count <= 1 or len(tags) <= 1:
+        return tags[-1:]
+    indexes = sorted({round(i * (len(tags) - 1) / (count - 1)) for i in range(count)})
+    return [tags[i] for i in indexes]
+
+
+def fetch_revisions(analyzer, repo_url, repo_name, count=REVISIONS):
+    """Um único clone parcial (sem blobs) para todas as revisões selecionadas.
+
+    Para cada tag, só os blobs .java que faltam no store são baixados. Em
+    disco fica a árvore completa de cada revisão, com links físicos para os
+    objetos do store: arquivos inalterados entre tags não ocupam espaço extra,
+    e o CK enxerga todos os tipos que a tag declara.
+    """
+    from git import Repo
+
+    store = analyzer.blob_store
+    workdir = analyzer.clone_dir / f".{repo_name}.history"
+    shutil.rmtree(workdir, ignore_errors=True)
+    repo = Repo.clone_from(repo_url, workdir, no_checkout=True, filter="blob:none")
+    revisions = []
+    try:
+        tags = select_tags(list_tags(repo), count)
+        for tag, commit, date in tags:
+            files = list_java_blobs(repo, commit)
+            files, fetched, fetched_bytes = store.fetch_blobs(repo, files, commit)
+
+            name = f"{repo_name}@{tag.replace('/', '_')}"
+            path = analyzer.clone_dir / name
+            shutil.rmtree(path, ignore_errors=True)
+            path.mkdir(parents=True)
+            revisions.append({
+                "tag": tag,
+                "date": date,
+                "name": name,
+                "path": path,
+                "manifest": {"commit": commit, "tag": tag, "files": files,
+                             "blobs_fetched": fetched, "bytes_fetched": fetched_bytes},
+            })
+            store.materialize(files, path)
+            print(f"🏷️ {tag}: {len(files)} arquivos .java, {fetched} blobs baixados")
+    except BaseException:
+        remove_revisions(analyzer, revisions)
+        raise
+    finally:
+        repo.close()
+        shutil.rmtree(workdir, onerror=analyzer.handle_remove_readonly)
+    return revisions
+
+
+def remove_revisions(analyzer, revisions):
+    """Apaga as árvores materializadas das revisões"""
+    for revision in revisions:
+        if revision["path"].exists():
+            shutil.rmtree(revision["path"], onerror=analyzer.handle_remove_readonly)
+
+
+def analyze_revisions(analyzer, full_name, count=REVISIONS, max_workers=3, repo_url=None, sketches_file=None):
+    """Métricas do CK em ``count`` tags de um repositório, com um único clone.
+
+    O CK roda em paralelo sobre a árvore completa de cada revisão. As linhas
+    do blob store não são reaproveitadas aqui: CBO e DIT de um arquivo dependem
+    dos outros tipos da árvore, então o mesmo blob pode ter métricas diferentes
+    em tags diferentes. Com ``sketches_file``, os sketches por classe de cada
+    revisão são gravados como owner/nome@tag.
+    """
+    repo_name = full_name.replace("/", "_")
+    print(f"\n=== Revisões de {full_name} ===")
+    try:
+        revisions = fetch_revisions(analyzer, repo_url or f"https://github.com/{full_name}.git",
+                                    repo_name, count)
+    except Exception as e:
+        print(f"✗ Erro ao clonar {full_name}: {e}")
+        return []
+    if not revisions:
+        print(f"⚠ {full_name} não tem tags")
+        return []
+
+    # As árvores das revisões são apagadas mesmo se o CK ou a sumarização falharem no meio
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            runs = list(executor.map(lambda revision: analyzer.analyze_repository_with_ck(revision["path"]),
+                                     revisions))
+
+        rows = []
+        previous = {}
+        for index, (revision, metrics) in enumerate(zip(revisions, runs)):
+            files = revision["manifest"]["files"]
+            row = {
+                "full_name": full_name,
+                "revision": index,
+                "tag": revision["tag"],
+                "commit": revision["manifest"]["commit"],
+                "tag_date": datetime.fromtimestamp(revision["date"], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "files_changed": sum(1 for path, sha in files.items() if previous.get(path) != sha),
+                "files_removed": sum(1 for path in previous if path not in files),
+            }
+            if metrics:
+                analyzer.blob_store.save_manifest(revision["name"], revision["manifest"])
+                metrics.pop("repository", None)
+                metrics["blobs_fetched"] = revision["manifest"]["blobs_fetched"]
+                sketches = metrics.pop("class_sketches", None)
+                if sketches and sketches_file:
+                    append_sketches(sketches_file, f"{full_name}@{revision['tag']}", sketches)
+                row.update(metrics, analysis_status="success")
+            else:
+                row["analysis_status"] = "ck_analysis_failed"
+            rows.append(row)
+            previous = files
+    finally:
+        remove_revisions(analyzer, revisions)
+    return rows
+
+
+def save_revision_results(rows, filename=REVISION_RESULTS_FILE):
+    """Grava as linhas no CSV por revisão, substituindo as de mesmo repositório e tag"""
+    existing = []
+    if os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8", newline="") as file:
+            existing = list(csv.DictReader(file))
+    replaced = {(row["full_name"], row["tag"]) for row in rows}
+    all_rows = [row for row in existing if (row["full_name"], row["tag"]) not in replaced] + rows
+
+    fieldnames = list(REVISION_COLUMNS)
+    for row in all_rows:
+        fieldnames.extend(field for field in row if field not in fieldnames)
+    with open(filename, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        writer.writerows(all_rows)
+    print(f"💾 {len(rows)} revisões salvas em {filename} ({len(all_rows)} no total)")
+
+
+def print_revisions(rows):
+    print(f"\n{'tag':<24}{'data':<12}{'alterados':>10}{'classes':>9}{'CBO':>7}{'DIT':>7}{'LCOM':>9}"
+          f"{'baixados':>10}")
+    for row in rows:
+        if row["analysis_status"] != "success":
+            print(f"{row['tag']:<24}{row['tag_date'][:10]:<12}{row['files_changed']:>10}  falha no CK")
+            continue
+        print(f"{row['tag']:<24}{row['tag_date'][:10]:<12}{row['files_changed']:>10}{row['total_classes']:>9}"
+              f"{row['avg_cbo']:>7.2f}{row['avg_dit']:>7.2f}{row['avg_lcom']:>9.1f}{row['blobs_fetched']:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Métricas do CK em várias tags de cada repositório, com um único clone')
+    parser.add_argument('repos', nargs='*', help='owner/nome; sem repositórios, usa --top do coletor')
+    parser.add_argument('--top', type=int, default=5,
+                        help='repositórios do CSV do coletor ainda sem revisões (padrão: %(default)s)')
+    parser.add_argument('--revisions', type=int, default=REVISIONS,
+                        help='tags por repositório, espaçadas no histórico (padrão: %(default)s)')
+    parser.add_argument('--workers', type=int, default=3,
+                        help='execuções simultâneas do CK (padrão: %(default)s)')
+    parser.add_argument('--blob-store', default=str(BLOB_STORE_DIR),
+                        help='diretório do blob store (padrão: %(default)s)')
+    parser.add_argument('--output', default=REVISION_RESULTS_FILE,
+                        help='CSV por revisão (padrão: %(default)s)')
+    args = parser.parse_args(argv)
+
+    analyzer = RepositoryAnalyzer(blob_store_dir=args.blob_store)
+    if not analyzer.install_ck_tool():
+        print("Não foi possível encontrar o ck.jar. Abortando.")
+        return
+
+    names = args.repos
+    if not names:
+        done = set()
+        if os.path.exists(args.output):
+            with open(args.output, "r", encoding="utf-8", newline="") as file:
+                done = {row["full_name"] for row in csv.DictReader(file)}
+        names = [repo["full_name"] for repo in analyzer.load_repositories()
+                 if repo["full_name"] not in done][:args.top]
+
+    for full_name in names:
+        rows = analyze_revisions(analyzer, full_name, args.revisions, args.workers,
+                                 sketches_file=sketch_path_for(args.output))
+        if rows:
+            save_revision_results(rows, args.output)
+            print_revisions(rows)
+
+
+if __name__ == "__main__":
+    main()
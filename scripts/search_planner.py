@@ -0,0 +1,196 @@
+import argparse
+import concurrent.futures
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+from collect_repositories import PAGE_SIZE, SEARCH_CAP, query, run_query
+
+LANGUAGE = "language:Java"
+# Nenhum repositório é anterior ao lançamento do GitHub
+GITHUB_START = date(2008, 1, 1)
+
+# Contagens por requisição GraphQL (uma busca com alias para cada faixa)
+COUNT_BATCH = 10
+QUERY_RETRIES = 3
+# Rodadas extras para as partições que falharam; depois disso a coleta é abortada
+PARTITION_RETRIES = 2
+PAGE_DELAY = 1
+
+# Faixa da busca: estrelas (stars_max None = sem limite) x data de criação, ambas inclusivas
+SearchRange = namedtuple('SearchRange', ['stars_min', 'stars_max', 'created_from', 'created_to'])
+
+
+def search_string(search_range):
+    stars = (f"stars:>={search_range.stars_min}" if search_range.stars_max is None
+             else f"stars:{search_range.stars_min}..{search_range.stars_max}")
+    created = f"created:{search_range.created_from.isoformat()}..{search_range.created_to.isoformat()}"
+    return f"{LANGUAGE} {stars} {created} sort:stars-desc"
+
+
+def _run(query_text, variables):
+    """run_query com novas tentativas para erros de GraphQL e limites de taxa"""
+    for attempt in range(1, QUERY_RETRIES + 1):
+        result = run_query(query_text, variables)
+        if result is not None:
+            return result["data"]
+        time.sleep(5 * attempt)
+    raise RuntimeError(f"Consulta falhou após {QUERY_RETRIES} tentativas: {variables}")
+
+
+def count_ranges(ranges):
+    """repositoryCount de cada faixa, com COUNT_BATCH buscas por requisição"""
+    counts = []
+    for start in range(0, len(ranges), COUNT_BATCH):
+        batch = ranges[start:start + COUNT_BATCH]
+        declarations = ", ".join(f"$q{i}: String!" for i in range(len(batch)))
+        fields = "\n".join(f"  r{i}: search(query: $q{i}, type: REPOSITORY, first: 1) {{ repositoryCount }}"
+                           for i in range(len(batch)))
+        data = _run(f"query ({declarations}) {{\n{fields}\n}}",
+                    {f"q{i}": search_string(search_range) for i, search_range in enumerate(batch)})
+        counts.extend(data[f"r{i}"]["repositoryCount"] for i in range(len(batch)))
+    return counts
+
+
+def split_range(search_range):
+    """Divide a faixa em duas sem sobreposição: primeiro por estrelas, depois por data de criação"""
+    low, high = search_range.stars_min, search_range.stars_max
+    if high is None or high > low:
+        # Faixa aberta: [n, 2n - 1] e [2n, *), já que as estrelas têm cauda longa
+        middle = max(2 * low, low + 1) - 1 if high is None else (low + high) // 2
+        return [search_range._replace(stars_max=middle), search_range._replace(stars_min=middle + 1)]
+    start, end = search_range.created_from, search_range.created_to
+    if end > start:
+        middle = start + (end - start) // 2
+        return [search_range._replace(created_to=middle),
+                search_range._replace(created_from=middle + timedelta(days=1))]
+    return None
+
+
+def plan_partitions(root, cap=SEARCH_CAP):
+    """Partições sem sobreposição que cobrem ``root``, cada uma com até ``cap`` resultados.
+
+    As faixas são contadas nível a nível (em lotes) e as que passam do
+    limite são divididas recursivamente.
+    """
+    leaves = []
+    pending = [root]
+    while pending:
+        next_level = []
+        for search_range, count in zip(pending, count_ranges(pending)):
+            if count <= cap:
+                if count:
+                    leaves.append((search_range, count))
+                continue
+            parts = split_range(search_range)
+            if parts is None:
+                print(f"⚠️ {search_string(search_range)} tem {count} resultados e não pode ser dividida; "
+                      f"apenas {cap} serão coletados")
+                leaves.append((search_range, cap))
+            else:
+                next_level.extend(parts)
+        pending = next_level
+    return sorted(leaves, key=lambda leaf: (-leaf[0].stars_min, leaf[0].created_from))
+
+
+def find_star_threshold(target):
+    """Maior número de estrelas S com pelo menos ``target`` repositórios em stars:>=S"""
+    def count(stars):
+        return count_ranges([SearchRange(stars, None, GITHUB_START, date.today())])[0]
+
+    low, high = 0, 1
+    while count(high) >= target:
+        low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if count(middle) >= target:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def collect_partition(search_range):
+    """Todas as páginas de uma partição (no máximo SEARCH_CAP repositórios)"""
+    nodes = []
+    cursor = None
+    while len(nodes) < SEARCH_CAP:
+        search = _run(query, {"q": search_string(search_range), "cursor": cursor})["search"]
+        nodes.extend(node for node in search["nodes"] if node)
+        if not search["pageInfo"]["hasNextPage"]:
+            break
+        cursor = search["pageInfo"]["endCursor"]
+        time.sleep(PAGE_DELAY)
+    return nodes
+
+
+def collect_top(target, max_workers=3, min_stars=None):
+    """Os ``target`` repositórios Java com mais estrelas, além do limite de 1000 da busca.
+
+    Acha o corte de estrelas, planeja as partições, coleta em paralelo e
+    remove duplicatas por full_name (estrelas mudam durante a coleta, então
+    um repositório pode aparecer em duas faixas vizinhas). Partições que
+    falham são tentadas de novo; se ainda falharem, levanta RuntimeError.
+    """
+    start = time.perf_counter()
+    if min_stars is None:
+        min_stars = find_star_threshold(target)
+    root = SearchRange(min_stars, None, GITHUB_START, date.today())
+    leaves = plan_partitions(root)
+    expected = sum(count for _, count in leaves)
+    pages = sum(-(-count // PAGE_SIZE) for _, count in leaves)
+    print(f"🗺️ {len(leaves)} partições para stars:>={min_stars}: {expected} repositórios, "
+          f"{pages} páginas ({time.perf_counter() - start:.1f}s de planejamento)")
+
+    repos = {}
+    fetched = 0
+    pending = [search_range for search_range, _ in leaves]
+    for attempt in range(PARTITION_RETRIES + 1):
+        if attempt:
+            print(f"🔁 Nova tentativa ({attempt}/{PARTITION_RETRIES}) para {len(pending)} partições que falharam")
+            time.sleep(10 * attempt)
+        failed = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(collect_partition, search_range): search_range for search_range in pending}
+            for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                try:
+                    nodes = future.result()
+                except Exception as e:
+                    print(f"✗ {search_string(futures[future])}: {e}")
+                    failed.append(futures[future])
+                    continue
+                fetched += len(nodes)
+                for node in nodes:
+                    repos[f"{node['owner']['login']}/{node['name']}"] = node
+                print(f"[{done}/{len(futures)}] {len(repos)} repositórios únicos até agora")
+        pending = failed
+        if not pending:
+            break
+    if pending:
+        # Um ranking sem essas faixas pareceria completo, mas perderia repositórios em silêncio
+        raise RuntimeError(f"{len(pending)} partições falharam após {PARTITION_RETRIES} novas tentativas: "
+                           + "; ".join(search_string(search_range) for search_range in pending))
+
+    ranked = sorted(repos.values(), key=lambda node: node["stargazerCount"], reverse=True)[:target]
+    print(f"✅ {len(ranked)} repositórios ({fetched - len(repos)} duplicatas removidas) "
+          f"em {time.perf_counter() - start:.1f}s")
+    return ranked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Planeja a busca particionada (faixas de estrelas e datas) para passar de 1000 resultados')
+    parser.add_argument('--target', type=int, default=10_000,
+                        help='quantos repositórios o plano deve cobrir (padrão: %(default)s)')
+    parser.add_argument('--min-stars', type=int, help='corte de estrelas (padrão: calculado para --target)')
+    args = parser.parse_args(argv)
+
+    min_stars = args.min_stars if args.min_stars is not None else find_star_threshold(args.target)
+    leaves = plan_partitions(SearchRange(min_stars, None, GITHUB_START, date.today()))
+    for search_range, count in leaves:
+        print(f"{count:5d}  {search_string(search_range)}")
+    print(f"\n{len(leaves)} partições, {sum(count for _, count in leaves)} repositórios")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import csv
+import json
+import math
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+SNAPSHOT_DIR = Path('results/snapshots')
+
+# A cada KEYFRAME_INTERVAL snapshots o estado completo é gravado, limitando
+# quantos deltas precisam ser aplicados para reconstruir qualquer snapshot
+KEYFRAME_INTERVAL = 12
+COMPRESSION_LEVEL = 9
+
+# Cabeçalho de cada registro: tamanho do payload comprimido e se é keyframe
+HEADER = struct.Struct('<I?')
+
+# Campos derivados da data da coleta; com created_at não são gravados e sim
+# recalculados na leitura, em relação à data do snapshot (add_derived_fields)
+DERIVED_FIELDS = {'age_years'}
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def stream_path(stream, snapshot_dir=SNAPSHOT_DIR):
+    return Path(snapshot_dir) / f'{stream}.log'
+
+
+def parse_value(value):
+    """Converte um campo do CSV para int/float quando possível (vazio continua '')"""
+    if value is None:
+        return ''
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def read_csv_state(csv_path, key_column=None):
+    """Estado atual de um CSV: chave do repositório -> campos tipados"""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.DictReader(file)
+        if key_column is None:
+            key_column = 'full_name' if 'full_name' in reader.fieldnames else 'repo'
+        drop = DERIVED_FIELDS if 'created_at' in reader.fieldnames else set()
+        return {
+            row[key_column]: {field: parse_value(value) for field, value in row.items()
+                              if field != key_column and field not in drop}
+            for row in reader
+        }
+
+
+def add_derived_fields(row, taken_at):
+    """Recalcula age_years (como o coletor: dias / 365.25, 2 casas) na data do snapshot"""
+    if 'created_at' in row and 'age_years' not in row:
+        try:
+            created = datetime.strptime(row['created_at'], TIMESTAMP_FORMAT)
+            taken = datetime.strptime(taken_at, TIMESTAMP_FORMAT)
+        except (TypeError, ValueError):
+            return row
+        row['age_years'] = round((taken - created).days / 365.25, 2)
+    return row
+
+
+def same_value(before, after):
+    """Igualdade de campos em que NaN é igual a NaN (ex.: std_cbo de repositórios com uma classe)"""
+    if before == after:
+        return True
+    return (isinstance(before, float) and isinstance(after, float)
+            and math.isnan(before) and math.isnan(after))
+
+
+def diff_states(previous, current):
+    """Delta entre dois estados: só os campos alterados de cada repositório.
+
+    Um campo com valor None no delta foi removido; repositórios que deixaram
+    de aparecer vão para ``removed``.
+    """
+    changes = {}
+    for key, row in current.items():
+        before = previous.get(key, {})
+        changed = {field: value for field, value in row.items()
+                   if field not in before or not same_value(before[field], value)}
+        changed.update({field: None for field in before if field not in row})
+        if changed:
+            changes[key] = changed
+    removed = sorted(key for key in previous if key not in current)
+    return changes, removed
+
+
+def apply_delta(state, record):
+    for key in record['removed']:
+        state.pop(key, None)
+    for key, changed in record['changes'].items():
+        row = state.setdefault(key, {})
+        for field, value in changed.items():
+            if value is None:
+                row.pop(field, None)
+            else:
+                row[field] = value
+    return state
+
+
+def _scan(path):
+    """Offsets e flags de todos os registros, lendo apenas os cabeçalhos"""
+    entries = []
+    if not path.exists():
+        return entries
+    with open(path, 'rb') as file:
+        offset = 0
+        while True:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                break
+            length, keyframe = HEADER.unpack(header)
+            entries.append((offset, length, keyframe))
+            offset += HEADER.size + length
+            file.seek(offset)
+    return entries
+
+
+def _read_record(file, offset, length):
+    file.seek(offset + HEADER.size)
+    return json.loads(zlib.decompress(file.read(length)).decode('utf-8'))
+
+
+def iter_records(stream, start=0, snapshot_dir=SNAPSHOT_DIR):
+    path = stream_path(stream, snapshot_dir)
+    entries = _scan(path)
+    with open(path, 'rb') as file:
+        for offset, length, _ in entries[start:]:
+            yield _read_record(file, offset, length)
+
+
+def _stored_snapshot(stream, snapshot_id=-1, snapshot_dir=SNAPSHOT_DIR):
+    """Estado de um snapshot como foi gravado (sem os campos derivados).
+
+    Parte do último keyframe anterior ao snapshot e aplica só os deltas
+    seguintes, então o custo não cresce com o tamanho do histórico.
+    """
+    path = stream_path(stream, snapshot_dir)
+    entries = _scan(path)
+    if not entries:
+        return None, {}
+    if snapshot_id < 0:
+        snapshot_id += len(entries)
+    if not 0 <= snapshot_id < len(entries):
+        raise IndexError(f"Snapshot {snapshot_id} não existe em {path} ({len(entries)} snapshots)")
+
+    start = max(i for i in range(snapshot_id + 1) if entries[i][2])
+    state = {}
+    with open(path, 'rb') as file:
+        for offset, length, _ in entries[start:snapshot_id + 1]:
+            record = _read_record(file, offset, length)
+            state = apply_delta({} if record['keyframe'] else state, record)
+    meta = {field: record[field] for field in ('id', 'taken_at', 'source', 'keyframe')}
+    return meta, state
+
+
+def load_snapshot(stream, snapshot_id=-1, snapshot_dir=SNAPSHOT_DIR):
+    """Reconstrói o estado completo de um snapshot (padrão: o mais recente).
+
+    Os campos derivados (age_years) são recalculados na data do snapshot.
+    """
+    meta, state = _stored_snapshot(stream, snapshot_id, snapshot_dir)
+    for row in state.values():
+        add_derived_fields(row, meta['taken_at'])
+    return meta, state
+
+
+def record_snapshot(stream, csv_path, key_column=None, taken_at=None, snapshot_dir=SNAPSHOT_DIR):
+    """Acrescenta ao log do stream o snapshot atual de um CSV (delta contra o anterior)"""
+    path = stream_path(stream, snapshot_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    current = read_csv_state(csv_path, key_column)
+
+    count = len(_scan(path))
+    keyframe = count % KEYFRAME_INTERVAL == 0
+    previous = {} if keyframe else _stored_snapshot(stream, snapshot_dir=snapshot_dir)[1]
+    changes, removed = diff_states(previous, current)
+
+    record = {
+        'id': count,
+        'taken_at': taken_at or datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT),
+        'source': str(csv_path),
+        'keyframe': keyframe,
+        'changes': changes,
+        'removed': removed,
+    }
+    payload = zlib.compress(json.dumps(record, separators=(',', ':')).encode('utf-8'), COMPRESSION_LEVEL)
+    with open(path, 'ab') as file:
+        file.write(HEADER.pack(len(payload), keyframe) + payload)
+        file.flush()
+        os.fsync(file.fileno())
+
+    return {'id': count, 'keyframe': keyframe, 'repos_changed': len(changes),
+            'fields_changed': sum(len(c) for c in changes.values()), 'removed': len(removed),
+            'bytes': HEADER.size + len(payload)}
+
+
+def safe_record_snapshot(stream, csv_path):
+    """Versão para os coletores: registra o snapshot sem interromper a execução em caso de erro"""
+    try:
+        summary = record_snapshot(stream, csv_path)
+        kind = 'keyframe' if summary['keyframe'] else 'delta'
+        print(f"🗂️ Snapshot {summary['id']} de '{stream}' ({kind}): {summary['repos_changed']} "
+              f"repositórios alterados, {summary['bytes']:,} bytes")
+        return summary
+    except Exception as e:
+        print(f"⚠️ Erro ao registrar snapshot de '{stream}': {e}")
+        return None
+
+
+def list_snapshots(stream, snapshot_dir=SNAPSHOT_DIR):
+    """Resumo de cada snapshot do stream (sem reconstruir estados)"""
+    return [
+        {'id': record['id'], 'taken_at': record['taken_at'], 'keyframe': record['keyframe'],
+         'repos_changed': len(record['changes']), 'removed': len(record['removed'])}
+        for record in iter_records(stream, snapshot_dir=snapshot_dir)
+    ]
+
+
+def repo_history(stream, name, fields=None, snapshot_dir=SNAPSHOT_DIR):
+    """Série temporal de um repositório: (data, campos) em cada snapshot em que ele existe.
+
+    Percorre os registros uma vez aplicando apenas os campos deste
+    repositório, sem reconstruir o estado dos demais.
+    """
+    key = None
+    row = None
+    history = []
+    for record in iter_records(stream, snapshot_dir=snapshot_dir):
+        if key is None:
+            key = next((k for k in record['changes'] if k.lower() == name.lower()), None)
+        if record['keyframe']:
+            row = None
+        if key is not None and key in record['removed']:
+            row = None
+        if key is not None and key in record['changes']:
+            row = apply_delta({key: dict(row or {})}, {'changes': {key: record['changes'][key]},
+                                                       'removed': []})[key]
+        if row is not None:
+            values = add_derived_fields(dict(row), record['taken_at'])
+            if fields is not None:
+                values = {field: values.get(field) for field in fields}
+            history.append((record['taken_at'], values))
+    return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Snapshots comprimidos (deltas) das métricas dos repositórios')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    record = subparsers.add_parser('record', help='registra o estado atual de um CSV')
+    record.add_argument('stream', help="nome do stream (ex.: 'collector', 'analysis')")
+    record.add_argument('csv_path')
+
+    listing = subparsers.add_parser('list', help='lista os snapshots de um stream')
+    listing.add_argument('stream')
+
+    show = subparsers.add_parser('show', help='reconstrói um snapshot')
+    show.add_argument('stream')
+    show.add_argument('--id', type=int, default=-1, help='snapshot (padrão: o mais recente)')
+
+    history = subparsers.add_parser('history', help='série temporal de um repositório')
+    history.add_argument('stream')
+    history.add_argument('repo', help='owner/nome')
+    history.add_argument('--field', action='append', help='campo a mostrar; pode repetir')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.action == 'record':
+        safe_record_snapshot(args.stream, args.csv_path)
+    elif args.action == 'list':
+        for entry in list_snapshots(args.stream):
+            kind = 'keyframe' if entry['keyframe'] else 'delta'
+            print(f"{entry['id']:4d}  {entry['taken_at']}  {kind:8s}  "
+                  f"{entry['repos_changed']} alterados, {entry['removed']} removidos")
+        size = stream_path(args.stream).stat().st_size if stream_path(args.stream).exists() else 0
+        print(f"\n💾 {stream_path(args.stream)}: {size:,} bytes")
+    elif args.action == 'show':
+        meta, state = load_snapshot(args.stream, args.id)
+        if meta is None:
+            print(f"Nenhum snapshot em '{args.stream}'")
+        else:
+            print(f"Snapshot {meta['id']} ({meta['taken_at']}): {len(state)} repositórios")
+    else:
+        for taken_at, values in repo_history(args.stream, args.repo, args.field):
+            print(f"{taken_at}  {values}")
+    print(f"⏱️ {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
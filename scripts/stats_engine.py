@@ -0,0 +1,177 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from dataset_cache import content_hash
+from repository_store import RESULTS_FILE, open_store
+
+DATA_FILE = RESULTS_FILE
+CACHE_DIR = Path('results/cache')
+
+# Incrementar quando o formato ou o cálculo mudar, para invalidar o cache
+ENGINE_VERSION = 5
+
+PROCESS_COLUMNS = ['stars', 'log_stars', 'releases', 'idade_anos']
+QUALITY_COLUMNS = ['cbo', 'dit', 'lcom', 'loc']
+STAT_COLUMNS = PROCESS_COLUMNS + QUALITY_COLUMNS
+
+MATRIX_KEYS = ['n', 'r', 'p', 'slope', 'intercept']
+DESCRIBE_KEYS = ['count', 'mean', 'median', 'std', 'min', 'max']
+
+
+def load_dataset(csv_path=DATA_FILE):
+    """Carrega os repositórios analisados do store unificado e adiciona as colunas derivadas.
+
+    Além das colunas do CSV de resultados, o DataFrame traz os dados do
+    coletor (forks, size_bytes, descrição...) e os grupos pré-calculados
+    (stars_quartile, age_bucket, release_bucket).
+    """
+    df = open_store(csv_path).frame(analysis_only=True)
+    df['log_stars'] = np.log10(df['stars'])
+    return df
+
+
+def compute_statistics(df, columns=STAT_COLUMNS):
+    """Calcula correlação, p-valor e regressão linear de todos os pares de colunas.
+
+    Cada par usa apenas as linhas sem NaN nas duas colunas (como
+    stats.pearsonr após dropna), mas tudo é obtido com produtos de matrizes
+    em uma única passada. ``slope[x, y]`` e ``intercept[x, y]`` são os
+    coeficientes da reta y = slope * x + intercept.
+    """
+    values = df[columns].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    mask = valid.astype(np.float64)
+
+    # Centralizar melhora a estabilidade numérica sem alterar os resultados
+    center = np.nanmean(values, axis=0)
+    x = np.where(valid, values - center, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = mask.T @ mask
+        sum_x = x.T @ mask
+        sum_y = sum_x.T
+        sum_xx = (x * x).T @ mask
+        sum_yy = sum_xx.T
+        sum_xy = x.T @ x
+
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = sum_yy - sum_y ** 2 / n
+
+        r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        slope = cov / var_x
+        mean_x = sum_x / n + center[:, None]
+        mean_y = sum_y / n + center[None, :]
+        intercept = mean_y - slope * mean_x
+
+        dof = n - 2
+        t_stat = r * np.sqrt(dof / (1.0 - r ** 2))
+        p = 2 * stats.t.sf(np.abs(t_stat), dof)
+    p[np.abs(r) == 1.0] = 0.0
+
+    describe = np.vstack([
+        valid.sum(axis=0),
+        np.nanmean(values, axis=0),
+        np.nanmedian(values, axis=0),
+        np.nanstd(values, axis=0, ddof=1),
+        np.nanmin(values, axis=0),
+        np.nanmax(values, axis=0),
+    ])
+
+    result = {
+        key: pd.DataFrame(matrix, index=columns, columns=columns)
+        for key, matrix in zip(MATRIX_KEYS, [n, r, p, slope, intercept])
+    }
+    result['describe'] = pd.DataFrame(describe, index=DESCRIBE_KEYS, columns=columns)
+    return result
+
+
+def _cache_path(csv_path):
+    key = content_hash(csv_path)[:16]
+    return CACHE_DIR / f'stats_v{ENGINE_VERSION}_{key}.npz'
+
+
+def _save_cache(path, result):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = list(result['r'].columns)
+    arrays = {key: result[key].to_numpy() for key in MATRIX_KEYS + ['describe']}
+    tmp_path = path.with_name(path.stem + '.tmp.npz')
+    np.savez(tmp_path, columns=np.array(columns), **arrays)
+    tmp_path.replace(path)
+
+
+def _load_cache(path):
+    with np.load(path) as data:
+        columns = [str(c) for c in data['columns']]
+        result = {
+            key: pd.DataFrame(data[key], index=columns, columns=columns)
+            for key in MATRIX_KEYS
+        }
+        result['describe'] = pd.DataFrame(data['describe'], index=DESCRIBE_KEYS, columns=columns)
+    return result
+
+
+def get_statistics(csv_path=DATA_FILE, df=None):
+    """Retorna as matrizes estatísticas, usando o cache em disco quando válido.
+
+    O cache é indexado pelo hash do CSV de entrada, então qualquer alteração
+    nos dados gera um novo cálculo.
+    """
+    path = _cache_path(csv_path)
+    if path.exists():
+        try:
+            return _load_cache(path)
+        except Exception as e:
+            print(f"⚠️ Cache de estatísticas inválido ({e}), recalculando...")
+
+    if df is None:
+        df = load_dataset(csv_path)
+    result = compute_statistics(df)
+    _save_cache(path, result)
+    return result
+
+
+def pair_statistics(result, x_col, y_col):
+    """Extrai as estatísticas de um par (x, y) das matrizes calculadas"""
+    return {
+        'n': int(result['n'].loc[x_col, y_col]),
+        'correlation': float(result['r'].loc[x_col, y_col]),
+        'p_value': float(result['p'].loc[x_col, y_col]),
+        'slope': float(result['slope'].loc[x_col, y_col]),
+        'intercept': float(result['intercept'].loc[x_col, y_col]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Estatísticas descritivas e correlações (cache em disco)')
+    parser.add_argument('--inference', action='store_true',
+                        help='inclui Spearman/Kendall com IC bootstrap e p-valores de permutação')
+    parser.add_argument('--resamples', type=int, default=None,
+                        help='reamostragens de bootstrap e permutação (com --inference)')
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    result = get_statistics(df=df)
+
+    print(f"=== ESTATÍSTICAS DESCRITIVAS ({len(df)} repositórios) ===")
+    print(result['describe'].T.round(2))
+
+    print("\n=== CORRELAÇÃO DE PEARSON (PROCESSO x QUALIDADE) ===")
+    print(result['r'].loc[PROCESS_COLUMNS, QUALITY_COLUMNS].round(3))
+    print("\np-valores:")
+    print(result['p'].loc[PROCESS_COLUMNS, QUALITY_COLUMNS].round(4))
+
+    if args.inference:
+        from correlation_inference import N_RESAMPLES, get_inference
+
+        inference = get_inference(df=df, n_resamples=args.resamples or N_RESAMPLES)
+        print("\n=== PEARSON / SPEARMAN / KENDALL (IC 95% BOOTSTRAP) ===")
+        print(inference.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
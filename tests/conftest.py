@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os módulos ficam em scripts/ e se importam pelo nome, como quando rodados de lá
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
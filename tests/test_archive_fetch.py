@@ -0,0 +1,52 @@
+import io
+import tarfile
+
+from archive_fetch import ArchiveServer, archive_url, fetch_archive
+
+SAFE = {
+    'src/main/java/App.java': b'class App {}\n',
+    'src/main/java/util/Util.java': b'class Util { App app; }\n',
+}
+
+
+def _add(archive, name, data=b'', kind=tarfile.REGTYPE, linkname=''):
+    info = tarfile.TarInfo(name)
+    info.type = kind
+    info.linkname = linkname
+    info.size = len(data) if kind == tarfile.REGTYPE else 0
+    archive.addfile(info, io.BytesIO(data) if kind == tarfile.REGTYPE else None)
+
+
+def _build_archive(path):
+    """tar.gz no formato do GitHub (diretório-raiz 'repo-HEAD/') com entradas que não devem ser gravadas"""
+    with tarfile.open(path, 'w:gz') as archive:
+        _add(archive, 'projeto-HEAD/', kind=tarfile.DIRTYPE)
+        for name, data in SAFE.items():
+            _add(archive, f'projeto-HEAD/{name}', data)
+        _add(archive, 'projeto-HEAD/README.md', b'# projeto\n')
+        _add(archive, 'projeto-HEAD/src/Link.java', kind=tarfile.SYMTYPE, linkname='main/java/App.java')
+        _add(archive, '../evil.java', b'class Evil {}\n')
+        _add(archive, 'projeto-HEAD/../../evil.java', b'class Evil {}\n')
+        _add(archive, '/tmp/absolute.java', b'class Absolute {}\n')
+
+
+def test_fetch_archive_writes_only_safe_java_files(tmp_path):
+    archives = tmp_path / 'archives'
+    archives.mkdir()
+    _build_archive(archives / 'dono_projeto.tar.gz')
+    target = tmp_path / 'checkout' / 'dono_projeto'
+
+    with ArchiveServer(archives) as base_url:
+        stats = fetch_archive(archive_url('dono/projeto', base_url), target)
+
+    written = sorted(path.relative_to(target).as_posix() for path in target.rglob('*') if path.is_file())
+    assert written == sorted(SAFE)
+    for name, data in SAFE.items():
+        assert (target / name).read_bytes() == data
+    assert not any(path.is_symlink() for path in target.rglob('*'))
+    assert not (tmp_path / 'checkout' / 'evil.java').exists()
+    assert list(tmp_path.rglob('evil.java')) == []
+
+    assert stats['files'] == len(SAFE)
+    assert stats['bytes_written'] == sum(len(data) for data in SAFE.values())
+    assert stats['bytes_downloaded'] == (archives / 'dono_projeto.tar.gz').stat().st_size
@@ -0,0 +1,96 @@
+import subprocess
+
+import pandas as pd
+import pytest
+
+from blob_store import BlobStore, git_blob_hash, list_java_blobs
+
+SOURCES = {
+    'Util.java': b'class Util {}\n',
+    'Main.java': b'class Main { Util u; }\n',
+    'License.java': b'// MIT\nclass License {}\n',
+}
+
+
+def _manifests():
+    """Três repositórios com arquivos repetidos entre eles (e dentro de um deles)"""
+    return {
+        'a_repo': {'src/Util.java': 'Util.java', 'src/Main.java': 'Main.java'},
+        'b_fork': {'src/Util.java': 'Util.java', 'src/Main.java': 'Main.java',
+                   'lib/License.java': 'License.java'},
+        'c_vendor': {'x/Util.java': 'Util.java', 'y/Util.java': 'Util.java'},
+    }
+
+
+def test_blob_hash_matches_git(tmp_path):
+    for data in SOURCES.values():
+        path = tmp_path / 'f'
+        path.write_bytes(data)
+        expected = subprocess.run(['git', 'hash-object', str(path)], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        assert git_blob_hash(data) == expected
+
+
+def test_savings_match_pandas_reference(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    rows = []
+    for repo, files in _manifests().items():
+        manifest = {'files': {}, 'blobs_fetched': 0, 'bytes_fetched': 0}
+        for path, source in files.items():
+            data = SOURCES[source]
+            new = not store.has(git_blob_hash(data))
+            sha = store.put(data)
+            manifest['files'][path] = sha
+            manifest['blobs_fetched'] += new
+            manifest['bytes_fetched'] += len(data) if new else 0
+            rows.append({'repo': repo, 'path': path, 'sha': sha, 'bytes': len(data)})
+        store.save_manifest(repo, manifest)
+    # Manifestos de tags não contam como repositórios
+    store.save_manifest('a_repo@v1', {'files': {'src/Util.java': rows[0]['sha']}})
+
+    files = pd.DataFrame(rows)
+    totals, shared = store.savings()
+    assert totals['repositories'] == files['repo'].nunique()
+    assert totals['files'] == len(files)
+    assert totals['unique_blobs'] == files['sha'].nunique()
+    assert totals['logical_bytes'] == files['bytes'].sum()
+    assert totals['stored_bytes'] == files.drop_duplicates('sha')['bytes'].sum()
+    assert totals['blobs_fetched'] == files['sha'].nunique()
+
+    repos_per_blob = files.groupby('sha')['repo'].nunique()
+    assert [(count, sha) for count, sha, _ in shared] == \
+        [(count, sha) for sha, count in repos_per_blob[repos_per_blob > 1].sort_values(ascending=False).items()]
+
+    target = tmp_path / 'checkout'
+    store.materialize(store.load_manifest('b_fork')['files'], target)
+    for path, source in _manifests()['b_fork'].items():
+        assert (target / path).read_bytes() == SOURCES[source]
+
+
+def test_list_and_fetch_from_git_tree(tmp_path):
+    git = pytest.importorskip('git')
+    repo = git.Repo.init(tmp_path / 'repo')
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'teste')
+        config.set_value('user', 'email', 'teste@example.com')
+    layout = {'src/main/Util.java': 'Util.java', 'src/main/Main.java': 'Main.java',
+              'examples/Other.java': 'License.java', 'README.md': None}
+    for path, source in layout.items():
+        full = tmp_path / 'repo' / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_bytes(SOURCES[source] if source else b'# leia-me\n')
+    repo.index.add(list(layout))
+    repo.index.commit('inicial')
+
+    files = list_java_blobs(repo)
+    # Com src/ presente, só os arquivos dentro dele entram
+    assert files == {path: git_blob_hash(SOURCES[source]) for path, source in layout.items()
+                     if source and path.startswith('src/')}
+
+    store = BlobStore(tmp_path / 'store')
+    store.put(SOURCES['Util.java'])
+    files, fetched, fetched_bytes = store.fetch_blobs(repo, files)
+    assert fetched == 1 and fetched_bytes == len(SOURCES['Main.java'])
+    assert all(store.has(sha) for sha in files.values())
+    assert store.fetch_blobs(repo, files)[1:] == (0, 0)
+    repo.close()
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+import build_graph
+import render_pipeline
+from figures import correlation_heatmap, distributions_figure, quartile_boxplot
+from render_pipeline import FigureTask
+
+
+def _tasks(columns=('cbo', 'dit')):
+    return [
+        FigureTask('distribuicoes.png', distributions_figure, {}, 'analysis'),
+        FigureTask('matriz.png', correlation_heatmap, {'numeric_cols': list(columns)}, 'analysis',
+                   columns=list(columns)),
+        FigureTask('quartis.png', quartile_boxplot, {}, 'detalhados'),
+    ]
+
+
+@pytest.fixture
+def rendered(tmp_path, monkeypatch):
+    """Troca a renderização por uma que só grava o PNG e anota quais saídas foram geradas"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build_graph, 'MANIFEST_FILE', tmp_path / 'cache' / 'build_manifest.json')
+    calls = []
+
+    def fake_render(tasks, headless=False, workers=None, data=None):
+        calls.append(sorted(task.output for task in tasks))
+        for task in tasks:
+            (tmp_path / task.output).write_bytes(b'png')
+        return {task.output: 0.0 for task in tasks}
+
+    monkeypatch.setattr(build_graph, 'render_figures', fake_render)
+    return calls
+
+
+def _df():
+    return pd.DataFrame({'stars': [10, 20, 30], 'cbo': [1.0, 2.0, 3.0], 'dit': [1.0, 1.0, 2.0]})
+
+
+def _build(tasks, capsys):
+    capsys.readouterr()
+    build_graph.build(tasks, _df(), {}, readme=False)
+    return capsys.readouterr().out
+
+
+def test_second_build_has_nothing_outdated(rendered, capsys):
+    assert '3 de 3 gráficos desatualizados' in _build(_tasks(), capsys)
+    assert '0 de 3 gráficos desatualizados' in _build(_tasks(), capsys)
+    assert rendered == [['distribuicoes.png', 'matriz.png', 'quartis.png']]
+
+
+def test_changed_kwargs_mark_only_that_figure(rendered, capsys):
+    _build(_tasks(), capsys)
+    assert '1 de 3 gráficos desatualizados' in _build(_tasks(columns=('cbo', 'stars')), capsys)
+    assert rendered[-1] == ['matriz.png']
+
+
+def test_dpi_and_style_are_part_of_the_fingerprint(rendered, capsys, monkeypatch):
+    _build(_tasks(), capsys)
+    monkeypatch.setattr(render_pipeline, 'DPI', 150)
+    assert '3 de 3 gráficos desatualizados' in _build(_tasks(), capsys)
+
+    # Mesmo código de apply_style, mas a folha 'seaborn-v0_8' mudou (ex.: outra versão do matplotlib)
+    original = build_graph.plt.style.use
+
+    def newer_sheet(name):
+        original(name)
+        build_graph.plt.rcParams['axes.linewidth'] = 2.0
+
+    monkeypatch.setattr(build_graph.plt.style, 'use', newer_sheet)
+    assert '2 de 3 gráficos desatualizados' in _build(_tasks(), capsys)
+    assert rendered[-1] == ['distribuicoes.png', 'matriz.png']
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+import class_analysis
+from class_analysis import (ALL_METRICS, CLASS_METRICS, GROUPINGS, PROCESS_METRICS,
+                            _new_accumulators, analyze_class_file, merge_accumulators)
+
+
+def _repo(stars, releases, idade, labels):
+    repo = {'stars': stars, 'log_stars': np.log10(stars), 'releases': releases, 'idade_anos': idade}
+    repo.update(zip(GROUPINGS, labels))
+    return repo
+
+
+def _write_classes(path, seed, n):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'class': [f'C{i}' for i in range(n)],
+        'cbo': rng.integers(0, 20, n),
+        'dit': rng.integers(1, 5, n),
+        'lcom': rng.lognormal(2, 2, n),
+        'loc': rng.integers(1, 500, n),
+    })
+    frame.loc[frame.index[::17], 'lcom'] = np.nan
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def test_chunked_files_merge_to_pandas_reference(tmp_path, monkeypatch):
+    # Blocos pequenos para que cada arquivo seja lido em várias partes
+    monkeypatch.setattr(class_analysis, 'CHUNK_ROWS', 37)
+    repos = [_repo(5000, 10, 8.5, ['Q1', 'a', 'x']), _repo(20000, 3, 2.0, ['Q4', 'b', 'x'])]
+    frames = []
+    accumulators = _new_accumulators()
+    for i, repo in enumerate(repos):
+        frame = _write_classes(tmp_path / f'owner_repo{i}.csv', seed=i, n=150 + 60 * i)
+        partial, rows = analyze_class_file(tmp_path / f'owner_repo{i}.csv', repo)
+        assert rows == len(frame)
+        merge_accumulators(accumulators, partial)
+        for col in PROCESS_METRICS:
+            frame[col] = repo[col]
+        frames.append(frame)
+    expected = pd.concat(frames, ignore_index=True)[ALL_METRICS].astype(np.float64)
+
+    describe = accumulators['overall'].describe()
+    np.testing.assert_array_equal(describe['count'], expected.count())
+    np.testing.assert_allclose(describe['mean'], expected.mean(), rtol=1e-12)
+    np.testing.assert_allclose(describe['std'], expected.std(), rtol=1e-9)
+    np.testing.assert_allclose(accumulators['overall'].correlation_matrix(),
+                               expected.dropna().corr(), rtol=1e-9, atol=1e-12)
+
+    # Mesmo rótulo em 'release_bucket': os dois repositórios caem no mesmo grupo
+    shared = accumulators['groups']['release_bucket']['x'].describe()
+    np.testing.assert_allclose(shared['mean'], expected[CLASS_METRICS].mean(), rtol=1e-12)
+    q4 = accumulators['groups']['stars_quartile']['Q4'].describe()
+    np.testing.assert_allclose(q4['mean'], frames[1][CLASS_METRICS].mean(), rtol=1e-12)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from class_sketches import (HISTOGRAM_EDGES, SKETCH_METRICS, append_sketches, build_sketches,
+                            load_sketch_table)
+from online_stats import QuantileSketch
+
+
+def _classes(seed, n):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'cbo': rng.integers(0, 40, n), 'dit': rng.integers(1, 6, n),
+        'lcom': np.floor(rng.lognormal(2, 2.5, n)), 'loc': rng.integers(1, 3000, n),
+    })
+    # O CK grava -1 quando não consegue calcular a métrica
+    frame.loc[frame.index[::23], 'lcom'] = -1
+    frame.loc[frame.index[::31], 'loc'] = np.nan
+    return frame
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / 'resultados.sketches.jsonl'
+    classes = {f'owner{i}/repo{i}': _classes(i, 50 + 40 * i) for i in range(6)}
+    append_sketches(path, 'Owner0/Repo0', build_sketches(_classes(99, 10)))
+    for name, frame in classes.items():
+        append_sketches(path, name, build_sketches(frame))
+    return load_sketch_table(path), classes
+
+
+def test_merged_subset_equals_single_sketch(table):
+    table, classes = table
+    # A linha mais recente de owner0/repo0 substitui a anterior
+    assert len(table) == len(classes)
+    subset = ['owner1/repo1', 'OWNER3/repo3', 'owner4/repo4', 'ninguem/nada']
+    rows = table.rows_for(subset)
+    assert len(rows) == 3
+    values = pd.concat([classes[name.lower()] for name in subset[:3]], ignore_index=True)
+
+    for metric in SKETCH_METRICS:
+        column = values[metric].dropna().to_numpy(dtype=np.float64)
+        expected = QuantileSketch()
+        expected.add_many(column)
+        sketch, counts = table.merged(metric, rows)
+        assert sketch.to_dict() == expected.to_dict()
+
+        for q in (0.0, 0.5, 0.9, 0.99, 1.0):
+            reference = np.quantile(column, q, method='lower')
+            assert sketch.quantile(q) == pytest.approx(reference, rel=sketch.relative_accuracy, abs=1e-12)
+
+        reference_counts, _ = np.histogram(np.clip(column, 0, None), bins=HISTOGRAM_EDGES)
+        np.testing.assert_array_equal(counts, reference_counts)
+
+
+def test_distribution_of_all_and_empty_subsets(table):
+    table, classes = table
+    every = table.distribution('cbo', np.arange(len(table)), quantiles=[0.5])
+    cbo = pd.concat(classes.values())['cbo']
+    assert every['repos'] == len(classes) and every['classes'] == len(cbo)
+    assert sum(every['histogram'].values()) == len(cbo)
+    assert every['quantiles']['0.5'] == pytest.approx(np.quantile(cbo, 0.5, method='lower'), rel=0.01)
+
+    empty = table.distribution('cbo', np.array([], dtype=np.int64))
+    assert empty['classes'] == 0 and all(value is None for value in empty['quantiles'].values())
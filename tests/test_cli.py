@@ -0,0 +1,30 @@
+import types
+
+import pytest
+
+import cli
+
+
+@pytest.fixture
+def plot_calls(monkeypatch):
+    """Substitui os módulos de gráficos por fakes que guardam os argumentos recebidos"""
+    calls = {}
+
+    def import_module(name):
+        return types.SimpleNamespace(main=lambda argv: calls.setdefault(name, argv))
+
+    monkeypatch.setattr(cli.importlib, 'import_module', import_module)
+    return calls
+
+
+def test_plots_forwards_resamples_only_to_analysis(plot_calls):
+    cli.main(['plots', '--set', 'all', '--resamples', '500', '--headless', '--force'])
+    assert plot_calls == {
+        'analysis': ['--headless', '--force', '--resamples', '500'],
+        'graficos_detalhados': ['--headless', '--force'],
+    }
+
+
+def test_plots_without_resamples_keeps_defaults(plot_calls):
+    cli.main(['plots', '--set', 'detalhados', '--workers', '2'])
+    assert plot_calls == {'graficos_detalhados': ['--workers', '2']}
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import correlation_inference
+from correlation_inference import (_bootstrap_pair, _column_state, bootstrap_weights, compute_inference,
+                                   pair_sign_sums)
+
+PAIRS = [('a', 'c'), ('b', 'c')]
+
+
+def _frame(seed=3, n=60):
+    """Duas colunas x e um y, todos com empates (como releases, idade e DIT no dataset real)"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 8, n).astype(np.float64)
+    b = np.round(rng.lognormal(2, 1, n), 1)
+    c = np.round(0.4 * a + rng.normal(0, 2, n))
+    return pd.DataFrame({'a': a, 'b': b, 'c': c})
+
+
+def _replay(n_resamples, n, seed):
+    """Pesos de bootstrap e permutações na mesma ordem de sorteio de _group_inference (um lote)"""
+    rng = np.random.default_rng(seed)
+    weights = bootstrap_weights(rng, n_resamples, n)
+    permutations = rng.permuted(np.tile(np.arange(n), (n_resamples, 1)), axis=1)
+    return weights, permutations
+
+
+def test_bootstrap_matches_scipy_on_each_resample():
+    df = _frame()
+    n = len(df)
+    rng = np.random.default_rng(0)
+    weights = bootstrap_weights(rng, 40, n)
+    total = np.full(len(weights), float(n))
+    values = {col: df[col].to_numpy() - df[col].mean() for col in df}
+    for x_col, y_col in PAIRS:
+        x, y = values[x_col], values[y_col]
+        batch = _bootstrap_pair(weights, weights.astype(np.float32), total, x, y,
+                                _column_state(weights, total, x), _column_state(weights, total, y))
+        for b, row in enumerate(weights):
+            index = np.repeat(np.arange(n), row.astype(int))
+            np.testing.assert_allclose(batch['pearson'][b], stats.pearsonr(x[index], y[index])[0], atol=1e-9)
+            np.testing.assert_allclose(batch['spearman'][b], stats.spearmanr(x[index], y[index])[0], atol=1e-9)
+            np.testing.assert_allclose(batch['kendall'][b], stats.kendalltau(x[index], y[index])[0], atol=1e-6)
+
+
+def test_pair_sign_sums_matches_brute_force():
+    rng = np.random.default_rng(1)
+    # Tamanho fora de potência de 2 e maior que MERGE_LEAF, com muitos empates
+    values = rng.integers(0, 40, size=(25, 300))
+    for size in (values.shape[1], 7):
+        first, second = np.triu_indices(size, 1)
+        expected = [np.sign(row[second] - row[first]).sum() for row in values[:, :size]]
+        np.testing.assert_array_equal(pair_sign_sums(values[:, :size]), expected)
+
+
+def test_inference_matches_naive_loops(monkeypatch):
+    # Menos permutações do Kendall que das demais, para exercitar a subamostragem
+    monkeypatch.setattr(correlation_inference, 'KENDALL_RESAMPLES', 150)
+    df = _frame()
+    n, n_resamples, seed = len(df), 400, 11
+    result = compute_inference(df, x_columns=['a', 'b'], y_columns=['c'], n_resamples=n_resamples, seed=seed)
+    weights, permutations = _replay(n_resamples, n, seed)
+
+    alpha = (1 - correlation_inference.CONFIDENCE) / 2
+    functions = {'pearson': stats.pearsonr, 'spearman': stats.spearmanr, 'kendall': stats.kendalltau}
+    for x_col, y_col in PAIRS:
+        x, y = df[x_col].to_numpy(), df[y_col].to_numpy()
+        # Kendall: a permutação k põe x[perm[k]] ao lado do k-ésimo menor y
+        y_sorted = y[np.argsort(y, kind='mergesort')]
+        for method, function in functions.items():
+            row = result[(result['x'] == x_col) & (result['y'] == y_col) & (result['method'] == method)].iloc[0]
+            count = 150 if method == 'kendall' else n_resamples
+            assert row['resamples'] == count
+            observed = function(x, y)[0]
+            assert np.isclose(row['coefficient'], observed)
+
+            boot = []
+            for weight in weights[:count]:
+                index = np.repeat(np.arange(n), weight.astype(int))
+                boot.append(function(x[index], y[index])[0])
+            np.testing.assert_allclose([row['ci_low'], row['ci_high']],
+                                       np.nanquantile(boot, [alpha, 1 - alpha]), atol=1e-6)
+
+            if method == 'kendall':
+                null = [function(x[perm], y_sorted)[0] for perm in permutations[:count]]
+            else:
+                null = [function(x, y[perm])[0] for perm in permutations[:count]]
+            extremes = np.count_nonzero(np.abs(null) >= abs(observed) - 1e-9)
+            assert row['p_permutation'] == (extremes + 1) / (count + 1)
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_cache import SCHEMAS, SchemaError, cache_dir_for, load_arrays, load_table, open_table
+
+
+def _results_csv(path, seed=0, n=40):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'repo': [f'owner/repo{i}' for i in range(n)],
+        'stars': rng.integers(1000, 200_000, n),
+        'releases': rng.integers(0, 30, n),
+        'idade_anos': rng.uniform(0, 17, n),
+        'cbo': rng.uniform(0, 20, n),
+        'dit': rng.uniform(1, 4, n),
+        'lcom': rng.lognormal(3, 2, n),
+        'loc': rng.uniform(2, 400, n),
+        'locComment': rng.integers(0, 10_000, n),
+        'extra': rng.normal(size=n),
+    })
+    frame.loc[3, 'lcom'] = np.nan
+    frame.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def _generations(csv_path):
+    return sorted(p.name for p in cache_dir_for(csv_path).iterdir() if p.is_dir())
+
+
+def test_cached_table_equals_read_csv(tmp_path):
+    path = tmp_path / 'repository_analysis_results.csv'
+    expected = _results_csv(path)
+
+    table = load_table(path)
+    assert table['stars'].dtype == np.int32 and table['releases'].dtype == np.int16
+    for col in ('idade_anos', 'cbo', 'dit', 'lcom', 'loc', 'extra'):
+        assert table[col].dtype == np.float64
+    for col in expected.columns:
+        np.testing.assert_array_equal(table[col].to_numpy(), expected[col].to_numpy())
+
+
+def test_unchanged_csv_reuses_generation(tmp_path):
+    path = tmp_path / 'repository_analysis_results.csv'
+    _results_csv(path)
+    meta, _ = open_table(path)
+
+    # Mesmo conteúdo com outro mtime: só os metadados são atualizados
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert open_table(path)[0]['generation'] == meta['generation']
+    assert _generations(path) == [meta['generation']]
+
+
+def test_rebuild_writes_new_generation_and_keeps_old_arrays(tmp_path):
+    path = tmp_path / 'repository_analysis_results.csv'
+    first = _results_csv(path, seed=1)
+    old = load_arrays(path, ['cbo'])['cbo']
+    old_generation = open_table(path)[0]['generation']
+
+    second = _results_csv(path, seed=2, n=55)
+    meta, table = open_table(path)
+    assert meta['generation'] != old_generation
+    assert _generations(path) == [meta['generation']]
+    np.testing.assert_array_equal(table['cbo'], second['cbo'])
+    # Arrays obtidos antes da reconstrução continuam válidos
+    np.testing.assert_array_equal(old, first['cbo'])
+
+
+def test_schema_errors(tmp_path):
+    path = tmp_path / 'repository_analysis_results.csv'
+    _results_csv(path).drop(columns=['cbo']).to_csv(path, index=False)
+    with pytest.raises(SchemaError):
+        load_table(path, schema=SCHEMAS['results'])
+
+    other = tmp_path / 'dados.csv'
+    pd.DataFrame({'n': [1, 2, None]}).to_csv(other, index=False)
+    with pytest.raises(SchemaError):
+        load_table(other, schema={'n': 'int8'})
+    pd.DataFrame({'n': [1, 300]}).to_csv(other, index=False)
+    with pytest.raises(SchemaError):
+        load_table(other, schema={'n': 'int8'})
+    with pytest.raises(SchemaError):
+        load_arrays(other, ['ausente'])
+
+
+def _analyzer_csv(path):
+    """Saída do RepositoryAnalyzer: mesmo nome dos resultados curados, outras colunas"""
+    frame = pd.DataFrame({
+        'full_name': ['owner/a', 'owner/b', 'owner/c'],
+        'analysis_status': ['success', 'error', 'success'],
+        'stars': [5000, 7000, 9000],
+        'avg_cbo': [5.25, np.nan, 3.5],
+        'total_classes': [10, np.nan, 3],
+    })
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def test_analyzer_output_with_curated_name_uses_inferred_types(tmp_path):
+    path = tmp_path / 'repository_analysis_results.csv'
+    expected = _analyzer_csv(path)
+
+    table = load_table(path)
+    assert table['full_name'].tolist() == expected['full_name'].tolist()
+    np.testing.assert_array_equal(table['avg_cbo'], expected['avg_cbo'])
+    assert load_arrays(path, ['full_name'], schema=SCHEMAS['run'])['full_name'].tolist() == \
+        expected['full_name'].tolist()
+    # Um esquema passado explicitamente continua sendo exigido
+    with pytest.raises(SchemaError):
+        load_table(path, schema=SCHEMAS['results'])
+
+
+def test_analyzer_resumes_from_its_results_file(tmp_path, monkeypatch):
+    from clone_and_analyze import RepositoryAnalyzer
+
+    monkeypatch.chdir(tmp_path)
+    _analyzer_csv(tmp_path / 'repository_analysis_results.csv')
+    analyzer = RepositoryAnalyzer(results_file='repository_analysis_results.csv')
+    assert analyzer.analyzed_repositories() == {'owner/a', 'owner/b', 'owner/c'}
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from online_stats import QuantileSketch, OnlineStatistics
+
+COLUMNS = ['a', 'b', 'c']
+
+
+def _sample(seed=0, n=500):
+    rng = np.random.default_rng(seed)
+    values = np.column_stack([
+        rng.lognormal(3, 1, n),
+        rng.normal(-2, 5, n),
+        rng.integers(0, 30, n).astype(np.float64),
+    ])
+    values[rng.random((n, 3)) < 0.1] = np.nan
+    return values
+
+
+def _assert_matches_pandas(stats, values):
+    frame = pd.DataFrame(values, columns=COLUMNS)
+    describe = stats.describe()
+    np.testing.assert_array_equal(describe['count'], frame.count())
+    np.testing.assert_allclose(describe['mean'], frame.mean(), rtol=1e-12)
+    np.testing.assert_allclose(describe['std'], frame.std(), rtol=1e-10)
+    np.testing.assert_array_equal(describe['min'], frame.min())
+    np.testing.assert_array_equal(describe['max'], frame.max())
+
+    complete = frame.dropna()
+    assert stats.complete_count == len(complete)
+    np.testing.assert_allclose(stats.covariance_matrix(), complete.cov(), rtol=1e-10)
+    np.testing.assert_allclose(stats.correlation_matrix(), complete.corr(), rtol=1e-10)
+
+
+def test_welford_updates_match_pandas():
+    values = _sample()
+    stats = OnlineStatistics(COLUMNS)
+    for row in values:
+        stats.update(dict(zip(COLUMNS, row)))
+    _assert_matches_pandas(stats, values)
+
+
+def test_chan_merge_of_batches_matches_pandas():
+    values = _sample(seed=1)
+    stats = OnlineStatistics(COLUMNS)
+    for part in np.array_split(values, [1, 40, 41, 300]):
+        stats.update_many(part)
+    _assert_matches_pandas(stats, values)
+
+
+def test_merge_of_row_and_batch_accumulators():
+    values = _sample(seed=2)
+    rows = OnlineStatistics(COLUMNS)
+    for row in values[:200]:
+        rows.update(dict(zip(COLUMNS, row)))
+    rows.merge(OnlineStatistics.from_array(values[200:], COLUMNS))
+    _assert_matches_pandas(rows, values)
+
+
+def test_dict_round_trip_keeps_state():
+    values = _sample(seed=3)
+    stats = OnlineStatistics.from_array(values, COLUMNS)
+    restored = OnlineStatistics.from_dict(stats.to_dict())
+    pd.testing.assert_frame_equal(restored.describe(), stats.describe())
+
+
+def test_merge_rejects_different_columns():
+    with pytest.raises(ValueError):
+        OnlineStatistics(COLUMNS).merge(OnlineStatistics(['a', 'b']))
+
+
+@pytest.mark.parametrize('q', [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0])
+def test_sketch_quantile_within_relative_accuracy(q):
+    rng = np.random.default_rng(4)
+    values = rng.lognormal(2, 1.5, 5000)
+    sketch = QuantileSketch()
+    sketch.add_many(values)
+    expected = np.quantile(values, q, method='lower')
+    assert sketch.quantile(q) == pytest.approx(expected, rel=sketch.relative_accuracy)
+
+
+def test_sketch_merge_equals_single_sketch():
+    rng = np.random.default_rng(5)
+    values = np.concatenate([rng.normal(0, 10, 3000), np.zeros(50)])
+    single = QuantileSketch()
+    single.add_many(values)
+
+    merged = QuantileSketch()
+    for part in np.array_split(values, 7):
+        sketch = QuantileSketch()
+        for value in part:
+            sketch.add(value)
+        merged.merge(sketch)
+
+    assert merged.to_dict() == single.to_dict()
+    for q in (0.01, 0.5, 0.99):
+        expected = np.quantile(values, q, method='lower')
+        assert merged.quantile(q) == pytest.approx(expected, rel=merged.relative_accuracy, abs=1e-12)
+
+
+def test_sketch_edge_cases():
+    assert np.isnan(QuantileSketch().quantile(0.5))
+    sketch = QuantileSketch()
+    sketch.add_many([np.nan, 0.0, 0.0])
+    assert sketch.count == 2 and sketch.quantile(0.5) == 0.0
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(relative_accuracy=0.05))
@@ -0,0 +1,136 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from query_server import QueryEngine, QueryError, QueryHandler
+from repository_store import QUARTILE_LABELS
+
+
+def _write_results(path, seed=0, n=80):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'repo': [f'owner{i}/repo{i}' for i in range(n)],
+        'stars': rng.integers(1000, 100_000, n), 'releases': rng.integers(0, 40, n),
+        'idade_anos': rng.uniform(0, 15, n), 'cbo': rng.uniform(0, 20, n),
+        'dit': rng.uniform(1, 4, n), 'lcom': rng.lognormal(3, 2, n), 'loc': rng.uniform(2, 400, n),
+        'locComment': rng.integers(0, 5000, n),
+    })
+    frame.loc[[3, 9], 'lcom'] = np.nan
+    frame.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    # As fontes do store são caminhos relativos (results/...)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'results').mkdir()
+    results = _write_results(tmp_path / 'results' / 'repository_analysis_results.csv')
+    return QueryEngine('results/repository_analysis_results.csv'), results
+
+
+def _query(engine, path, **params):
+    body, cached = engine.query(path, {name: value if isinstance(value, list) else [value]
+                                       for name, value in params.items()})
+    return json.loads(body), cached
+
+
+def test_describe_matches_pandas(engine):
+    engine, results = engine
+    result, cached = _query(engine, '/describe', where=['idade_anos>5', 'releases<=20'], columns='cbo,lcom')
+    expected = results[(results['idade_anos'] > 5) & (results['releases'] <= 20)]
+    assert not cached and result['rows'] == len(expected)
+    for col in ('cbo', 'lcom'):
+        values = expected[col].dropna()
+        assert result['describe'][col]['count'] == len(values)
+        assert result['describe'][col]['mean'] == pytest.approx(values.mean(), rel=1e-12)
+        assert result['describe'][col]['median'] == pytest.approx(values.median(), rel=1e-12)
+        assert result['describe'][col]['std'] == pytest.approx(values.std(), rel=1e-12)
+
+    assert _query(engine, '/describe', where=['releases<=20', 'idade_anos>5'], columns='cbo,lcom')[1]
+
+    top = _query(engine, '/describe', top='10', order='loc', columns='loc')[0]
+    assert top['describe']['loc']['min'] == pytest.approx(results['loc'].nlargest(10).min())
+
+
+def test_group_and_correlation_match_pandas_and_scipy(engine):
+    engine, results = engine
+    result = _query(engine, '/group', by='stars_quartile', columns='cbo', stats='count,mean,median')[0]
+    quartile = pd.qcut(results['stars'], q=4, labels=QUARTILE_LABELS)
+    expected = results.groupby(quartile, observed=False)['cbo'].agg(['count', 'mean', 'median'])
+    for label, row in expected.iterrows():
+        group = result['groups']['cbo'][label]
+        assert group['count'] == row['count']
+        assert group['mean'] == pytest.approx(row['mean'], rel=1e-12)
+        assert group['median'] == pytest.approx(row['median'], rel=1e-12)
+
+    for method, function in (('pearson', stats.pearsonr), ('spearman', stats.spearmanr)):
+        result = _query(engine, '/correlation', method=method, x='releases', y='lcom')[0]
+        cell = result['correlation']['releases']['lcom']
+        valid = results[['releases', 'lcom']].dropna()
+        r, p = function(valid['releases'], valid['lcom'])
+        assert cell['n'] == len(valid)
+        assert cell['r'] == pytest.approx(r, rel=1e-9)
+        assert cell['p'] == pytest.approx(p, rel=1e-6)
+
+
+@pytest.mark.parametrize('params', [{'top': '0'}, {'top': '-1'}, {'top': 'x'},
+                                    {'where': 'idade_anos>>5'}, {'where': 'stars_quartile>Q4 (Alta)'},
+                                    {'columns': 'inexistente'}, {'scope': 'alguns'}])
+def test_invalid_parameters(engine, params):
+    with pytest.raises(QueryError):
+        _query(engine[0], '/describe', **params)
+
+
+def test_correlation_needs_rows(engine):
+    with pytest.raises(QueryError):
+        _query(engine[0], '/correlation', where='stars<0')
+
+
+def test_refresh_reloads_changed_sources(engine, tmp_path):
+    engine, _ = engine
+    store = engine.store
+    engine.refresh()
+    assert engine.store is store
+
+    _query(engine, '/describe', columns='cbo')
+    changed = _write_results(tmp_path / 'results' / 'repository_analysis_results.csv', seed=1, n=50)
+    result, cached = _query(engine, '/describe', columns='cbo')
+    assert engine.store is not store and not cached
+    assert result['rows'] == 50
+    assert result['describe']['cbo']['mean'] == pytest.approx(changed['cbo'].mean(), rel=1e-12)
+
+
+def test_http_status_codes(engine, monkeypatch):
+    QueryHandler.engine = engine[0]
+    monkeypatch.setattr(QueryHandler, 'log_request', lambda *args: None)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), QueryHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def status(path):
+        try:
+            with urlopen(base + path) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        assert status('/repo?name=owner1/repo1')[0] == 200
+        assert status('/describe?top=0')[0] == 400
+        assert status('/nada')[0] == 404
+        monkeypatch.setattr(QueryEngine, 'describe', lambda self, params: 1 / 0)
+        code, body = status('/describe?columns=loc')
+        assert code == 500 and 'ZeroDivisionError' in body['error']
+        assert status('/stats')[1]['latency_ms']['requests'] >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from repository_store import GROUP_LABELS, QUARTILE_LABELS, group_summary, open_store
+from stats_engine import load_dataset
+
+
+def _sources(tmp_path, n=60, extra=5):
+    rng = np.random.default_rng(0)
+    names = [f'Owner{i}/Repo{i}' for i in range(n + extra)]
+    stars = rng.integers(1000, 100_000, n + extra)
+    releases = rng.integers(0, 40, n + extra)
+    age = rng.uniform(0, 15, n + extra)
+
+    results = pd.DataFrame({
+        'repo': names[:n], 'stars': stars[:n], 'releases': releases[:n], 'idade_anos': age[:n],
+        'cbo': rng.uniform(0, 20, n), 'dit': rng.uniform(1, 4, n),
+        'lcom': rng.lognormal(3, 2, n), 'loc': rng.uniform(2, 400, n),
+        'locComment': rng.integers(0, 5000, n),
+    })
+    results.loc[7, 'cbo'] = np.nan
+    # O coletor usa outra grafia (URL, maiúsculas) e tem repositórios ainda não analisados
+    collector = pd.DataFrame({
+        'full_name': [f'https://github.com/{name.lower()}.git' for name in names],
+        'owner': [name.split('/')[0] for name in names], 'name': [name.split('/')[1] for name in names],
+        'description': 'x', 'url': 'u', 'stars': stars, 'forks': rng.integers(0, 500, n + extra),
+        'primary_language': 'Java', 'releases': releases, 'age_years': age,
+        'size_bytes': rng.integers(1, 10 ** 9, n + extra),
+    }).iloc[::-1]
+    # Saída do analisador, com o mesmo nome dos resultados curados mas no formato da execução
+    run = pd.DataFrame({'full_name': names[:n], 'analysis_status': 'success', 'stars': stars[:n],
+                        'total_classes': rng.integers(1, 900, n).astype(np.float64),
+                        'total_loc': rng.integers(1, 10 ** 6, n), 'avg_cbo': rng.uniform(0, 20, n),
+                        'std_cbo': np.nan, 'error': ''})
+    run.loc[11, ['analysis_status', 'total_classes', 'avg_cbo', 'error']] = ['error', np.nan, np.nan, 'timeout']
+
+    # Caminhos padrão de repository_store (relativos ao diretório atual)
+    (tmp_path / 'results').mkdir()
+    paths = {name: tmp_path / file for name, file in (
+        ('results', 'results/repository_analysis_results.csv'),
+        ('collector', 'results/top_1000_java_repos_metrics.csv'),
+        ('run', 'repository_analysis_results.csv'))}
+    results.to_csv(paths['results'], index=False)
+    collector.to_csv(paths['collector'], index=False)
+    run.to_csv(paths['run'], index=False)
+    return paths, pd.read_csv(paths['results']), pd.read_csv(paths['collector']), run
+
+
+def test_join_matches_pandas_merge(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths, results, collector, run = _sources(tmp_path)
+    store = open_store()
+    frame = store.frame()
+
+    collector['key'] = collector['full_name'].str.replace('https://github.com/', '').str[:-4]
+    results['key'] = results['repo'].str.lower()
+    run['key'] = run['full_name'].str.lower()
+    expected = results.merge(collector[['key', 'forks', 'size_bytes']], on='key', how='left') \
+                      .merge(run[['key', 'total_classes', 'analysis_status']], on='key', how='left')
+
+    assert len(store) == len(collector) and store.analysis_rows == len(results)
+    analyzed = frame.iloc[:len(results)]
+    np.testing.assert_array_equal(analyzed['key'], expected['key'])
+    for col in ('stars', 'cbo', 'lcom', 'forks', 'size_bytes', 'total_classes'):
+        np.testing.assert_array_equal(analyzed[col].to_numpy(dtype=np.float64),
+                                      expected[col].to_numpy(dtype=np.float64))
+    assert analyzed['analysis_status'].tolist() == expected['analysis_status'].tolist()
+    assert analyzed['has_ck'].all() and frame['has_collector'].all()
+
+    only_collector = frame.iloc[len(results):]
+    assert set(only_collector['key']) == set(collector['key']) - set(results['key'])
+    assert not only_collector['has_ck'].any() and only_collector['cbo'].isna().all()
+
+    assert store.lookup('https://github.com/owner3/repo3/')['forks'] == \
+        collector.loc[collector['key'] == 'owner3/repo3', 'forks'].item()
+    assert store.lookup('ninguem/nada') is None
+
+
+def test_group_index_matches_pandas_groupby(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths, results, _, _ = _sources(tmp_path)
+    df = load_dataset()
+    assert len(df) == len(results)
+
+    quartile = pd.qcut(results['stars'], q=4, labels=QUARTILE_LABELS)
+    np.testing.assert_array_equal(df['stars_quartile'].astype(str), quartile.astype(str))
+
+    columns = ['cbo', 'loc']
+    table = group_summary(df, 'stars_quartile', columns, stats=('count', 'mean', 'median', 'std'))
+    expected = results.groupby(quartile, observed=False)[columns].agg(['count', 'mean', 'median', 'std'])
+    np.testing.assert_allclose(table.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64),
+                               rtol=1e-12)
+
+    ages = pd.cut(results['idade_anos'], bins=[0, 3, 6, 9, 12, np.inf],
+                  labels=GROUP_LABELS['age_bucket'], include_lowest=True)
+    np.testing.assert_array_equal(df['age_bucket'].astype(str), ages.astype(str))
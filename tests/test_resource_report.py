@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import resource_report
+from resource_report import (TIMEOUT_BANDS, load_resource_table, recommended_workers, scaling_model,
+                             timeout_table)
+
+
+def _run_csv(path, n=120):
+    """Saída do analisador com a contabilidade do CK, sob o nome padrão"""
+    rng = np.random.default_rng(0)
+    java_files = rng.integers(1, 3000, n)
+    wall = 0.02 * java_files ** 1.3
+    frame = pd.DataFrame({
+        'full_name': [f'owner/repo{i}' for i in range(n)],
+        'analysis_status': 'success',
+        'java_files': java_files,
+        'total_loc': java_files * 80,
+        'total_classes': java_files + 5,
+        'ck_wall_seconds': wall,
+        'ck_cpu_seconds': wall * 1.5,
+        'ck_max_rss_mb': rng.uniform(200, 2000, n),
+        'ck_read_mb': rng.uniform(0, 50, n),
+        'ck_write_mb': rng.uniform(0, 5, n),
+        'avg_cbo': rng.uniform(0, 10, n),
+    })
+    frame.loc[[3, 4], 'analysis_status'] = 'error'
+    frame.loc[5, 'ck_wall_seconds'] = np.nan
+    frame.to_csv(path, index=False)
+    return frame
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    frame = _run_csv(tmp_path / resource_report.RUN_FILE)
+    return load_resource_table(), frame
+
+
+def test_loads_only_successful_rows_with_accounting(table):
+    df, frame = table
+    expected = frame[(frame['analysis_status'] == 'success') & frame['ck_wall_seconds'].notna()]
+    assert df['full_name'].tolist() == expected['full_name'].tolist()
+
+
+def test_aggregates_match_pandas(table):
+    df, _ = table
+    model = scaling_model(df, 'java_files', 'ck_wall_seconds')
+    assert model['b'] == pytest.approx(1.3) and model['a'] == pytest.approx(0.02)
+    assert model['n'] == len(df)
+
+    bands = timeout_table(df)
+    lower = 0
+    expected_rows = []
+    for upper, timeout in TIMEOUT_BANDS:
+        band = df.loc[(df['java_files'] >= lower) & (df['java_files'] < upper), 'ck_wall_seconds']
+        if len(band):
+            expected_rows.append((len(band), band.median(), band.quantile(0.95), band.max(), timeout))
+        lower = upper
+    assert bands[['repos', 'p50_s', 'p95_s', 'max_s', 'timeout_s']].to_records(index=False).tolist() == \
+        pytest.approx(expected_rows)
+    assert bands['repos'].sum() == len(df)
+
+    memory = 16 * 2 ** 30
+    workers = recommended_workers(df, memory_bytes=memory)
+    p95 = df['ck_max_rss_mb'].quantile(0.95)
+    assert workers['by_memory'] == int(memory * resource_report.MEMORY_BUDGET // (p95 * 2 ** 20))
+    assert workers['cores_per_run'] == pytest.approx(1.5)
+    assert workers['workers'] == max(1, min(workers['by_memory'], workers['by_cpu']))
+
+
+def test_report_runs_with_default_path(table, capsys):
+    resource_report.main([])
+    out = capsys.readouterr().out
+    assert f"RECURSOS DO CK ({len(table[0])} repositórios)" in out
+    assert 'max_workers sugerido' in out
@@ -0,0 +1,115 @@
+import re
+import subprocess
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import clone_and_analyze
+from clone_and_analyze import RepositoryAnalyzer
+from revision_analysis import analyze_revisions
+
+git = pytest.importorskip('git')
+
+# Três tags: Child.java só aparece na v2 e estende Base.java, que não muda desde a v1
+HISTORY = [
+    ('v1', {'src/Base.java': 'class Base {}\n', 'src/Util.java': 'class Util {}\n'}),
+    ('v2', {'src/Child.java': 'class Child extends Base { Util u; }\n'}),
+    ('v3', {'src/Util.java': 'class Util { Base b; }\n', 'README.md': 'docs\n'}),
+]
+
+
+def _fake_ck(trees):
+    """CK de mentira: DIT e CBO dependem dos tipos declarados no resto da árvore, como no CK real"""
+    def run(cmd, timeout, cwd):
+        src, output = cmd[3], cmd[7]
+        sources = {path: path.read_text(encoding='utf-8') for path in sorted(Path(src).rglob('*.java'))}
+        trees.append({path.relative_to(cwd).as_posix() for path in sources})
+        # Arquivos vindos do store são links físicos, não cópias
+        assert all(path.stat().st_nlink > 1 for path in sources)
+        parents = {}
+        for text in sources.values():
+            for name, parent in re.findall(r'class (\w+)(?: extends (\w+))?', text):
+                parents[name] = parent or None
+        rows = []
+        for path, text in sources.items():
+            for name, parent in re.findall(r'class (\w+)(?: extends (\w+))?', text):
+                dit, current = 1, parent
+                while current in parents:
+                    dit, current = dit + 1, parents[current]
+                cbo = sum(1 for other in parents if other != name and re.search(rf'\b{other}\b', text))
+                rows.append({'file': str(path), 'class': name, 'type': 'class', 'cbo': cbo, 'dit': dit,
+                             'lcom': 0, 'loc': text.count('\n')})
+        pd.DataFrame(rows).to_csv(output + 'class.csv', index=False)
+        usage = {'ck_wall_seconds': 0.1, 'ck_cpu_seconds': 0.1, 'ck_max_rss_mb': 1.0, 'ck_exit_code': 0}
+        return subprocess.CompletedProcess(cmd, 0, '', ''), usage
+    return run
+
+
+def _repository(path):
+    repo = git.Repo.init(path)
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'teste')
+        config.set_value('user', 'email', 'teste@example.com')
+    for tag, files in HISTORY:
+        for name, text in files.items():
+            (path / name).parent.mkdir(parents=True, exist_ok=True)
+            (path / name).write_text(text, encoding='utf-8')
+        repo.index.add(list(files))
+        repo.index.commit(f'release {tag}')
+        repo.create_tag(tag)
+    repo.close()
+    return path.resolve().as_uri()
+
+
+def test_ck_runs_on_the_full_tree_of_each_tag(tmp_path, monkeypatch):
+    trees = []
+    monkeypatch.setattr(clone_and_analyze, 'run_with_accounting', _fake_ck(trees))
+    monkeypatch.chdir(tmp_path)
+    url = _repository(tmp_path / 'origin')
+    analyzer = RepositoryAnalyzer(blob_store_dir=tmp_path / 'store')
+
+    rows = analyze_revisions(analyzer, 'dono/projeto', count=3, max_workers=2, repo_url=url)
+
+    assert [row['tag'] for row in rows] == ['v1', 'v2', 'v3']
+    assert all(row['analysis_status'] == 'success' for row in rows)
+    # O CK viu todos os .java de cada tag, inclusive os que não mudaram
+    assert sorted(map(sorted, trees)) == sorted([
+        ['src/Base.java', 'src/Util.java'],
+        ['src/Base.java', 'src/Child.java', 'src/Util.java'],
+        ['src/Base.java', 'src/Child.java', 'src/Util.java'],
+    ])
+    assert [row['total_classes'] for row in rows] == [2, 3, 3]
+    # Child estende Base, que está em um arquivo de uma tag anterior: DIT 2 em vez de 1
+    assert [row['max_dit'] for row in rows] == [1, 2, 2]
+    # Util passa a referenciar Base na v3; Base não mudou, mas as linhas vêm da árvore nova
+    assert [row['avg_cbo'] for row in rows] == [0, pytest.approx(2 / 3), 1]
+    assert [row['java_files'] for row in rows] == [2, 3, 3]
+    assert [row['files_changed'] for row in rows] == [2, 1, 1]
+    assert [row['blobs_fetched'] for row in rows] == [2, 1, 1]
+
+    # Árvores e clone de trabalho apagados; manifestos por tag guardados no store
+    assert not any(path.name.startswith('dono_projeto') for path in analyzer.clone_dir.iterdir())
+    manifest = analyzer.blob_store.load_manifest('dono_projeto@v3')
+    assert sorted(manifest['files']) == ['src/Base.java', 'src/Child.java', 'src/Util.java']
+
+
+def test_failed_ck_marks_only_that_revision(tmp_path, monkeypatch):
+    trees = []
+    fake = _fake_ck(trees)
+
+    def flaky(cmd, timeout, cwd):
+        if cwd.endswith('@v2'):
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return fake(cmd, timeout, cwd)
+
+    monkeypatch.setattr(clone_and_analyze, 'run_with_accounting', flaky)
+    monkeypatch.chdir(tmp_path)
+    url = _repository(tmp_path / 'origin')
+    analyzer = RepositoryAnalyzer(blob_store_dir=tmp_path / 'store')
+
+    rows = analyze_revisions(analyzer, 'dono/projeto', count=3, repo_url=url)
+
+    assert [row['analysis_status'] for row in rows] == ['success', 'ck_analysis_failed', 'success']
+    assert rows[2]['max_dit'] == 2
+    assert not any(path.name.startswith('dono_projeto') for path in analyzer.clone_dir.iterdir())
@@ -0,0 +1,166 @@
+import re
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import collect_repositories
+import search_planner
+from collect_repositories import PAGE_SIZE, SEARCH_CAP
+from search_planner import GITHUB_START, SearchRange, collect_top, plan_partitions
+
+# Repositório que ganhou estrelas durante a coleta: aparece na faixa antiga e na nova
+MOVING = {'repo0': 15}
+
+
+def _universe():
+    """Repositórios sintéticos: cauda longa de estrelas e um bloco com as mesmas estrelas (divide por data)"""
+    rng = np.random.default_rng(7)
+    days = (date.today() - GITHUB_START).days
+    stars = np.concatenate([[5000], (10 * (1 + rng.pareto(1.2, 3500))).astype(int), np.full(1300, 40)])
+    created = rng.integers(0, days, len(stars))
+    return [{
+        'name': f'repo{i}',
+        'owner': {'login': f'dono{i % 97}'},
+        'stargazerCount': int(count),
+        'forkCount': int(count) // 10,
+        'url': f'https://github.com/dono{i % 97}/repo{i}',
+        'description': None,
+        'createdAt': f'{GITHUB_START + timedelta(days=int(day))}T12:00:00Z',
+        'releases': {'totalCount': 1},
+        'primaryLanguage': {'name': 'Java'},
+        'languages': {'edges': [{'node': {'name': 'Java'}, 'size': 1000}]},
+    } for i, (count, day) in enumerate(zip(stars, created))]
+
+
+def _parse(text):
+    """(estrelas mín., estrelas máx. ou None, criado de, criado até) de uma string de busca"""
+    bounds = re.search(r'stars:(\d+)\.\.(\d+)', text)
+    start, end = re.search(r'created:(\S+)\.\.(\S+)', text).groups()
+    if bounds:
+        return int(bounds.group(1)), int(bounds.group(2)), start, end
+    return int(re.search(r'stars:>=(\d+)', text).group(1)), None, start, end
+
+
+class FakeGitHub:
+    """Substituto de search_planner._run: responde às contagens em lote e às páginas da busca"""
+
+    def __init__(self, repos):
+        self.repos = repos
+        # Falhas restantes por string de busca; None = falha sempre
+        self.failures = {}
+
+    def search(self, text):
+        low, high, start, end = _parse(text)
+        found = []
+        for repo in self.repos:
+            stars = {repo['stargazerCount'], MOVING.get(repo['name'], repo['stargazerCount'])}
+            if (start <= repo['createdAt'][:10] <= end
+                    and any(low <= count and (high is None or count <= high) for count in stars)):
+                found.append(repo)
+        return sorted(found, key=lambda repo: -repo['stargazerCount'])
+
+    def __call__(self, query_text, variables):
+        if 'q' not in variables:
+            return {key.replace('q', 'r'): {'repositoryCount': len(self.search(text))}
+                    for key, text in variables.items()}
+        text = variables['q']
+        if text in self.failures:
+            if self.failures[text] is None or self.failures[text] > 0:
+                if self.failures[text] is not None:
+                    self.failures[text] -= 1
+                raise RuntimeError('limite de taxa')
+        offset = int(variables['cursor'] or 0)
+        found = self.search(text)[:SEARCH_CAP]
+        return {'search': {'repositoryCount': len(found), 'nodes': found[offset:offset + PAGE_SIZE],
+                           'pageInfo': {'hasNextPage': offset + PAGE_SIZE < len(found),
+                                        'endCursor': str(offset + PAGE_SIZE)}}}
+
+
+@pytest.fixture
+def github(monkeypatch):
+    fake = FakeGitHub(_universe())
+    monkeypatch.setattr(search_planner, '_run', fake)
+    monkeypatch.setattr(search_planner.time, 'sleep', lambda seconds: None)
+    return fake
+
+
+def _full_name(repo):
+    return f"{repo['owner']['login']}/{repo['name']}"
+
+
+def test_partitions_are_disjoint_and_under_the_cap(github):
+    root = SearchRange(10, None, GITHUB_START, date.today())
+    leaves = plan_partitions(root)
+
+    assert len(leaves) > 1
+    assert all(0 < count <= SEARCH_CAP for _, count in leaves)
+    assert [count for _, count in leaves] == [len(github.search(search_planner.search_string(leaf)))
+                                              for leaf, _ in leaves]
+    # O bloco com 40 estrelas passa do limite sozinho, então foi dividido por data de criação
+    assert any(leaf.stars_min == leaf.stars_max == 40 for leaf, _ in leaves)
+
+    covered = {}
+    for leaf, _ in leaves:
+        for repo in github.search(search_planner.search_string(leaf)):
+            covered.setdefault(repo['name'], []).append(leaf)
+    expected = github.search(search_planner.search_string(root))
+    assert set(covered) == {repo['name'] for repo in expected}
+    # Só o repositório que mudou de estrelas cai em duas partições
+    assert {name for name, found in covered.items() if len(found) > 1} == set(MOVING)
+
+
+def test_collect_top_removes_duplicates(github):
+    target = 2500
+    ranked = collect_top(target, max_workers=2)
+
+    names = [_full_name(repo) for repo in ranked]
+    assert len(names) == len(set(names)) == target
+    reference = sorted(github.repos, key=lambda repo: -repo['stargazerCount'])[:target]
+    assert sorted(repo['stargazerCount'] for repo in ranked) == \
+        sorted(repo['stargazerCount'] for repo in reference)
+    assert [repo['stargazerCount'] for repo in ranked] == \
+        sorted((repo['stargazerCount'] for repo in ranked), reverse=True)
+
+
+def test_transient_partition_failure_is_retried(github):
+    leaves = plan_partitions(SearchRange(10, None, GITHUB_START, date.today()))
+    flaky = search_planner.search_string(leaves[0][0])
+    github.failures[flaky] = 1
+
+    ranked = collect_top(2500, min_stars=10)
+    assert len(ranked) == 2500
+    assert github.failures[flaky] == 0
+
+
+def test_exhausted_retries_abort_without_writing_csv(github, monkeypatch, tmp_path, capsys):
+    monkeypatch.chdir(tmp_path)
+    output = tmp_path / 'top.csv'
+
+    collect_repositories.main(['--target', '2500', '--output', str(output), '--workers', '2'])
+    saved = pd.read_csv(output)
+    assert len(saved) == saved['full_name'].nunique() == 2500
+    before = output.read_bytes(), output.stat().st_mtime_ns
+
+    # Uma das partições que o coletor vai planejar falha em todas as rodadas
+    threshold = search_planner.find_star_threshold(2500)
+    leaves = plan_partitions(SearchRange(threshold, None, GITHUB_START, date.today()))
+    github.failures[search_planner.search_string(leaves[-1][0])] = None
+    capsys.readouterr()
+
+    collect_repositories.main(['--target', '2500', '--output', str(output), '--workers', '2'])
+    assert 'Coleta abortada' in capsys.readouterr().out
+    assert (output.read_bytes(), output.stat().st_mtime_ns) == before
+    with pytest.raises(RuntimeError, match='partições falharam'):
+        collect_top(2500, min_stars=threshold)
+
+
+def test_run_raises_after_query_retries(monkeypatch):
+    calls = []
+    monkeypatch.setattr(search_planner, 'run_query', lambda text, variables: calls.append(variables))
+    monkeypatch.setattr(search_planner.time, 'sleep', lambda seconds: None)
+
+    with pytest.raises(RuntimeError, match='tentativas'):
+        search_planner._run('query', {'q': 'x'})
+    assert len(calls) == search_planner.QUERY_RETRIES
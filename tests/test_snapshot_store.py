@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import snapshot_store
+from snapshot_store import _stored_snapshot, list_snapshots, load_snapshot, record_snapshot, repo_history
+
+VERSIONS = 10
+
+
+def _versions(seed=0, n=30):
+    """Coletas sucessivas: estrelas mudam, repositórios entram e saem, uma coluna some"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'full_name': [f'owner/repo{i}' for i in range(n)],
+        'stars': rng.integers(1000, 50_000, n),
+        'releases': rng.integers(0, 30, n),
+        'description': [f'descrição {i}' for i in range(n)],
+        'created_at': [f'20{10 + i % 10}-0{1 + i % 9}-15T12:00:00Z' for i in range(n)],
+    })
+    versions = []
+    for v in range(VERSIONS):
+        frame = frame.copy()
+        changed = rng.random(len(frame)) < 0.2
+        frame.loc[changed, 'stars'] += rng.integers(1, 500, changed.sum())
+        if v % 3 == 2:
+            frame = frame.drop(frame.index[rng.integers(len(frame))])
+            new = {'full_name': f'novo/repo{v}', 'stars': 1234, 'releases': 0, 'description': 'novo',
+                   'created_at': '2020-02-29T00:00:00Z'}
+            frame.loc[len(frame) + 100 + v] = {col: new[col] for col in frame.columns}
+        if v == 6:
+            frame = frame.drop(columns=['description'])
+        versions.append(frame.reset_index(drop=True))
+    return versions
+
+
+def _expected_state(frame):
+    rows = frame.set_index('full_name').to_dict('index')
+    return {key: {field: ('' if pd.isna(value) else value) for field, value in row.items()}
+            for key, row in rows.items()}
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch):
+    # Keyframes frequentes para exercitar a reconstrução a partir do keyframe
+    monkeypatch.setattr(snapshot_store, 'KEYFRAME_INTERVAL', 4)
+    versions = _versions()
+    dates = [f'2024-0{1 + v % 9}-{10 + v}T00:00:00Z' for v in range(VERSIONS)]
+    for v, (frame, taken_at) in enumerate(zip(versions, dates)):
+        csv_path = tmp_path / f'coleta_{v}.csv'
+        frame.to_csv(csv_path, index=False)
+        record_snapshot('collector', csv_path, taken_at=taken_at, snapshot_dir=tmp_path / 'snapshots')
+    return tmp_path / 'snapshots', versions, dates
+
+
+def test_every_snapshot_round_trips(recorded):
+    snapshot_dir, versions, dates = recorded
+    assert [s['keyframe'] for s in list_snapshots('collector', snapshot_dir)] == \
+        [i % 4 == 0 for i in range(VERSIONS)]
+
+    for i, frame in enumerate(versions):
+        meta, stored = _stored_snapshot('collector', i, snapshot_dir)
+        assert meta['taken_at'] == dates[i]
+        assert stored == _expected_state(frame.fillna(''))
+
+        state = load_snapshot('collector', i, snapshot_dir)[1]
+        created = pd.to_datetime(frame['created_at'].to_numpy()).tz_localize(None)
+        days = (pd.Timestamp(dates[i]).tz_localize(None) - created).days
+        expected_age = np.round(days / 365.25, 2)
+        np.testing.assert_array_equal([state[name]['age_years'] for name in frame['full_name']], expected_age)
+
+
+def test_deltas_hold_only_changed_fields(recorded):
+    snapshot_dir, versions, _ = recorded
+    delta = next(snapshot_store.iter_records('collector', start=1, snapshot_dir=snapshot_dir))
+    before, after = versions[0].set_index('full_name'), versions[1].set_index('full_name')
+    changed = after.index[after['stars'] != before['stars']]
+    assert sorted(delta['changes']) == sorted(changed)
+    assert all(fields == {'stars': int(after.loc[key, 'stars'])} for key, fields in delta['changes'].items())
+
+
+def test_repo_history_matches_versions(recorded):
+    snapshot_dir, versions, dates = recorded
+    history = repo_history('collector', 'OWNER/REPO5', fields=['stars'], snapshot_dir=snapshot_dir)
+    expected = [(date, {'stars': int(frame.loc[frame['full_name'] == 'owner/repo5', 'stars'].item())})
+                for date, frame in zip(dates, versions) if (frame['full_name'] == 'owner/repo5').any()]
+    assert history == expected
+
+
+def test_nan_fields_are_not_changes(tmp_path):
+    # O analisador grava 'nan' (ex.: std_cbo de repositórios com uma única classe)
+    header = 'full_name,stars,std_cbo\n'
+    rows = ['owner/a,10,nan\n', 'owner/b,20,1.5\n']
+    snapshot_dir = tmp_path / 'snapshots'
+    for v, lines in enumerate([rows, rows, [rows[0].replace('nan', '2.0'), rows[1]]]):
+        csv_path = tmp_path / f'resultados_{v}.csv'
+        csv_path.write_text(header + ''.join(lines), encoding='utf-8')
+        record_snapshot('analysis', csv_path, taken_at=f'2024-01-0{v + 1}T00:00:00Z', snapshot_dir=snapshot_dir)
+
+    assert [s['repos_changed'] for s in list_snapshots('analysis', snapshot_dir)] == [2, 0, 1]
+    records = list(snapshot_store.iter_records('analysis', snapshot_dir=snapshot_dir))
+    assert records[1]['changes'] == {}
+    assert records[2]['changes'] == {'owner/a': {'std_cbo': 2.0}}
+    assert np.isnan(load_snapshot('analysis', 1, snapshot_dir)[1]['owner/a']['std_cbo'])